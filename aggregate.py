@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Agregados de auditoría combinables entre fragmentos. Cada máquina analiza
+su parte de la entrada y guarda un agregado JSON (niveles de fuerza,
+histogramas de puntuación y entropía, longitudes, patrones y tasas de
+contraseñas comunes); 'aggregate.py merge' los suma en el informe final sin
+volver a leer ninguna contraseña.
+
+Todos los contadores son sumas, así que combinar es asociativo y
+conmutativo: da igual cómo se repartan los fragmentos y en qué orden se
+junten. La longitud y la entropía del analizador (redondeada a centésimas,
+longitud x log2 de uno de 15 tamaños de alfabeto) toman pocos valores
+distintos, así que se cuentan exactos y los cuantiles también lo son
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+
+from bulk import BulkSummary
+
+VERSION = 1
+KIND = 'password-audit-aggregate'
+# Campos del análisis que necesita el agregado
+AGGREGATE_FIELDS = ('length', 'score', 'strength', 'entropy', 'patterns', 'is_common',
+                    'breach_count')
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+class AggregateError(ValueError):
+    """
+    Agregado ilegible o de una versión incompatible
+    """
+
+
+def _quantile(counts, q):
+    """
+    Cuantil exacto (el menor valor con al menos q del total por debajo) de
+    un contador valor -> apariciones
+    """
+    total = sum(counts.values())
+    if not total:
+        return None
+    target = max(1, math.ceil(q * total))
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen >= target:
+            return value
+
+
+def _merge_counts(into, counts):
+    for key, count in counts.items():
+        into[key] = into.get(key, 0) + count
+
+
+class AuditAggregate(BulkSummary):
+    """
+    Resumen masivo combinable. Además de los niveles de fuerza cuenta la
+    puntuación (0-100), la longitud, la entropía en centésimas de bit, los
+    patrones detectados y las contraseñas comunes y filtradas. 'shards' es
+    el número de agregados parciales que se han combinado
+    """
+    def __init__(self):
+        super().__init__()
+        self.scores = [0] * 101
+        self.lengths = {}
+        self.entropies = {}
+        self.patterns = {}
+        self.with_patterns = 0
+        self.common = 0
+        # Contraseñas consultadas en un corpus y cuántas aparecían
+        self.breach_checked = 0
+        self.breached = 0
+        self.shards = 1
+
+    def add(self, analysis):
+        super().add(analysis)
+        self.scores[analysis['score']] += 1
+        length = analysis['length']
+        self.lengths[length] = self.lengths.get(length, 0) + 1
+        entropy = round(analysis['entropy'] * 100)
+        self.entropies[entropy] = self.entropies.get(entropy, 0) + 1
+        patterns = analysis['patterns']
+        if patterns:
+            self.with_patterns += 1
+            for label in patterns:
+                self.patterns[label] = self.patterns.get(label, 0) + 1
+        if analysis['is_common']:
+            self.common += 1
+        breach_count = analysis['breach_count']
+        if breach_count is not None:
+            self.breach_checked += 1
+            self.breached += breach_count > 0
+
+    def merge(self, other):
+        """
+        Suma otro agregado a este (devuelve self)
+        """
+        self.total += other.total
+        _merge_counts(self.strength_counts, other.strength_counts)
+        self.scores = [a + b for a, b in zip(self.scores, other.scores)]
+        _merge_counts(self.lengths, other.lengths)
+        _merge_counts(self.entropies, other.entropies)
+        _merge_counts(self.patterns, other.patterns)
+        self.with_patterns += other.with_patterns
+        self.common += other.common
+        self.breach_checked += other.breach_checked
+        self.breached += other.breached
+        self.shards += other.shards
+        return self
+
+    @classmethod
+    def merged(cls, aggregates):
+        """
+        Agregado nuevo con la suma de todos los dados
+        """
+        result = cls()
+        result.shards = 0
+        for aggregate in aggregates:
+            result.merge(aggregate)
+        return result
+
+    def length_quantiles(self, quantiles=QUANTILES):
+        return {q: _quantile(self.lengths, q) for q in quantiles}
+
+    def entropy_quantiles(self, quantiles=QUANTILES):
+        return {q: None if value is None else value / 100
+                for q, value in ((q, _quantile(self.entropies, q)) for q in quantiles)}
+
+    def score_histogram(self, width=10):
+        """
+        [(desde, hasta, contraseñas)] en tramos de 'width' puntos
+        """
+        return [(start, min(start + width - 1, 100), sum(self.scores[start:start + width]))
+                for start in range(0, 101, width)]
+
+    def entropy_histogram(self, width=10):
+        """
+        [(desde, hasta, contraseñas)] en tramos de 'width' bits, hasta el
+        último tramo con contraseñas
+        """
+        bins = {}
+        for centibits, count in self.entropies.items():
+            start = int(centibits // (width * 100)) * width
+            bins[start] = bins.get(start, 0) + count
+        if not bins:
+            return []
+        return [(start, start + width, bins.get(start, 0))
+                for start in range(0, max(bins) + width, width)]
+
+    def rate(self, count, total=None):
+        total = self.total if total is None else total
+        return count / total if total else 0.0
+
+    def to_dict(self):
+        data = super().to_dict()
+        data.update({
+            'kind': KIND,
+            'version': VERSION,
+            'scores': self.scores,
+            'lengths': self.lengths,
+            'entropy_centibits': self.entropies,
+            'patterns': self.patterns,
+            'with_patterns': self.with_patterns,
+            'common': self.common,
+            'breach_checked': self.breach_checked,
+            'breached': self.breached,
+            'shards': self.shards,
+        })
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reconstruye un agregado guardado con to_dict()
+        """
+        if data.get('kind') != KIND:
+            raise AggregateError("No es un agregado de auditoría")
+        if data.get('version') != VERSION:
+            raise AggregateError(f"Versión de agregado no soportada: {data.get('version')}")
+        aggregate = super().from_dict(data)
+        if len(data['scores']) != 101:
+            raise AggregateError("Histograma de puntuación con tamaño incorrecto")
+        aggregate.scores = list(data['scores'])
+        # Las claves JSON son texto
+        aggregate.lengths = {int(key): count for key, count in data['lengths'].items()}
+        aggregate.entropies = {int(key): count
+                               for key, count in data['entropy_centibits'].items()}
+        aggregate.patterns = dict(data['patterns'])
+        aggregate.with_patterns = data['with_patterns']
+        aggregate.common = data['common']
+        aggregate.breach_checked = data['breach_checked']
+        aggregate.breached = data['breached']
+        aggregate.shards = data['shards']
+        return aggregate
+
+    def save(self, path):
+        """
+        Escribe el agregado en JSON de forma atómica (temporal + renombrado)
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except ValueError as e:
+            raise AggregateError(f"Agregado ilegible ({path}): {e}")
+        try:
+            return cls.from_dict(data)
+        except (KeyError, TypeError) as e:
+            raise AggregateError(f"Agregado incompleto ({path}): {e}")
+
+
+def format_report(aggregate):
+    """
+    Informe de texto del agregado
+    """
+    lines = [f"─── INFORME AGREGADO ({aggregate.total:,} contraseñas, "
+             f"{aggregate.shards} fragmentos) ───"]
+    for strength, count in aggregate.strength_counts.items():
+        lines.append(f"{strength:12}: {count:>12,}  {aggregate.rate(count):6.1%}")
+
+    lines.append("\nPuntuación:")
+    for start, end, count in aggregate.score_histogram():
+        lines.append(f"  {start:3}-{end:<3} {count:>12,}  {aggregate.rate(count):6.1%}")
+    lines.append("\nEntropía (bits):")
+    for start, end, count in aggregate.entropy_histogram():
+        lines.append(f"  {start:3}-{end:<3} {count:>12,}  {aggregate.rate(count):6.1%}")
+
+    lengths = aggregate.length_quantiles()
+    entropies = aggregate.entropy_quantiles()
+    lines.append("\nCuantiles:      " + "  ".join(f"{f'p{q * 100:g}':>7}" for q in QUANTILES))
+    lines.append("  longitud      " + "  ".join(
+        f"{'-' if lengths[q] is None else lengths[q]:>7}" for q in QUANTILES))
+    lines.append("  entropía      " + "  ".join(
+        f"{'-' if entropies[q] is None else f'{entropies[q]:.2f}':>7}" for q in QUANTILES))
+
+    lines.append(f"\nCon patrones débiles: {aggregate.with_patterns:,} "
+                 f"({aggregate.rate(aggregate.with_patterns):.1%})")
+    for label, count in sorted(aggregate.patterns.items(), key=lambda item: (-item[1], item[0])):
+        lines.append(f"  {label:24} {count:>12,}  {aggregate.rate(count):6.1%}")
+    lines.append(f"Comunes: {aggregate.common:,} ({aggregate.rate(aggregate.common):.1%})")
+    if aggregate.breach_checked:
+        rate = aggregate.rate(aggregate.breached, aggregate.breach_checked)
+        lines.append(f"En el corpus de filtraciones: {aggregate.breached:,} de "
+                     f"{aggregate.breach_checked:,} consultadas ({rate:.1%})")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Agregados de auditoría por fragmentos')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    merge = subparsers.add_parser('merge', help='Combinar agregados de varios fragmentos')
+    merge.add_argument('aggregates', nargs='+', metavar='AGREGADO')
+    merge.add_argument('--out', metavar='ARCHIVO', help='Guardar el agregado combinado')
+
+    show = subparsers.add_parser('show', help='Mostrar el informe de un agregado')
+    show.add_argument('aggregate', metavar='AGREGADO')
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'merge':
+            aggregate = AuditAggregate.merged(AuditAggregate.load(path)
+                                              for path in args.aggregates)
+            if args.out:
+                aggregate.save(args.out)
+        else:
+            aggregate = AuditAggregate.load(args.aggregate)
+    except (OSError, AggregateError) as e:
+        sys.exit(f"❌ {e}")
+    print(format_report(aggregate))
+
+
+if __name__ == '__main__':
+    main()
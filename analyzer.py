@@ -1,9 +1,10 @@
 import re
-import math
-from collections import Counter
+from scanner import PatternScanner
+from result import AnalysisResult, PASSWORD_FIELDS
 
 class PasswordAnalyzer:
-    def __init__(self):
+    def __init__(self, corpus=None, dictionary=None, cache_size=0, cache_policy='lru',
+                 attack_rates=None, guess_max_length=64, model=None):
         # Patrones comunes débiles
         self.weak_patterns = [
             r'123+',  # Secuencias numéricas
@@ -28,73 +29,236 @@ class PasswordAnalyzer:
             'contraseña', 'clave', 'secreto', 'amor', 'familia',
             'casa', 'trabajo', 'dinero', 'vida', 'corazon'
         }
+        
+        # Corpus offline de contraseñas filtradas (sustituye a los conjuntos)
+        if isinstance(corpus, str):
+            from corpus import BreachCorpus
+            corpus = BreachCorpus(corpus)
+        self.corpus = corpus
+        
+        # Autómata de palabras de diccionario (listas grandes precompiladas)
+        if isinstance(dictionary, str):
+            from dictionary import DictionaryMatcher
+            dictionary = DictionaryMatcher.load(dictionary)
+        self.dictionary = dictionary
+        
+        # Modelo Markov/PCFG entrenado con un corpus (ver markov.py train)
+        if isinstance(model, str):
+            from markov import PasswordModel
+            model = PasswordModel.load(model)
+        self.model = model
+        
+        # Caché de resultados para contraseñas repetidas (0 = desactivada)
+        self.cache = None
+        if cache_size:
+            from cache import ResultCache
+            self.cache = ResultCache(cache_size, cache_policy)
+        
+        # Estimador de intentos por coincidencias (se construye al primer uso)
+        self.attack_rates = attack_rates
+        self.guess_max_length = guess_max_length
+        self._guess_estimator = None
+        
+        self._trailing_digits = re.compile(r'\d+$')
+        # Perfil por etapas (None = desactivado, sin ningún coste)
+        self.profiler = None
+        # Snapshot del que se cargó el estado preparado (ver snapshot.py)
+        self.snapshot_path = None
+        self.compile_patterns()
+    
+    def compile_patterns(self):
+        """
+        Compila los patrones débiles en el escáner de una sola pasada
+        (volver a llamarlo si se modifica weak_patterns)
+        """
+        self.scanner = PatternScanner(self.weak_patterns)
+        if self.profiler is not None:
+            self.profiler.install(self)
+    
+    def enable_profiling(self, profiler=None, hooks=()):
+        """
+        Activa la medición por etapas y devuelve el StageProfiler. Los hooks
+        reciben (etapa, ns) en cada medición
+        """
+        from instrument import StageProfiler
+        self.profiler = profiler or StageProfiler(hooks)
+        self.profiler.install(self)
+        return self.profiler
+    
+    def disable_profiling(self):
+        """
+        Desactiva la medición y restaura los métodos originales
+        """
+        if self.profiler is not None:
+            self.profiler.uninstall(self)
+            self.profiler = None
+    
+    @classmethod
+    def from_snapshot(cls, path, cache_size=0, cache_policy='lru', verify=False):
+        """
+        Analizador con el estado preparado de un snapshot (patrones,
+        diccionario, tablas de teclado), sin volver a construir nada
+        """
+        from snapshot import load_snapshot
+        return load_snapshot(path, cache_size=cache_size, cache_policy=cache_policy,
+                             verify=verify)
+    
+    def save_snapshot(self, path):
+        """
+        Guarda el estado preparado del analizador en un snapshot versionado
+        """
+        from snapshot import save_snapshot
+        save_snapshot(self, path)
+    
+    def __getstate__(self):
+        if self.snapshot_path is not None:
+            # Los trabajadores cargan el mismo snapshot (ya verificado aquí)
+            return {'snapshot_path': self.snapshot_path, 'cache': self.cache,
+                    'attack_rates': self.attack_rates}
+        return self._prepared_state()
+    
+    def _prepared_state(self):
+        # Los envoltorios del perfil no viajan a otros procesos
+        state = self.__dict__.copy()
+        if self.profiler is not None:
+            import copy
+            from instrument import STAGES
+            for _, owner_name, method in STAGES:
+                if not owner_name:
+                    state.pop(method, None)
+            scanner = copy.copy(self.scanner)
+            scanner.__dict__.pop('entropy', None)
+            state['scanner'] = scanner
+            state['profiler'] = None
+        return state
     
-    def analyze_password(self, password):
+    def __setstate__(self, state):
+        if 'scanner' not in state:
+            from snapshot import load_snapshot
+            self.__dict__.update(load_snapshot(state['snapshot_path'], verify=False).__dict__)
+            self.cache = state['cache']
+            self.attack_rates = state['attack_rates']
+            return
+        self.__dict__.update(state)
+    
+    def analyze_password(self, password, fields=None):
         """
-        Análisis completo de una contraseña
+        Análisis completo de una contraseña. Devuelve un AnalysisResult que
+        se usa como un dict y calcula cada campo al consultarlo; 'fields'
+        fuerza el cálculo inmediato de los campos indicados
         """
         if not password:
             return self._empty_analysis()
-            
-        analysis = {
-            'password': password,
-            'length': len(password),
-            'score': 0,
-            'strength': '',
-            'feedback': [],
-            'patterns': self._detect_patterns(password),
-            'character_sets': self._analyze_character_sets(password),
-            'entropy': self._calculate_entropy(password),
-            'crack_time': self._estimate_crack_time(password),
-            'is_common': self._is_common_password(password)
-        }
         
-        # Calcular puntuación total
-        analysis['score'] = self._calculate_score(analysis)
-        analysis['strength'] = self._get_strength_level(analysis['score'])
-        analysis['feedback'] = self._generate_feedback(analysis)
+        if self.cache is None:
+            return self._analyze(password, fields)
         
+        # Las contraseñas repetidas se sirven desde la caché (sin el texto en claro)
+        key = self.cache.key(password)
+        cached = self.cache.get(key)
+        if cached is None:
+            analysis = self._analyze(password, PASSWORD_FIELDS)
+            self.cache.put(key, analysis.clone(None))
+            return analysis.materialize(fields or ())
+        return cached.clone(password).materialize(fields or ())
+    
+    def _analyze(self, password, fields=None):
+        """
+        Análisis de una contraseña no vacía, sin pasar por la caché
+        """
+        analysis = AnalysisResult(self, password)
+        if fields:
+            analysis.materialize(fields)
         return analysis
     
+    def session(self, text=''):
+        """
+        Sesión de análisis incremental para analizar mientras se escribe
+        """
+        from incremental import AnalysisSession
+        return AnalysisSession(self, text)
+    
+    def cache_info(self):
+        """
+        Estadísticas de la caché de resultados (None si está desactivada)
+        """
+        return self.cache.info() if self.cache is not None else None
+
+    def analyze_stream(self, passwords, fields=None):
+        """
+        Analiza un iterable de contraseñas de forma perezosa, un resultado
+        cada vez, para que la memoria no crezca con el tamaño de la entrada
+        """
+        for password in passwords:
+            yield self.analyze_password(password, fields)
+
+    def analyze_many(self, passwords, workers=None, chunksize=1000, fields=('score', 'strength')):
+        """
+        Analiza un iterable de contraseñas en varios procesos, conservando
+        el orden de entrada (workers=None usa todos los núcleos). Los
+        trabajadores calculan 'fields' y solo devuelven esos valores; el
+        resto se calcula en este proceso al consultarlo, así que conviene
+        pedir todo lo que se vaya a leer
+        """
+        from parallel import analyze_parallel
+        return analyze_parallel(self, passwords, workers=workers, chunksize=chunksize,
+                                fields=fields)
+
     def _analyze_character_sets(self, password):
         """
         Analiza qué tipos de caracteres contiene la contraseña
         """
-        sets = {
-            'lowercase': bool(re.search(r'[a-z]', password)),
-            'uppercase': bool(re.search(r'[A-Z]', password)),
-            'digits': bool(re.search(r'[0-9]', password)),
-            'symbols': bool(re.search(r'[^a-zA-Z0-9]', password)),
-            'count': 0
-        }
-        
-        sets['count'] = sum([sets['lowercase'], sets['uppercase'], 
-                           sets['digits'], sets['symbols']])
-        
-        return sets
+        return self.scanner.character_sets(password)
     
     def _detect_patterns(self, password):
         """
         Detecta patrones débiles en la contraseña
         """
-        detected = []
-        pwd_lower = password.lower()
-        
-        for pattern in self.weak_patterns:
-            if re.search(pattern, pwd_lower):
-                detected.append(pattern)
-        
-        # Detectar fechas (YYYY, MM/DD/YYYY, etc.)
-        if re.search(r'(19|20)\d{2}', password):
-            detected.append('date_pattern')
-            
-        # Detectar secuencias de teclado
-        keyboard_patterns = ['qwerty', 'asdf', '1234', 'zxcv']
-        for pattern in keyboard_patterns:
-            if pattern in pwd_lower:
-                detected.append(f'keyboard_{pattern}')
-        
-        return detected
+        return self.scanner.detect_patterns(password)
+    
+    def _find_dictionary_words(self, password):
+        """
+        Palabras de diccionario incrustadas (None si no hay diccionario)
+        """
+        if self.dictionary is None:
+            return None
+        return self.dictionary.words_in(password)
+    
+    def _breach_count(self, password):
+        """
+        Apariciones en el corpus de filtraciones (None si no hay corpus)
+        """
+        if self.corpus is None:
+            return None
+        return self.corpus.lookup(password)
+    
+    @property
+    def guess_estimator(self):
+        if self._guess_estimator is None:
+            from guesses import GuessEstimator
+            # Las listas integradas no tienen orden: todas con el mismo rango
+            words = self.common_passwords | self.common_spanish
+            self._guess_estimator = GuessEstimator(
+                dict.fromkeys(words, len(words)), self.dictionary,
+                max_length=self.guess_max_length)
+        return self._guess_estimator
+    
+    def _estimate_guesses(self, password):
+        """
+        Intentos estimados para adivinar la contraseña (estilo zxcvbn)
+        """
+        return self.guess_estimator.estimate(password)
+    
+    def _crack_seconds(self, guesses):
+        """
+        Segundos para adivinar la contraseña en cada escenario de ataque
+        """
+        if self.attack_rates is None:
+            from guesses import ATTACK_RATES
+            rates = ATTACK_RATES
+        else:
+            rates = self.attack_rates
+        return {name: guesses / rate for name, rate in rates.items()}
     
     def _calculate_entropy(self, password):
         """
@@ -102,24 +266,23 @@ class PasswordAnalyzer:
         """
         if not password:
             return 0
-            
-        # Determinar el espacio de caracteres
-        charset_size = 0
-        if re.search(r'[a-z]', password):
-            charset_size += 26
-        if re.search(r'[A-Z]', password):
-            charset_size += 26
-        if re.search(r'[0-9]', password):
-            charset_size += 10
-        if re.search(r'[^a-zA-Z0-9]', password):
-            charset_size += 32  # Símbolos comunes
-            
-        if charset_size == 0:
-            return 0
-            
-        # Entropía = log2(charset_size^length)
-        entropy = len(password) * math.log2(charset_size)
-        return round(entropy, 2)
+        return self.scanner.entropy(len(password), self.scanner.character_sets(password))
+    
+    def _markov_bits(self, password):
+        """
+        -log2 de la probabilidad según la cadena de Markov (None sin modelo)
+        """
+        if self.model is None:
+            return None
+        return self.model.markov_bits(password)
+    
+    def _pcfg_bits(self, password):
+        """
+        -log2 de la probabilidad según la gramática PCFG (None sin modelo)
+        """
+        if self.model is None:
+            return None
+        return self.model.pcfg_bits(password)
     
     def _estimate_crack_time(self, password):
         """
@@ -128,8 +291,12 @@ class PasswordAnalyzer:
         if not password:
             return "Instantáneo"
             
-        entropy = self._calculate_entropy(password)
-        
+        return self._crack_time_for_entropy(self._calculate_entropy(password))
+    
+    def _crack_time_for_entropy(self, entropy):
+        """
+        Traduce la entropía a un tiempo estimado de cracking
+        """
         # Asumiendo 1 billón de intentos por segundo (GPU moderna)
         attempts_per_second = 1e12
         
@@ -153,14 +320,21 @@ class PasswordAnalyzer:
         """
         Verifica si es una contraseña común
         """
+        # Con un corpus de filtraciones se consulta el archivo en lugar de los
+        # conjuntos. El corpus distingue mayúsculas: se busca la contraseña
+        # exacta y la misma sin los dígitos finales
+        if self.corpus is not None:
+            base = self._trailing_digits.sub('', password)
+            return password in self.corpus or (base != password and base in self.corpus)
+        
         pwd_lower = password.lower()
+        base_pwd = self._trailing_digits.sub('', pwd_lower)
         
         # Verificar contraseñas exactas
         if pwd_lower in self.common_passwords or pwd_lower in self.common_spanish:
             return True
             
         # Verificar variaciones simples (añadir números al final)
-        base_pwd = re.sub(r'\d+$', '', pwd_lower)
         if base_pwd in self.common_passwords or base_pwd in self.common_spanish:
             return True
             
@@ -244,6 +418,10 @@ class PasswordAnalyzer:
         if analysis['patterns']:
             feedback.append("❌ Evita patrones predecibles (123, abc, qwerty).")
         
+        # Feedback por palabras de diccionario
+        if analysis.get('dictionary_words'):
+            feedback.append(f"❌ Contiene palabras de diccionario: {', '.join(analysis['dictionary_words'])}")
+        
         # Feedback por contraseñas comunes
         if analysis['is_common']:
             feedback.append("❌ Contraseña muy común. Usa algo único.")
@@ -254,7 +432,7 @@ class PasswordAnalyzer:
         """
         Retorna análisis vacío para contraseñas vacías
         """
-        return {
+        return AnalysisResult.from_values(self, {
             'password': '',
             'length': 0,
             'score': 0,
@@ -265,5 +443,12 @@ class PasswordAnalyzer:
                              'digits': False, 'symbols': False, 'count': 0},
             'entropy': 0,
             'crack_time': 'Instantáneo',
-            'is_common': True
-        }
\ No newline at end of file
+            'is_common': True,
+            'breach_count': None,
+            'dictionary_words': None,
+            'guesses': 0,
+            'guesses_log10': 0.0,
+            'crack_seconds': self._crack_seconds(0),
+            'markov_bits': None,
+            'pcfg_bits': None
+        })
\ No newline at end of file
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de rendimiento del analizador y del generador
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from analyzer import PasswordAnalyzer
+from bulk import BulkSummary, iter_passwords
+from generator import AMBIGUOUS, PasswordGenerator
+
+WORDS = ['password', 'admin', 'qwerty', 'dragon', 'amor', 'familia',
+         'verano', 'casa', 'sunshine', 'princess', 'clave', 'monkey']
+
+
+def synthetic_corpus(size, seed=1234):
+    """
+    Genera un corpus sintético y reproducible de contraseñas variadas
+    """
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "!@#$%&*"
+    corpus = []
+    for _ in range(size):
+        kind = rng.random()
+        if kind < 0.4:
+            password = rng.choice(WORDS) + str(rng.randrange(10000))
+        elif kind < 0.7:
+            password = ''.join(rng.choice(alphabet) for _ in range(rng.randrange(6, 20)))
+        elif kind < 0.9:
+            password = rng.choice(WORDS).capitalize() + rng.choice("!@#$") + str(rng.randrange(1950, 2030))
+        else:
+            password = rng.choice(string.ascii_lowercase) * rng.randrange(3, 12)
+        corpus.append(password)
+    return corpus
+
+
+def _corpus_short_ascii(rng, size):
+    alphabet = string.ascii_letters + string.digits + string.punctuation
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randrange(4, 13)))
+            for _ in range(size)]
+
+
+def _corpus_long_ascii(rng, size):
+    alphabet = string.ascii_letters + string.digits + string.punctuation
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randrange(32, 129)))
+            for _ in range(size)]
+
+
+def _corpus_unicode(rng, size):
+    alphabet = ('áéíóúñüÁÉÍÓÚÑçàèöß' + 'абвгдежзийклмн' + '密码安全中文字' + '😀🔒🐍🔑' +
+                string.ascii_letters + string.digits)
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randrange(6, 24)))
+            for _ in range(size)]
+
+
+def _corpus_dictionary(rng, size):
+    leet = str.maketrans('aeios', '@310$')
+    corpus = []
+    for _ in range(size):
+        words = [rng.choice(WORDS) for _ in range(rng.randrange(1, 4))]
+        password = ''.join(word.capitalize() if rng.random() < 0.5 else word for word in words)
+        if rng.random() < 0.5:
+            password = password.translate(leet)
+        corpus.append(password + str(rng.randrange(100)))
+    return corpus
+
+
+def _corpus_repetition(rng, size):
+    units = ['a', 'ab', '1', '12', '123', 'abc', '!', 'qwerty', 'aA1!']
+    return [rng.choice(units) * rng.randrange(3, 256 // 2) for _ in range(size)]
+
+
+# Corpus fijos y reproducibles para la suite (misma semilla = mismas contraseñas)
+SUITE_CORPORA = {
+    'short_ascii': _corpus_short_ascii,
+    'long_ascii': _corpus_long_ascii,
+    'unicode': _corpus_unicode,
+    'dictionary': _corpus_dictionary,
+    'repetition': _corpus_repetition,
+}
+
+
+def suite_corpus(name, size, seed=1234):
+    """
+    Devuelve uno de los corpus fijos de la suite
+    """
+    return SUITE_CORPORA[name](random.Random(f"{name}:{seed}"), size)
+
+
+def _timed_calls(func, inputs, record=True):
+    """
+    Ejecuta func sobre cada entrada y devuelve la latencia de cada llamada (ns).
+    Con record=False solo ejecuta (para medir memoria sin la lista de tiempos)
+    """
+    if not record:
+        for item in inputs:
+            func(item)
+        return []
+    clock = time.perf_counter_ns
+    latencies = []
+    for item in inputs:
+        start = clock()
+        func(item)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def _timed_stream(iterable, consume, record=True):
+    """
+    Latencia de cada paso de un iterador (lectura + análisis + consumo)
+    """
+    if not record:
+        for item in iterable:
+            consume(item)
+        return []
+    clock = time.perf_counter_ns
+    latencies = []
+    iterator = iter(iterable)
+    while True:
+        start = clock()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            break
+        consume(item)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def _percentile(ordered, percent):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def _suite_cases(size, seed, workdir):
+    """
+    Casos de la suite: nombre -> función(record) que ejecuta una pasada y
+    devuelve sus latencias
+    """
+    analyzer = PasswordAnalyzer()
+    generator = PasswordGenerator()
+    cases = {}
+    # Análisis completo: se materializan todos los campos del resultado perezoso
+    def analyze(password):
+        return analyzer.analyze_password(password).materialize()
+
+    for name in SUITE_CORPORA:
+        corpus = suite_corpus(name, size, seed)
+        cases[f'analyze/{name}'] = (
+            lambda record, corpus=corpus: _timed_calls(analyze, corpus, record))
+
+    count = range(size)
+    cases['generate/password'] = (
+        lambda record: _timed_calls(lambda _: generator.generate_password(16), count, record))
+    cases['generate/pronounceable'] = (
+        lambda record: _timed_calls(lambda _: generator.generate_pronounceable(12), count,
+                                    record))
+
+    # El bucle del análisis masivo: lectura en streaming + resumen
+    path = os.path.join(workdir, f'bulk-{size}.txt')
+    with open(path, 'w', encoding='utf-8') as out:
+        out.writelines(password + '\n' for password in synthetic_corpus(size, seed))
+
+    def bulk(record):
+        summary = BulkSummary()
+        return _timed_stream(analyzer.analyze_stream(iter_passwords(path)), summary.add, record)
+
+    cases['bulk/mass_analysis'] = bulk
+    return cases
+
+
+def run_suite(size=20000, repeat=3, seed=1234, cases=None, memory_size=5000):
+    """
+    Ejecuta la suite y devuelve un dict serializable a JSON. De cada caso se
+    guarda la mejor de 'repeat' pasadas (ops/s y percentiles de latencia) y
+    el pico de memoria de una pasada adicional con tracemalloc
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        selected = _suite_cases(size, seed, workdir)
+        memory_cases = _suite_cases(min(size, memory_size), seed, workdir)
+        for name, run in selected.items():
+            if cases and name not in cases:
+                continue
+            best = None
+            for _ in range(repeat):
+                latencies = run(True)
+                total = sum(latencies)
+                if best is None or total < best[0]:
+                    best = (total, latencies)
+            total, latencies = best
+            latencies.sort()
+
+            tracemalloc.start()
+            memory_cases[name](False)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results[name] = {
+                'calls': len(latencies),
+                'ops_per_sec': round(len(latencies) / (total / 1e9), 1) if total else 0.0,
+                'p50_us': round(_percentile(latencies, 50) / 1000, 3),
+                'p90_us': round(_percentile(latencies, 90) / 1000, 3),
+                'p99_us': round(_percentile(latencies, 99) / 1000, 3),
+                'peak_kib': round(peak / 1024, 1),
+            }
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'size': size,
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare_results(current, baseline, threshold=0.10):
+    """
+    Compara ops/s con una línea base. Devuelve filas
+    (caso, ops base, ops actual, variación, es_regresión)
+    """
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None or not base['ops_per_sec']:
+            continue
+        change = result['ops_per_sec'] / base['ops_per_sec'] - 1
+        rows.append((name, base['ops_per_sec'], result['ops_per_sec'], change,
+                     change < -threshold))
+    return rows
+
+
+def bench_suite(args):
+    """
+    Suite reproducible con salida JSON y comparación con línea base
+    """
+    report = run_suite(args.size or 20000, args.repeat, args.seed, args.cases)
+    print(f"{'caso':24}  {'ops/s':>12}  {'p50 µs':>9}  {'p90 µs':>9}  {'p99 µs':>9}  {'pico KiB':>9}")
+    for name, result in report['results'].items():
+        print(f"{name:24}  {result['ops_per_sec']:12,.0f}  {result['p50_us']:9.2f}  "
+              f"{result['p90_us']:9.2f}  {result['p99_us']:9.2f}  {result['peak_kib']:9.1f}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as out:
+            json.dump(report, out, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.save}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as source:
+        baseline = json.load(source)
+    if baseline['meta'].get('size') != report['meta']['size']:
+        print(f"⚠️  La línea base usa otro tamaño de corpus ({baseline['meta'].get('size')})")
+
+    print(f"\nComparación con {args.baseline} (umbral {args.threshold:.0%}):")
+    regressions = 0
+    for name, base_ops, ops, change, regressed in compare_results(report, baseline,
+                                                                   args.threshold):
+        regressions += regressed
+        mark = '❌ REGRESIÓN' if regressed else '✅'
+        print(f"{name:24}  {base_ops:12,.0f} -> {ops:12,.0f}  {change:+7.1%}  {mark}")
+    return 1 if regressions else 0
+
+
+def bench_parallel(size=200000, chunksize=1000, max_workers=None):
+    """
+    Mide el rendimiento de analyze_many con distinto número de procesos
+    """
+    import pickle
+    import parallel
+    analyzer = PasswordAnalyzer()
+    corpus = synthetic_corpus(size)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # Techo de la aceleración: el proceso principal recibe y reconstruye
+    # todos los resultados, así que no puede pasar de cálculo / recepción
+    fields = ('score', 'strength')
+    sample = corpus[:20000]
+    parallel._init_worker(analyzer)
+    start = time.perf_counter()
+    data = pickle.dumps(parallel._analyze_chunk(sample, fields), pickle.HIGHEST_PROTOCOL)
+    compute = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in parallel._receive(analyzer, sample, pickle.loads(data), fields):
+        pass
+    receive = time.perf_counter() - start
+    print(f"Por contraseña: {compute / len(sample) * 1e6:.1f} µs en el trabajador, "
+          f"{receive / len(sample) * 1e6:.1f} µs en el proceso principal "
+          f"(techo ≈ {compute / receive:.0f}x); {os.cpu_count()} núcleos")
+
+    workers = 1
+    baseline = None
+    print(f"{'procesos':>8}  {'contraseñas/s':>14}  {'aceleración':>11}")
+    while workers <= max_workers:
+        start = time.perf_counter()
+        count = sum(1 for _ in analyzer.analyze_many(corpus, workers=workers, chunksize=chunksize))
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed
+        baseline = baseline or rate
+        print(f"{workers:8}  {rate:14,.0f}  {rate / baseline:10.2f}x")
+        workers *= 2
+
+
+def bench_generator(count=100000, length=16):
+    """
+    Compara generate_password en bucle con el motor por lotes
+    """
+    generator = PasswordGenerator()
+
+    def write_devnull():
+        with open(os.devnull, 'w') as out:
+            generator.write_passwords(out, count, length=length)
+
+    paths = [
+        ('generate_password', lambda: [generator.generate_password(length) for _ in range(count)]),
+        ('generate_batch', lambda: sum(1 for _ in generator.generate_batch(count, length=length))),
+        ('write_passwords', write_devnull),
+    ]
+    baseline = None
+    print(f"{'método':>18}  {'contraseñas/s':>14}  {'aceleración':>11}")
+    for name, run in paths:
+        start = time.perf_counter()
+        run()
+        rate = count / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{name:>18}  {rate:14,.0f}  {rate / baseline:10.2f}x")
+
+
+# Política de ejemplo del benchmark de generación restringida: longitud
+# fija, sin ambiguos ni palabras de la empresa y sin repeticiones
+CONSTRAINED_POLICY = [('min_length', 10), ('max_length', 10),
+                      ('require_classes', ['lowercase', 'uppercase', 'digits', 'symbols']),
+                      ('banned_substrings', ['acme', 'admin', 'password']),
+                      ('max_repeat', 1), ('min_score', 70)]
+
+
+def bench_constrained(count=2000, targets=(80, 90, 95)):
+    """
+    Compara generar y analizar hasta cumplir las restricciones (reintentos,
+    con la misma longitud) con la generación restringida, que acierta a la
+    primera. La preparación del espacio cuenta en su tiempo
+    """
+    from policy import Policy
+    generator = PasswordGenerator()
+    analyzer = PasswordAnalyzer()
+    cases = [(f"score>={target}", {'min_score': target},
+              lambda password, target=target: analyzer.analyze_password(password)['score'] >= target)
+             for target in targets]
+    policy = Policy(CONSTRAINED_POLICY, 'benchmark', analyzer)
+    cases.append(('política', {'policy': policy, 'exclude_ambiguous': True},
+                  lambda password: not set(password) & set(AMBIGUOUS) and
+                  policy.check(password) is None))
+
+    print(f"{'caso':>10}  {'longitud':>8}  {'bits':>6}  {'reintentos/s':>12}  "
+          f"{'intentos':>8}  {'restringida/s':>13}  {'aceleración':>11}")
+    for label, options, accept in cases:
+        start = time.perf_counter()
+        space = generator.constrained(analyzer=analyzer, **options)
+        setup = time.perf_counter() - start
+
+        attempts = 0
+        start = time.perf_counter()
+        for _ in range(count):
+            while True:
+                attempts += 1
+                password = generator.generate_password(
+                    space.length, exclude_ambiguous=options.get('exclude_ambiguous', False))
+                if accept(password):
+                    break
+        retry_rate = count / (time.perf_counter() - start)
+
+        failures = sum(not accept(password) for password in space.generate_batch(count))
+        if failures:
+            print(f"⚠️  {label}: {failures} contraseñas restringidas no cumplen")
+        # La comprobación no cuenta: se mide solo la generación
+        start = time.perf_counter()
+        for _ in space.generate_batch(count):
+            pass
+        constrained_rate = count / (time.perf_counter() - start + setup)
+        print(f"{label:>10}  {space.length:>8}  {space.entropy:6.1f}  {retry_rate:12,.0f}  "
+              f"{attempts / count:8.2f}  {constrained_rate:13,.0f}  "
+              f"{constrained_rate / retry_rate:10.2f}x")
+
+
+def bench_vectorized(size=200000):
+    """
+    Compara el análisis escalar con el camino vectorizado y verifica la paridad
+    """
+    import vectorized
+    if not vectorized.HAS_NUMPY:
+        print("NumPy no está instalado: se omite el benchmark vectorizado")
+        return
+
+    analyzer = PasswordAnalyzer()
+    corpus = synthetic_corpus(size)
+    mismatches = vectorized.check_parity(analyzer, corpus[:20000])
+    print(f"Paridad con analyze_password: {'OK' if not mismatches else f'{len(mismatches)} filas distintas'}")
+
+    start = time.perf_counter()
+    for password in corpus:
+        analyzer.analyze_password(password)
+    scalar_rate = size / (time.perf_counter() - start)
+    start = time.perf_counter()
+    vectorized.analyze_batch(analyzer, corpus)
+    vector_rate = size / (time.perf_counter() - start)
+    print(f"{'escalar':>12}  {scalar_rate:14,.0f} contraseñas/s")
+    print(f"{'vectorizado':>12}  {vector_rate:14,.0f} contraseñas/s  ({vector_rate / scalar_rate:.2f}x)")
+
+
+BENCHMARKS = {
+    'parallel': lambda args: bench_parallel(args.size or 200000, args.chunksize, args.max_workers),
+    'generator': lambda args: bench_generator(args.size or 100000),
+    'vectorized': lambda args: bench_vectorized(args.size or 200000),
+    'constrained': lambda args: bench_constrained(args.size or 2000),
+    'suite': bench_suite,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks del Password Security Toolkit')
+    parser.add_argument('benchmarks', nargs='*', default=['parallel', 'generator', 'vectorized'],
+                       help=f"Benchmarks a ejecutar ({', '.join(BENCHMARKS)})")
+    parser.add_argument('--size', type=int, default=None,
+                       help='Número de contraseñas del corpus sintético')
+    parser.add_argument('--chunksize', type=int, default=1000,
+                       help='Tamaño de bloque para el análisis paralelo')
+    parser.add_argument('--max-workers', type=int, default=None,
+                       help='Máximo de procesos a probar')
+    parser.add_argument('--repeat', type=int, default=3,
+                       help='Pasadas por caso de la suite (se guarda la mejor)')
+    parser.add_argument('--seed', type=int, default=1234,
+                       help='Semilla de los corpus de la suite')
+    parser.add_argument('--cases', nargs='+', metavar='CASO',
+                       help='Casos de la suite a ejecutar (por defecto, todos)')
+    parser.add_argument('--save', metavar='ARCHIVO',
+                       help='Guardar los resultados de la suite en JSON')
+    parser.add_argument('--baseline', metavar='ARCHIVO',
+                       help='JSON de referencia con el que comparar la suite')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                       help='Caída de ops/s que se considera regresión (0.10 = 10%%)')
+    args = parser.parse_args()
+
+    status = 0
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"Benchmark desconocido: {name}")
+        print(f"\n== {name} ==")
+        status = BENCHMARKS[name](args) or status
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,355 @@
+import bz2
+import csv
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import lzma
+import os
+import sys
+from collections import deque
+
+# Apertura según la extensión del archivo comprimido
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open,
+    '.bz2': bz2.open,
+}
+
+
+def open_source(path):
+    """
+    Abre una fuente de contraseñas en modo binario ('-' es la entrada estándar)
+    """
+    if path == '-':
+        return sys.stdin.buffer
+    for extension, opener in COMPRESSED_OPENERS.items():
+        if path.endswith(extension):
+            return opener(path, 'rb')
+    return open(path, 'rb', buffering=io.DEFAULT_BUFFER_SIZE * 16)
+
+
+def iter_passwords(paths, encoding='utf-8'):
+    """
+    Lee contraseñas línea a línea de forma perezosa, sin cargar los archivos
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    for path in paths:
+        source = open_source(path)
+        try:
+            for raw in source:
+                password = raw.decode(encoding, errors='replace').strip()
+                if password:
+                    yield password
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+
+
+def iter_accounts(paths, separator=None, encoding='utf-8'):
+    """
+    Pares (contraseña, usuario) de líneas 'usuario SEP contraseña'. Sin
+    separador, o si la línea no lo tiene, el usuario es None
+    """
+    for line in iter_passwords(paths, encoding):
+        if separator and separator in line:
+            user, _, password = line.partition(separator)
+            yield password, user
+        else:
+            yield line, None
+
+
+class PasswordReader:
+    """
+    Como iter_passwords, pero sabe en qué archivo y en qué byte va, para
+    poder guardar un punto de control y reanudar desde él. 'start' es la
+    posición (archivo, byte) y 'lines' las contraseñas ya leídas antes.
+
+    Cada 'mark_every' contraseñas se anota en 'marks' la posición justo
+    después de la última leída, porque con varios procesos la lectura va
+    por delante de los resultados ya procesados
+    """
+    def __init__(self, paths, start=(0, 0), lines=0, mark_every=0, encoding='utf-8'):
+        if isinstance(paths, str):
+            paths = [paths]
+        self.paths = list(paths)
+        self.file_index, self.offset = start
+        self.lines = lines
+        self.mark_every = mark_every
+        self.marks = deque()
+        self.encoding = encoding
+        # Tamaño de cada archivo (None si está comprimido o es stdin)
+        self.sizes = [os.path.getsize(path) if path != '-' and not _is_compressed(path)
+                      else None for path in self.paths]
+
+    @property
+    def position(self):
+        return self.file_index, self.offset
+
+    @property
+    def bytes_total(self):
+        """
+        Bytes de la entrada, o None si no se conocen de antemano
+        """
+        return None if None in self.sizes else sum(self.sizes)
+
+    @property
+    def bytes_read(self):
+        return sum(size or 0 for size in self.sizes[:self.file_index]) + self.offset
+
+    def __iter__(self):
+        mark_every, marks, encoding = self.mark_every, self.marks, self.encoding
+        for index in range(self.file_index, len(self.paths)):
+            offset = self.offset if index == self.file_index else 0
+            self.file_index, self.offset = index, offset
+            source = open_source(self.paths[index])
+            try:
+                if offset:
+                    if source is sys.stdin.buffer:
+                        raise ValueError("No se puede reanudar la lectura de la entrada estándar")
+                    # Los comprimidos descomprimen hasta la posición, sin analizar nada
+                    source.seek(offset)
+                for raw in source:
+                    offset += len(raw)
+                    password = raw.decode(encoding, errors='replace').strip()
+                    if password:
+                        self.offset = offset
+                        self.lines += 1
+                        if mark_every and not self.lines % mark_every:
+                            marks.append((self.lines, index, offset))
+                        yield password
+                self.offset = offset
+            finally:
+                if source is not sys.stdin.buffer:
+                    source.close()
+
+
+def _is_compressed(path):
+    return path.endswith(tuple(COMPRESSED_OPENERS))
+
+
+class BulkSummary:
+    """
+    Resumen incremental de un análisis masivo (memoria constante)
+    """
+    def __init__(self):
+        self.total = 0
+        self.strength_counts = {}
+
+    def to_dict(self):
+        return {'total': self.total, 'strength_counts': dict(self.strength_counts)}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reconstruye un resumen parcial guardado con to_dict()
+        """
+        summary = cls()
+        summary.total = data['total']
+        summary.strength_counts = dict(data['strength_counts'])
+        return summary
+
+    def add(self, analysis):
+        """
+        Acumula el resultado de un análisis en el resumen
+        """
+        strength = analysis['strength']
+        self.total += 1
+        self.strength_counts[strength] = self.strength_counts.get(strength, 0) + 1
+
+
+# Columnas por defecto de la salida estructurada
+DEFAULT_COLUMNS = ('password', 'length', 'score', 'strength', 'entropy', 'crack_time',
+                   'is_common', 'patterns')
+PLAINTEXT_MODES = ('show', 'omit', 'hash')
+
+
+def parse_columns(text):
+    """
+    Convierte 'score,strength,...' en una tupla de columnas válidas
+    """
+    from result import FIELD_SET
+    columns = tuple(name.strip() for name in text.split(',') if name.strip())
+    unknown = [name for name in columns if name not in FIELD_SET]
+    if unknown:
+        raise ValueError(f"Columnas desconocidas: {', '.join(unknown)}")
+    if not columns:
+        raise ValueError("Hay que indicar al menos una columna")
+    return columns
+
+
+def password_digest(password, key=None):
+    """
+    SHA-256 en hexadecimal de la contraseña (HMAC-SHA256 si hay clave)
+    """
+    data = password.encode('utf-8', errors='surrogatepass')
+    if key is not None:
+        if isinstance(key, str):
+            key = key.encode('utf-8')
+        return hmac.new(key, data, hashlib.sha256).hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultWriter:
+    """
+    Escritor en streaming de análisis, una fila por contraseña. Las filas se
+    acumulan en memoria y se escriben (y se hace flush) cada 'flush_every'
+    filas, para que otras herramientas puedan leer el archivo mientras crece.
+
+    plaintext: 'show' deja la contraseña, 'omit' quita la columna y 'hash'
+    la sustituye por 'password_hash' (SHA-256, o HMAC-SHA256 con hash_key).
+    Con append=True se continúa un archivo ya empezado (sin repetir cabecera)
+    """
+    def __init__(self, stream, columns=DEFAULT_COLUMNS, plaintext='show', hash_key=None,
+                 flush_every=10000, append=False):
+        if plaintext not in PLAINTEXT_MODES:
+            raise ValueError(f"Modo de texto plano desconocido: {plaintext}")
+        self.stream = stream
+        self.plaintext = plaintext
+        self.hash_key = hash_key.encode('utf-8') if isinstance(hash_key, str) else hash_key
+        self.flush_every = max(1, flush_every)
+        self.append = append
+        self.rows = 0
+        self.columns = tuple(name for name in columns
+                             if name != 'password' or plaintext != 'omit')
+        self.header = tuple('password_hash' if name == 'password' and plaintext == 'hash'
+                            else name for name in self.columns)
+        # Campos que hay que calcular en el análisis
+        self.fields = tuple(name for name in self.columns if name != 'password')
+        self._pending = 0
+
+    def _password_value(self, password):
+        if self.plaintext == 'show':
+            return password
+        return password_digest(password, self.hash_key)
+
+    def values(self, analysis):
+        """
+        Valores de las columnas seleccionadas para un análisis
+        """
+        return [self._password_value(analysis['password']) if name == 'password'
+                else analysis[name] for name in self.columns]
+
+    def write(self, analysis):
+        self._write_row(self.values(analysis))
+        self.rows += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def write_all(self, analyses):
+        for analysis in analyses:
+            self.write(analysis)
+        self.flush()
+
+    def flush(self):
+        self._drain()
+        self.stream.flush()
+        self._pending = 0
+
+    def tell(self):
+        """
+        Bytes escritos en el archivo de salida tras un flush (None en stdout
+        o en una tubería)
+        """
+        self.flush()
+        if self.stream in (sys.stdout, sys.stderr):
+            return None
+        try:
+            return self.stream.tell()
+        except OSError:
+            return None
+
+    def close(self):
+        self.flush()
+        if self.stream not in (sys.stdout, sys.stderr):
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonlWriter(ResultWriter):
+    """
+    Un objeto JSON por línea (jq, DuckDB read_json, Spark)
+    """
+    def __init__(self, stream, *args, **kwargs):
+        super().__init__(stream, *args, **kwargs)
+        self._lines = []
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+    def _write_row(self, values):
+        self._lines.append(self._encode(dict(zip(self.header, values))))
+
+    def _drain(self):
+        if self._lines:
+            self._lines.append('')
+            self.stream.write('\n'.join(self._lines))
+            self._lines = []
+
+
+class CsvWriter(ResultWriter):
+    """
+    CSV con cabecera. Las listas se unen con ';' y los dicts van como JSON
+    """
+    def __init__(self, stream, *args, **kwargs):
+        super().__init__(stream, *args, **kwargs)
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer, lineterminator='\n')
+        if not self.append:
+            self._csv.writerow(self.header)
+
+    def _write_row(self, values):
+        self._csv.writerow([_csv_value(value) for value in values])
+
+    def _drain(self):
+        if self._buffer.tell():
+            self.stream.write(self._buffer.getvalue())
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if value is True or value is False:
+        return 'true' if value else 'false'
+    if isinstance(value, list):
+        return ';'.join(map(str, value))
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(',', ':'))
+    return value
+
+
+WRITERS = {
+    'jsonl': JsonlWriter,
+    'csv': CsvWriter,
+}
+
+
+def open_writer(output_format, path=None, truncate_at=None, **kwargs):
+    """
+    Crea el escritor del formato indicado sobre un archivo o stdout ('-').
+    Con 'truncate_at' se reanuda un archivo existente: se descarta lo escrito
+    después de ese byte (filas posteriores al último punto de control)
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Formato de salida desconocido: {output_format}")
+    if path in (None, '-'):
+        stream = sys.stdout
+    elif truncate_at:
+        stream = open(path, 'r+', encoding='utf-8', newline='',
+                      buffering=io.DEFAULT_BUFFER_SIZE * 16)
+        stream.seek(truncate_at)
+        stream.truncate()
+        kwargs['append'] = True
+    else:
+        stream = open(path, 'w', encoding='utf-8', newline='',
+                      buffering=io.DEFAULT_BUFFER_SIZE * 16)
+    return WRITERS[output_format](stream, **kwargs)
@@ -0,0 +1,116 @@
+import hashlib
+import heapq
+import os
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize', 'evictions'])
+
+POLICIES = ('lru', 'lfu')
+
+
+class ResultCache:
+    """
+    Caché acotada de análisis para contraseñas repetidas. Las claves son un
+    hash con clave secreta (BLAKE2b), así que la contraseña en claro nunca se
+    guarda como clave del diccionario
+    """
+    def __init__(self, maxsize=100000, policy='lru'):
+        if policy not in POLICIES:
+            raise ValueError(f"Política de caché desconocida: {policy}")
+        if maxsize < 1:
+            raise ValueError("El tamaño de la caché debe ser al menos 1")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._secret = os.urandom(32)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # clave -> [valor, apariciones]
+        self._entries = {}
+        # LRU: orden de uso; LFU: cubos por frecuencia con orden de llegada
+        self._order = OrderedDict()
+        self._buckets = {}
+        self._min_count = 0
+
+    def key(self, password):
+        """
+        Hash con clave de la contraseña, usado como clave de la caché
+        """
+        return hashlib.blake2b(password.encode('utf-8', errors='surrogatepass'),
+                               key=self._secret, digest_size=16).digest()
+
+    def get(self, key):
+        """
+        Devuelve el valor guardado (o None) y actualiza contadores
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch(key, entry)
+        return entry[0]
+
+    def put(self, key, value):
+        """
+        Guarda un valor, expulsando una entrada si la caché está llena
+        """
+        if key in self._entries:
+            self._entries[key][0] = value
+            return
+        if len(self._entries) >= self.maxsize:
+            self._evict()
+        self._entries[key] = [value, 1]
+        if self.policy == 'lru':
+            self._order[key] = None
+        else:
+            self._buckets.setdefault(1, OrderedDict())[key] = None
+            self._min_count = 1
+
+    def _touch(self, key, entry):
+        count = entry[1]
+        entry[1] = count + 1
+        if self.policy == 'lru':
+            self._order.move_to_end(key)
+            return
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def _evict(self):
+        if self.policy == 'lru':
+            key, _ = self._order.popitem(last=False)
+        else:
+            bucket = self._buckets[self._min_count]
+            key, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self._buckets[self._min_count]
+                self._min_count = min(self._buckets, default=0)
+        del self._entries[key]
+        self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def info(self):
+        """
+        Estadísticas de aciertos y fallos para ajustar el tamaño de la caché
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries), self.evictions)
+
+    def most_common(self, n=10):
+        """
+        Entradas residentes más repetidas como (hash hex, apariciones, valor)
+        """
+        ranked = heapq.nlargest(n, self._entries.items(), key=lambda item: item[1][1])
+        return [(key.hex(), entry[1], entry[0]) for key, entry in ranked]
+
+    def clear(self):
+        self._entries.clear()
+        self._order.clear()
+        self._buckets.clear()
+        self._min_count = 0
@@ -0,0 +1,197 @@
+"""
+Puntos de control y progreso para análisis masivos largos. El punto de
+control (JSON) guarda la posición en bytes de la entrada, el resumen
+parcial y cuánto se había escrito en la salida, así que --resume sigue
+donde se quedó sin volver a analizar nada
+"""
+
+import json
+import os
+import sys
+import time
+
+VERSION = 1
+
+
+class CheckpointError(ValueError):
+    """
+    Punto de control ilegible o que no corresponde a la ejecución actual
+    """
+
+
+def _fingerprint(path):
+    # Tamaño y fecha de modificación: si cambian, la posición guardada no vale
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class Checkpoint:
+    """
+    Punto de control de un análisis sobre 'paths'. load() lee y valida el
+    estado guardado (None si no hay), save() lo reescribe de forma atómica
+    """
+    def __init__(self, path, paths, every=100000):
+        if every < 1:
+            raise CheckpointError("El intervalo del punto de control debe ser al menos 1")
+        if '-' in paths:
+            raise CheckpointError("No se puede reanudar la entrada estándar: usa archivos")
+        self.path = path
+        self.paths = list(paths)
+        self.every = every
+        self.state = None
+
+    def load(self):
+        """
+        Estado guardado, o None si aún no hay punto de control
+        """
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            raise CheckpointError(f"Punto de control ilegible ({self.path}): {e}")
+        if state.get('version') != VERSION:
+            raise CheckpointError(f"Versión de punto de control no soportada: {self.path}")
+        if state['paths'] != self.paths:
+            raise CheckpointError("El punto de control es de otros archivos: "
+                                  f"{', '.join(state['paths'])}")
+        # Solo hace falta que no hayan cambiado los archivos aún no terminados
+        for index in range(state['position'][0], len(self.paths)):
+            if state['fingerprints'][index] != _fingerprint(self.paths[index]):
+                raise CheckpointError(f"{self.paths[index]} ha cambiado desde el punto de control")
+        self.state = state
+        return state
+
+    def output_offset(self, output):
+        """
+        Bytes válidos de la salida al reanudar. 'output' describe la salida
+        actual (formato, archivo, columnas...) y debe coincidir con la guardada
+        """
+        if self.state is None:
+            return None
+        if self.state['output'] is None or self.state['output']['spec'] != output:
+            raise CheckpointError("La salida no coincide con la del punto de control "
+                                  "(mismo --format, --out, --columns y --plaintext)")
+        return self.state['output']['offset']
+
+    def save(self, position, lines, summary, output=None, output_offset=None):
+        """
+        Guarda la posición (archivo, byte), las contraseñas procesadas y el
+        resumen parcial. Se escribe en un temporal y se renombra, así que un
+        corte a mitad nunca deja un punto de control a medias
+        """
+        state = {
+            'version': VERSION,
+            'paths': self.paths,
+            'fingerprints': [_fingerprint(path) for path in self.paths],
+            'position': list(position),
+            'lines': lines,
+            'summary': summary.to_dict(),
+            'output': None if output is None else {'spec': output, 'offset': output_offset},
+            'saved_at': time.time(),
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.state = state
+
+    def remove(self):
+        """
+        Borra el punto de control al terminar el análisis completo
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def memory_mb():
+    """
+    Memoria residente actual del proceso en MB (el pico si no hay /proc),
+    o None si la plataforma no la ofrece
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02}:{seconds % 60:02}"
+
+
+class ProgressReporter:
+    """
+    Progreso por stderr: contraseñas, contraseñas por segundo, ETA (si se
+    conoce el tamaño de la entrada) y memoria. update() se llama en cada
+    contraseña pero solo consulta el reloj cada 'stride' llamadas y solo
+    escribe cada 'interval' segundos, así que no frena el bucle
+    """
+    def __init__(self, reader, interval=1.0, file=None, stride=1024):
+        self.reader = reader
+        self.interval = interval
+        self.file = file or sys.stderr
+        self.stride = stride
+        self._tty = hasattr(self.file, 'isatty') and self.file.isatty()
+        self._start_time = time.monotonic()
+        self._start_lines = reader.lines
+        self._start_bytes = reader.bytes_read
+        self._last_report = self._start_time
+        self._next_check = reader.lines + stride
+        self._width = 0
+
+    def update(self, lines):
+        if lines < self._next_check:
+            return
+        self._next_check = lines + self.stride
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._write(self.status(lines, now))
+
+    def status(self, lines, now=None):
+        """
+        Línea de estado con el progreso actual
+        """
+        elapsed = max((now or time.monotonic()) - self._start_time, 1e-9)
+        parts = [f"{lines:,} contraseñas", f"{(lines - self._start_lines) / elapsed:,.0f}/s"]
+        total = self.reader.bytes_total
+        if total:
+            done = self.reader.bytes_read
+            parts.append(f"{done / total:.1%}")
+            speed = (done - self._start_bytes) / elapsed
+            if speed > 0:
+                parts.append(f"ETA {format_duration((total - done) / speed)}")
+        memory = memory_mb()
+        if memory is not None:
+            parts.append(f"{memory:,.0f} MB")
+        return '⏳ ' + ' · '.join(parts)
+
+    def _write(self, text):
+        if self._tty:
+            # Se reescribe la misma línea, borrando los restos de la anterior
+            self.file.write('\r' + text.ljust(self._width))
+            self._width = len(text)
+        else:
+            self.file.write(text + '\n')
+        self.file.flush()
+
+    def finish(self, lines):
+        self._write(self.status(lines))
+        if self._tty:
+            self.file.write('\n')
+            self.file.flush()
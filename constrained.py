@@ -0,0 +1,446 @@
+"""
+Generación de contraseñas que cumplen restricciones por construcción, sin
+generar y analizar en bucle hasta acertar. Las restricciones (alfabeto,
+clases obligatorias, subcadenas prohibidas, repeticiones) se compilan en un
+autómata Aho–Corasick; una tabla cuenta exactamente cuántas contraseñas
+válidas de cada longitud salen de cada estado, y con ella se elige la
+contraseña número r (r uniforme en [0, total)) carácter a carácter. Cada
+contraseña válida es equiprobable y la entropía del espacio es exactamente
+log2(total)
+"""
+
+import math
+import secrets
+from bisect import bisect_right
+from collections import deque
+
+from dictionary import LEET_ALTERNATIVE, LEET_TABLE
+
+CLASS_NAMES = ('lowercase', 'uppercase', 'digits', 'symbols')
+MAX_LENGTH = 128
+# Cota de variantes leetspeak por palabra prohibida
+MAX_LEET_VARIANTS = 4096
+# Cota de variantes de todas las palabras del diccionario del analizador
+MAX_DICTIONARY_SPELLINGS = 200000
+
+
+def _leet_sources(table):
+    # Caracteres que el leetspeak convierte en cada letra ('a' <- '4', '@')
+    sources = {}
+    for source, target in table.items():
+        sources.setdefault(target, []).append(chr(source))
+    return sources
+
+
+_LEET_SOURCES = _leet_sources(LEET_TABLE)
+# Variante de DictionaryMatcher en la que '1' y '|' se leen como 'l'
+_LEET_ALTERNATIVE_SOURCES = _leet_sources({**LEET_TABLE, **LEET_ALTERNATIVE})
+
+
+def leet_spellings(word, limit=MAX_LEET_VARIANTS, sources=_LEET_SOURCES):
+    """
+    Todas las formas de escribir la palabra (en minúsculas) con leetspeak:
+    prohibirlas todas equivale a prohibir la palabra tras normalizar
+    """
+    spellings = ['']
+    for ch in word.lower().translate(LEET_TABLE):
+        options = [ch] + sources.get(ch, [])
+        spellings = [prefix + option for prefix in spellings for option in options]
+        if len(spellings) > limit:
+            raise ValueError(f"Demasiadas variantes leetspeak para prohibir '{word}'")
+    return spellings
+
+
+def dictionary_spellings(dictionary, limit=MAX_DICTIONARY_SPELLINGS):
+    """
+    Formas de escribir las palabras de un DictionaryMatcher que este
+    encuentra: las dos lecturas del leetspeak que prueba (con '1' y '|' como
+    'i' o como 'l')
+    """
+    spellings = set()
+    for word_id in range(len(dictionary)):
+        word = dictionary.word(word_id)
+        spellings.update(leet_spellings(word))
+        spellings.update(leet_spellings(word, sources=_LEET_ALTERNATIVE_SOURCES))
+        if len(spellings) > limit:
+            raise ValueError("El diccionario del analizador es demasiado grande para "
+                             "excluir sus palabras por construcción")
+    return spellings
+
+
+class ConstrainedSpace:
+    """
+    Contraseñas de 'classes' (nombre -> caracteres) que incluyen todas las
+    clases de 'required', al menos 'min_classes' clases distintas, ninguna
+    subcadena de 'banned' y como mucho 'max_repeat' caracteres iguales
+    seguidos. Subcadenas y repeticiones se comparan sin distinguir
+    mayúsculas, igual que los patrones del analizador
+    """
+    def __init__(self, classes, required=(), min_classes=0, banned=(), max_repeat=None):
+        unknown = [name for name in list(classes) + list(required) if name not in CLASS_NAMES]
+        if unknown:
+            raise ValueError(f"Clases de caracteres desconocidas: {unknown}")
+        missing = [name for name in required if not classes.get(name)]
+        if missing:
+            raise ValueError(f"Clases obligatorias sin caracteres disponibles: {missing}")
+        self.classes = {name: chars for name, chars in classes.items() if chars}
+        if not self.classes:
+            raise ValueError("No queda ningún carácter disponible")
+        self.required = tuple(required)
+        self.min_classes = min_classes
+        self.max_repeat = max_repeat
+
+        bits = {name: 1 << index for index, name in enumerate(CLASS_NAMES)}
+        alphabet = [(ch, bits[name]) for name, chars in self.classes.items()
+                    for ch in dict.fromkeys(chars)]
+        words = {word.lower() for word in banned if word}
+        if max_repeat:
+            words.update({ch.lower() * (max_repeat + 1) for ch, _ in alphabet})
+        self._build(alphabet, words)
+
+        required_mask = sum(bits[name] for name in self.required)
+        # Máscaras de clases vistas con las que una contraseña completa es válida
+        self._final = [int(mask & required_mask == required_mask and
+                           bin(mask).count('1') >= min_classes) for mask in range(16)]
+        self._table = [[self._final] * len(self._own)]
+        self._cumulative = []
+
+    def _build(self, alphabet, words):
+        """
+        Autómata de las subcadenas prohibidas sobre los caracteres en
+        minúscula
+        """
+        symbols = {ch.lower() for ch, _ in alphabet}
+        goto = [{}]
+        terminal = [False]
+        for word in words:
+            if not set(word) <= symbols:
+                continue  # No se puede formar con el alfabeto
+            state = 0
+            for ch in word:
+                if ch not in goto[state]:
+                    goto.append({})
+                    terminal.append(False)
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            terminal[state] = True
+
+        def step(state, ch):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            return goto[state].get(ch, 0)
+
+        # Enlaces de fallo en anchura
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        bfs = [0]
+        while queue:
+            state = queue.popleft()
+            bfs.append(state)
+            terminal[state] = terminal[state] or terminal[fail[state]]
+            for ch, child in goto[state].items():
+                if state:
+                    fail[child] = step(fail[state], ch)
+                queue.append(child)
+
+        # Solo los estados que no han completado una palabra prohibida, en
+        # orden de anchura: el enlace de fallo de cada uno va antes que él
+        live = [state for state in bfs if not terminal[state]]
+        number = {state: index for index, state in enumerate(live)}
+
+        def target(state, ch):
+            following = step(state, ch.lower())
+            return None if terminal[following] else number[following]
+
+        # Transiciones de la raíz agrupadas por (estado siguiente, clase):
+        # todos los caracteres de un grupo cuentan igual
+        groups = {}
+        for ch, bit in alphabet:
+            following = target(0, ch)
+            if following is not None:
+                groups.setdefault((following, bit), []).append(ch)
+        self._root = [(following, bit, ''.join(chars))
+                      for (following, bit), chars in groups.items()]
+        self._position = {ch: (index, offset) for index, (_, _, chars) in enumerate(self._root)
+                          for offset, ch in enumerate(chars)}
+
+        # Cada estado solo difiere de su enlace de fallo en los caracteres de
+        # su propio nodo: se guardan esas transiciones ('own', None si
+        # completan una palabra prohibida) y las del enlace de fallo a las que
+        # sustituyen ('shadowed')
+        by_symbol = {}
+        for ch, bit in alphabet:
+            by_symbol.setdefault(ch.lower(), []).append((ch, bit))
+        order = {ch: index for index, (ch, _) in enumerate(alphabet)}
+        self._fail = [None]
+        self._own = [[]]
+        self._shadowed = [[]]
+        for state in live[1:]:
+            own, shadowed = [], []
+            for symbol in goto[state]:
+                following = target(state, symbol)
+                previous = target(fail[state], symbol)
+                for ch, bit in by_symbol[symbol]:
+                    own.append((following, bit, ch))
+                    shadowed.append((previous, bit))
+            own.sort(key=lambda item: order[item[2]])
+            self._fail.append(number[fail[state]])
+            self._own.append(own)
+            self._shadowed.append(shadowed)
+
+    def _completions(self, length):
+        """
+        Tabla de 'length' caracteres: para cada estado y máscara de clases
+        vistas, cuántas formas hay de completar una contraseña válida. Junto
+        a cada fila se guardan las sumas acumuladas de los grupos de la raíz
+        """
+        table = self._table
+        while len(table) <= length:
+            previous = table[-1]
+            cumulative = []
+            for mask in range(16):
+                sums = [0]
+                for following, bit, chars in self._root:
+                    sums.append(sums[-1] + len(chars) * previous[following][mask | bit])
+                cumulative.append(sums)
+            self._cumulative.append(cumulative)
+            # Cada estado parte de la fila de su enlace de fallo, ya calculada
+            row = [[sums[-1] for sums in cumulative]]
+            for fail, own, shadowed in zip(self._fail[1:], self._own[1:], self._shadowed[1:]):
+                counts = list(row[fail])
+                for following, bit, _ in own:
+                    if following is not None:
+                        ways = previous[following]
+                        for mask in range(16):
+                            counts[mask] += ways[mask | bit]
+                for following, bit in shadowed:
+                    if following is not None:
+                        ways = previous[following]
+                        for mask in range(16):
+                            counts[mask] -= ways[mask | bit]
+                row.append(counts)
+            table.append(row)
+        return table
+
+    def count(self, length):
+        """
+        Número exacto de contraseñas válidas de esa longitud
+        """
+        return self._completions(length)[length][0][0]
+
+    def entropy(self, length):
+        """
+        Bits exactos del espacio: log2 del número de contraseñas válidas
+        """
+        total = self.count(length)
+        return math.log2(total) if total else 0.0
+
+    def unrank(self, length, rank):
+        """
+        Contraseña número 'rank' (0 <= rank < count(length)) de las válidas de
+        esa longitud. Cada número da una contraseña distinta
+        """
+        table = self._completions(length)
+        if not 0 <= rank < table[length][0][0]:
+            raise ValueError(f"Número de contraseña fuera de rango: {rank}")
+        root = self._root
+        state = mask = 0
+        password = []
+        for remaining in range(length - 1, -1, -1):
+            completions = table[remaining]
+            # Se recorren los caracteres propios del estado y luego los de su
+            # cadena de enlaces de fallo, saltando los ya vistos más arriba
+            current, seen, chosen = state, set(), None
+            while current:
+                for following, bit, ch in self._own[current]:
+                    if ch in seen or following is None:
+                        continue
+                    ways = completions[following][mask | bit]
+                    if rank < ways:
+                        chosen = following, bit, ch
+                        break
+                    rank -= ways
+                if chosen is not None:
+                    break
+                seen.update(ch for _, _, ch in self._own[current])
+                current = self._fail[current]
+            if chosen is None:
+                # En la raíz, por sumas acumuladas y saltando los caracteres vistos
+                sums = self._cumulative[remaining][mask]
+                skipped = sorted(self._position[ch] for ch in seen if ch in self._position)
+                for index, offset in skipped:
+                    ways = completions[root[index][0]][mask | root[index][1]]
+                    if sums[index] + offset * ways > rank:
+                        break
+                    rank += ways
+                index = bisect_right(sums, rank) - 1
+                following, bit, chars = root[index]
+                offset, rank = divmod(rank - sums[index], completions[following][mask | bit])
+                chosen = following, bit, chars[offset]
+            following, bit, ch = chosen
+            password.append(ch)
+            state, mask = following, mask | bit
+        return ''.join(password)
+
+    def sample(self, length, randbelow=secrets.randbelow):
+        """
+        Contraseña uniforme entre las válidas: se elige su número de orden
+        con el CSPRNG y se reconstruye carácter a carácter
+        """
+        total = self.count(length)
+        if not total:
+            raise ValueError(f"Ninguna contraseña de {length} caracteres cumple las restricciones")
+        return self.unrank(length, randbelow(total))
+
+
+class ConstrainedPasswords:
+    """
+    Espacio restringido con la longitud ya elegida: 'count' contraseñas
+    posibles y 'entropy' bits exactos
+    """
+    def __init__(self, space, length, score=None):
+        self.space = space
+        self.length = length
+        self.count = space.count(length)
+        self.entropy = space.entropy(length)
+        # Puntuación del analizador que tienen todas (None si no se fijó)
+        self.score = score
+
+    def generate(self):
+        return self.space.sample(self.length)
+
+    def generate_batch(self, count):
+        for _ in range(count):
+            yield self.space.sample(self.length)
+
+
+def analyzer_patterns(analyzer):
+    """
+    Subcadenas cuya ausencia garantiza que el analizador no detecta ningún
+    patrón débil ni la considera común (sin corpus): literales del escáner,
+    años 19xx/20xx, las listas integradas y, si el analizador tiene
+    diccionario, todas las formas leetspeak de sus palabras que encuentra.
+    Lanza ValueError con patrones personalizados no literales o con un
+    diccionario de más de MAX_DICTIONARY_SPELLINGS variantes
+    """
+    if analyzer.scanner.fallback:
+        raise ValueError("Los patrones personalizados no literales no se pueden "
+                         "excluir por construcción")
+    words = set(analyzer.scanner.tokens)
+    words.update(f"{century}{year:02}" for century in (19, 20) for year in range(100))
+    words.update(analyzer.common_passwords | analyzer.common_spanish)
+    if analyzer.dictionary is not None:
+        words.update(dictionary_spellings(analyzer.dictionary))
+    return words
+
+
+def _analysis_values(analyzer, length, classes):
+    """
+    Entropía y puntuación del analizador para una contraseña de esa
+    longitud con exactamente esas clases, sin patrones y no común
+    """
+    sets = {name: name in classes for name in CLASS_NAMES}
+    sets['count'] = len(classes)
+    entropy = analyzer.scanner.entropy(length, sets)
+    score = analyzer._calculate_score({'length': length, 'character_sets': sets,
+                                       'entropy': entropy, 'is_common': False, 'patterns': []})
+    return entropy, score
+
+
+def constrained_passwords(classes, length=None, min_length=4, max_length=MAX_LENGTH,
+                          required=(), min_classes=0, banned=(), leet_banned=(),
+                          max_repeat=None, min_entropy=None, min_score=None,
+                          min_analysis_entropy=None, analyzer=None):
+    """
+    Construye el espacio restringido y elige la longitud: la indicada o la
+    menor de [min_length, max_length] que alcanza 'min_entropy' bits
+    exactos y, si se piden, la puntuación y la entropía del analizador.
+
+    Para garantizar min_score y min_analysis_entropy todas las clases pasan
+    a ser obligatorias y se prohíben los patrones que detecta el analizador,
+    así que todas las contraseñas del espacio tienen la misma puntuación.
+    Con un corpus de filtraciones se supone además que una contraseña
+    aleatoria del espacio no está en él
+    """
+    banned = set(banned)
+    for word in leet_banned:
+        banned.update(leet_spellings(word))
+    classes = {name: chars for name, chars in classes.items() if chars}
+    analysis_target = min_score is not None or min_analysis_entropy is not None
+    if analysis_target:
+        if analyzer is None:
+            from analyzer import PasswordAnalyzer
+            analyzer = PasswordAnalyzer()
+        required = tuple(classes)
+        banned |= analyzer_patterns(analyzer)
+        # El escáner marca tres caracteres iguales seguidos
+        max_repeat = min(max_repeat or 2, 2)
+    space = ConstrainedSpace(classes, required, min_classes, banned, max_repeat)
+
+    def acceptable(size):
+        score = None
+        if analysis_target:
+            entropy, score = _analysis_values(analyzer, size, classes)
+            if min_score is not None and score < min_score:
+                return False, score
+            if min_analysis_entropy is not None and entropy < min_analysis_entropy:
+                return False, score
+        if min_entropy is not None and space.entropy(size) < min_entropy:
+            return False, score
+        return space.count(size) > 0, score
+
+    if length is not None:
+        if not min_length <= length <= max_length:
+            raise ValueError(f"La longitud debe estar entre {min_length} y {max_length}")
+        ok, score = acceptable(length)
+        if not ok:
+            raise ValueError(f"Con {length} caracteres no se cumplen las restricciones")
+        return ConstrainedPasswords(space, length, score)
+    for size in range(max(min_length, 1), max_length + 1):
+        ok, score = acceptable(size)
+        if ok:
+            return ConstrainedPasswords(space, size, score)
+    raise ValueError(f"Ninguna longitud hasta {max_length} cumple las restricciones")
+
+
+def policy_constraints(policy, user=None):
+    """
+    Traduce las reglas de una política (policy.py) a argumentos de
+    constrained_passwords. Las reglas que dependen de datos externos o de
+    modelos no se pueden garantizar por construcción
+    """
+    constraints = {'min_length': 4, 'max_length': MAX_LENGTH, 'required': set(),
+                   'min_classes': 0, 'banned': set(), 'leet_banned': set(), 'max_repeat': None}
+    for rule, value in policy.rules:
+        if rule == 'min_length':
+            constraints['min_length'] = max(constraints['min_length'], value)
+        elif rule == 'max_length':
+            constraints['max_length'] = min(constraints['max_length'], value)
+        elif rule == 'require_classes':
+            constraints['required'].update([value] if isinstance(value, str) else value)
+        elif rule == 'min_classes':
+            constraints['min_classes'] = max(constraints['min_classes'], value)
+        elif rule == 'banned_substrings':
+            constraints['leet_banned'].update([value] if isinstance(value, str) else value)
+        elif rule == 'max_repeat':
+            current = constraints['max_repeat']
+            constraints['max_repeat'] = value if current is None else min(current, value)
+        elif rule == 'no_user_fragments':
+            if user:
+                from policy import _USER_SEPARATORS
+                size = 4 if value is True else value
+                for piece in _USER_SEPARATORS.split(user.lower()):
+                    constraints['banned'].update(piece[start:start + size]
+                                                 for start in range(len(piece) - size + 1))
+        elif rule == 'not_common':
+            if value:
+                constraints['min_score'] = constraints.get('min_score', 0)
+        elif rule == 'min_score':
+            constraints['min_score'] = max(constraints.get('min_score', 0), value)
+        elif rule == 'min_entropy':
+            constraints['min_analysis_entropy'] = max(
+                constraints.get('min_analysis_entropy', 0), value)
+        else:
+            raise ValueError(f"La regla {rule} no se puede garantizar al generar")
+    constraints['required'] = tuple(sorted(constraints['required'], key=CLASS_NAMES.index))
+    return constraints
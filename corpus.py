@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Corpus offline de contraseñas filtradas sobre un archivo binario ordenado
+de hashes SHA-1, consultado mediante mmap y búsqueda binaria
+"""
+
+import argparse
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+
+from bulk import open_source
+
+MAGIC = b'PWCORPUS'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQ')  # magic, versión, bits de prefijo, registros
+DIGEST_SIZE = 20
+RECORD_SIZE = DIGEST_SIZE + 4     # SHA-1 + número de apariciones (uint32)
+MAX_COUNT = 2**32 - 1
+
+
+class CorpusError(Exception):
+    """
+    Archivo de corpus inválido o incompatible
+    """
+
+
+def sha1_digest(password):
+    """
+    SHA-1 de la contraseña en UTF-8 (el mismo formato que usa HIBP)
+    """
+    return hashlib.sha1(password.encode('utf-8')).digest()
+
+
+class BreachCorpus:
+    """
+    Consulta de un corpus de hashes filtrados sin fase de carga: el archivo
+    se proyecta en memoria y cada búsqueda toca solo unas pocas páginas
+    """
+    def __init__(self, path):
+        self.path = path
+        self._open()
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < HEADER.size:
+            raise CorpusError(f"Corpus demasiado pequeño: {self.path}")
+        magic, version, prefix_bits, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise CorpusError(f"Formato de corpus no reconocido: {self.path}")
+
+        self.prefix_bits = prefix_bits
+        self.count = count
+        self._index_offset = HEADER.size
+        index_entries = (1 << prefix_bits) + 1 if prefix_bits else 0
+        self._records_offset = self._index_offset + index_entries * 8
+        if len(self._mm) != self._records_offset + count * RECORD_SIZE:
+            raise CorpusError(f"Corpus truncado o corrupto: {self.path}")
+
+    def __getstate__(self):
+        # El mmap no se serializa: cada proceso vuelve a proyectar el archivo
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.path = state['path']
+        self._open()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, password):
+        return self.lookup(password) > 0
+
+    def close(self):
+        self._mm.close()
+
+    def _bucket(self, digest):
+        """
+        Rango de registros donde puede estar el hash según el índice de prefijos
+        """
+        if not self.prefix_bits:
+            return 0, self.count
+        bucket = int.from_bytes(digest[:4], 'big') >> (32 - self.prefix_bits)
+        lo, hi = struct.unpack_from('<QQ', self._mm, self._index_offset + bucket * 8)
+        return lo, hi
+
+    def lookup_digest(self, digest):
+        """
+        Número de apariciones de un hash SHA-1 (0 si no está en el corpus)
+        """
+        mm = self._mm
+        base = self._records_offset
+        lo, hi = self._bucket(digest)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            position = base + mid * RECORD_SIZE
+            current = mm[position:position + DIGEST_SIZE]
+            if current < digest:
+                lo = mid + 1
+            elif current > digest:
+                hi = mid
+            else:
+                return int.from_bytes(mm[position + DIGEST_SIZE:position + RECORD_SIZE], 'little')
+        return 0
+
+    def lookup(self, password):
+        """
+        Número de veces que la contraseña aparece en filtraciones
+        """
+        return self.lookup_digest(sha1_digest(password))
+
+
+def _parse_hash_line(line, range_prefix=''):
+    """
+    Interpreta una línea 'HASH:CONTADOR' (o 'SUFIJO:CONTADOR' en los
+    archivos de rango de HIBP) y devuelve el registro empaquetado
+    """
+    hex_digest, _, count = line.partition(':')
+    digest = bytes.fromhex(range_prefix + hex_digest.strip())
+    if len(digest) != DIGEST_SIZE:
+        raise CorpusError(f"Hash SHA-1 inválido: {line!r}")
+    count = int(count) if count.strip() else 1
+    return digest + min(count, MAX_COUNT).to_bytes(4, 'little')
+
+
+def _iter_records(sources, plaintext=False):
+    """
+    Registros empaquetados (hash + contador) de los archivos de entrada
+    """
+    for path in sources:
+        # Los archivos de rango de HIBP se llaman como el prefijo de 5 caracteres
+        stem = os.path.basename(path).split('.')[0]
+        range_prefix = stem if len(stem) == 5 and all(
+            c in '0123456789abcdefABCDEF' for c in stem) else ''
+
+        source = open_source(path)
+        try:
+            for raw in source:
+                line = raw.decode('utf-8', errors='replace').strip()
+                if not line:
+                    continue
+                if plaintext:
+                    yield sha1_digest(line) + (1).to_bytes(4, 'little')
+                else:
+                    yield _parse_hash_line(line, range_prefix)
+        finally:
+            if path != '-':
+                source.close()
+
+
+def _write_run(records, directory):
+    """
+    Ordena un bloque de registros y lo vuelca a un archivo temporal
+    """
+    records.sort()
+    run = tempfile.TemporaryFile(dir=directory)
+    run.write(b''.join(records))
+    run.seek(0)
+    return run
+
+
+def _read_run(run):
+    while True:
+        record = run.read(RECORD_SIZE)
+        if not record:
+            return
+        yield record
+
+
+def _coalesce(records):
+    """
+    Une registros consecutivos con el mismo hash sumando sus contadores
+    """
+    current, total = None, 0
+    for record in records:
+        digest = record[:DIGEST_SIZE]
+        count = int.from_bytes(record[DIGEST_SIZE:], 'little')
+        if digest == current:
+            total += count
+            continue
+        if current is not None:
+            yield current, min(total, MAX_COUNT)
+        current, total = digest, count
+    if current is not None:
+        yield current, min(total, MAX_COUNT)
+
+
+def build_corpus(sources, output, prefix_bits=16, plaintext=False, run_size=1000000):
+    """
+    Construye el archivo de corpus con memoria acotada: ordena bloques de
+    'run_size' registros, los vuelca a disco y los mezcla al final
+    """
+    if not 0 <= prefix_bits <= 24:
+        raise ValueError("prefix_bits debe estar entre 0 y 24")
+
+    directory = os.path.dirname(os.path.abspath(output))
+    runs = []
+    try:
+        block = []
+        for record in _iter_records(sources, plaintext):
+            block.append(record)
+            if len(block) >= run_size:
+                runs.append(_write_run(block, directory))
+                block = []
+        if block or not runs:
+            runs.append(_write_run(block, directory))
+
+        index_entries = (1 << prefix_bits) + 1 if prefix_bits else 0
+        index = [0] * index_entries
+        tmp_output = output + '.tmp'
+        count = 0
+        with open(tmp_output, 'wb') as out:
+            out.write(HEADER.pack(MAGIC, VERSION, prefix_bits, 0))
+            out.write(bytes(index_entries * 8))
+            for digest, total in _coalesce(heapq.merge(*(_read_run(run) for run in runs))):
+                if prefix_bits:
+                    index[int.from_bytes(digest[:4], 'big') >> (32 - prefix_bits)] += 1
+                out.write(digest + total.to_bytes(4, 'little'))
+                count += 1
+
+            # Índice de prefijos: posición del primer registro de cada cubo
+            if prefix_bits:
+                start = 0
+                for bucket in range(index_entries):
+                    index[bucket], start = start, start + index[bucket]
+                out.seek(HEADER.size)
+                out.write(struct.pack(f'<{index_entries}Q', *index))
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, VERSION, prefix_bits, count))
+        os.replace(tmp_output, output)
+        return count
+    finally:
+        for run in runs:
+            run.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Corpus offline de contraseñas filtradas')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Construir el corpus binario')
+    build.add_argument('output', help='Archivo de corpus a generar')
+    build.add_argument('sources', nargs='+',
+                       help='Archivos HASH:CONTADOR de HIBP (o texto plano con --plaintext)')
+    build.add_argument('--plaintext', action='store_true',
+                       help='Las entradas son contraseñas en claro, una por línea')
+    build.add_argument('--prefix-bits', type=int, default=16,
+                       help='Bits del índice de prefijos (0 = sin índice)')
+    build.add_argument('--run-size', type=int, default=1000000,
+                       help='Registros ordenados en memoria antes de volcar a disco')
+
+    lookup = subparsers.add_parser('lookup', help='Consultar contraseñas en el corpus')
+    lookup.add_argument('corpus', help='Archivo de corpus')
+    lookup.add_argument('passwords', nargs='+', help='Contraseñas a consultar')
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        count = build_corpus(args.sources, args.output, prefix_bits=args.prefix_bits,
+                             plaintext=args.plaintext, run_size=args.run_size)
+        print(f"Corpus generado: {args.output} ({count} hashes)")
+    else:
+        corpus = BreachCorpus(args.corpus)
+        for password in args.passwords:
+            print(f"{password}: {corpus.lookup(password)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Detección de palabras de diccionario incrustadas en contraseñas mediante un
+autómata Aho–Corasick sobre texto normalizado (minúsculas y leetspeak)
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+from bulk import iter_passwords
+
+MAGIC = b'PWDICT\x00\x01'
+HEADER = struct.Struct('<8sI')  # magic, longitud de los metadatos JSON
+
+# Sustituciones leetspeak habituales (la ambigüedad de '1' y '|' se resuelve
+# probando también la variante con 'l')
+LEET_TABLE = str.maketrans({'4': 'a', '@': 'a', '3': 'e', '1': 'i', '!': 'i', '|': 'i',
+                            '0': 'o', '5': 's', '$': 's', '7': 't', '+': 't'})
+LEET_ALTERNATIVE = str.maketrans({'1': 'l', '|': 'l'})
+
+# Arrays del autómata, en el orden en que se guardan en disco
+UINT_ARRAYS = ('first', 'labels', 'targets', 'fail', 'output', 'dict_link',
+               'word_offsets', 'word_rank')
+BYTE_ARRAYS = ('word_category', 'word_blob')
+
+
+def normalize(text):
+    """
+    Normaliza el texto para la búsqueda: minúsculas y leetspeak
+    """
+    return text.lower().translate(LEET_TABLE)
+
+
+def _variants(text):
+    """
+    Variantes normalizadas de una contraseña (una o dos según la ambigüedad)
+    """
+    lowered = text.lower()
+    variants = [lowered.translate(LEET_TABLE)]
+    if '1' in lowered or '|' in lowered:
+        variants.append(lowered.translate(LEET_ALTERNATIVE).translate(LEET_TABLE))
+    return variants
+
+
+class DictionaryMatcher:
+    """
+    Autómata Aho–Corasick aplanado en arrays compactos. Se construye una vez
+    a partir de las listas de palabras, se guarda en disco y se carga con
+    mmap sin reconstruirlo en cada arranque
+    """
+    def __init__(self, arrays, categories, min_length, max_word_length, path=None):
+        for name in UINT_ARRAYS + BYTE_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.categories = categories
+        self.min_length = min_length
+        self.max_word_length = max_word_length
+        self.path = path
+
+    @classmethod
+    def build(cls, wordlists, min_length=4):
+        """
+        Construye el autómata a partir de {categoría: iterable de palabras}.
+        El orden de cada lista se conserva como rango (listas por frecuencia)
+        """
+        categories = list(wordlists)
+        edges = {}           # (estado << 21) | carácter -> estado hijo
+        terminal = [0]       # id de palabra + 1 en cada estado
+        words = {}           # palabra normalizada -> id
+        word_rank = array('I')
+        word_category = array('B')
+        blob = bytearray()
+        word_offsets = array('I', [0])
+        max_word_length = 0
+
+        for category_id, category in enumerate(categories):
+            rank = 0
+            for word in wordlists[category]:
+                word = normalize(word.strip())
+                if len(word) < min_length or word in words:
+                    continue
+                rank += 1
+                state = 0
+                for ch in word:
+                    key = (state << 21) | ord(ch)
+                    child = edges.get(key)
+                    if child is None:
+                        child = edges[key] = len(terminal)
+                        terminal.append(0)
+                    state = child
+                words[word] = len(word_rank)
+                max_word_length = max(max_word_length, len(word))
+                terminal[state] = len(word_rank) + 1
+                word_rank.append(rank)
+                word_category.append(category_id)
+                blob += word.encode('utf-8')
+                word_offsets.append(len(blob))
+
+        # Aplanar transiciones: hijos de cada estado contiguos y ordenados
+        states = len(terminal)
+        first = array('I', [0]) * (states + 1)
+        labels = array('I')
+        targets = array('I')
+        for key in sorted(edges):
+            first[(key >> 21) + 1] += 1
+            labels.append(key & 0x1FFFFF)
+            targets.append(edges[key])
+        for state in range(states):
+            first[state + 1] += first[state]
+
+        # Enlaces de fallo y de salida en orden BFS
+        fail = array('I', [0]) * states
+        dict_link = array('I', [0]) * states
+        queue = deque(targets[first[0]:first[1]])
+        while queue:
+            state = queue.popleft()
+            for index in range(first[state], first[state + 1]):
+                code, child = labels[index], targets[index]
+                fallback = fail[state]
+                while fallback and ((fallback << 21) | code) not in edges:
+                    fallback = fail[fallback]
+                target = edges.get((fallback << 21) | code, 0)
+                fail[child] = target if target != child else 0
+                dict_link[child] = fail[child] if terminal[fail[child]] else dict_link[fail[child]]
+                queue.append(child)
+
+        arrays = {
+            'first': first, 'labels': labels, 'targets': targets, 'fail': fail,
+            'output': array('I', terminal), 'dict_link': dict_link,
+            'word_offsets': word_offsets, 'word_rank': word_rank,
+            'word_category': word_category, 'word_blob': bytes(blob),
+        }
+        return cls(arrays, categories, min_length, max_word_length)
+
+    def save(self, path):
+        """
+        Guarda el autómata en disco (arrays alineados, aptos para mmap)
+        """
+        with open(path, 'wb') as f:
+            self.write(f)
+        self.path = path
+
+    def write(self, f):
+        """
+        Escribe el autómata en un archivo binario abierto, desde una posición
+        múltiplo de 8 (también se incrusta así en los snapshots)
+        """
+        sizes = {name: len(getattr(self, name)) for name in UINT_ARRAYS + BYTE_ARRAYS}
+        meta = json.dumps({'categories': self.categories, 'min_length': self.min_length,
+                           'max_word_length': self.max_word_length, 'sizes': sizes,
+                           'byteorder': sys.byteorder}).encode('utf-8')
+        meta += b' ' * (-(HEADER.size + len(meta)) % 8)
+        f.write(HEADER.pack(MAGIC, len(meta)))
+        f.write(meta)
+        for name in UINT_ARRAYS:
+            f.write(array('I', getattr(self, name)).tobytes())
+        for name in BYTE_ARRAYS:
+            f.write(bytes(getattr(self, name)))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carga el autómata proyectando el archivo en memoria (sin copiarlo)
+        """
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_buffer(memoryview(mm), path=path, source=path)
+
+    @classmethod
+    def from_buffer(cls, view, path=None, source='diccionario'):
+        """
+        Autómata sobre un buffer con el formato de write() (sin copiar los arrays)
+        """
+        magic, meta_length = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Formato de diccionario no reconocido: {source}")
+        meta = json.loads(bytes(view[HEADER.size:HEADER.size + meta_length]))
+
+        offset = HEADER.size + meta_length
+        arrays = {}
+        for name in UINT_ARRAYS:
+            size = meta['sizes'][name]
+            data = view[offset:offset + size * 4].cast('I')
+            if meta['byteorder'] != sys.byteorder:
+                data = array('I', data)
+                data.byteswap()
+            arrays[name] = data
+            offset += size * 4
+        for name in BYTE_ARRAYS:
+            size = meta['sizes'][name]
+            arrays[name] = view[offset:offset + size]
+            offset += size
+        return cls(arrays, meta['categories'], meta['min_length'], meta['max_word_length'],
+                   path=path)
+
+    def __getstate__(self):
+        # Los procesos trabajadores vuelven a proyectar el archivo
+        if self.path is not None:
+            return {'path': self.path}
+        state = {name: array('I', getattr(self, name)) for name in UINT_ARRAYS}
+        state.update(word_category=bytes(self.word_category), word_blob=bytes(self.word_blob),
+                     categories=self.categories, min_length=self.min_length,
+                     max_word_length=self.max_word_length)
+        return state
+
+    def __setstate__(self, state):
+        if 'path' in state:
+            other = self.load(state['path'])
+            self.__dict__.update(other.__dict__)
+        else:
+            self.__init__(state, state['categories'], state['min_length'],
+                          state['max_word_length'])
+
+    def __len__(self):
+        return len(self.word_rank)
+
+    def word(self, word_id):
+        """
+        Texto normalizado de una palabra del diccionario
+        """
+        start, end = self.word_offsets[word_id], self.word_offsets[word_id + 1]
+        return bytes(self.word_blob[start:end]).decode('utf-8')
+
+    def _scan(self, text):
+        """
+        Recorre el texto normalizado una vez y devuelve (inicio, fin, id) de
+        cada palabra encontrada
+        """
+        first, labels, targets = self.first, self.labels, self.targets
+        fail, output, dict_link = self.fail, self.output, self.dict_link
+        offsets = self.word_offsets
+        found = []
+        state = 0
+        for position, ch in enumerate(text):
+            code = ord(ch)
+            while True:
+                lo, hi = first[state], first[state + 1]
+                index = bisect_left(labels, code, lo, hi)
+                if index < hi and labels[index] == code:
+                    state = targets[index]
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            match = state if output[state] else dict_link[state]
+            while match:
+                word_id = output[match] - 1
+                length = offsets[word_id + 1] - offsets[word_id]
+                found.append((position + 1 - length, position + 1, word_id))
+                match = dict_link[match]
+        return found
+
+    def matches(self, password):
+        """
+        Coincidencias (inicio, fin, id) de todas las variantes, sin repetir
+        y ordenadas por posición
+        """
+        matches = set()
+        for text in _variants(password):
+            matches.update(self._scan(text))
+        return sorted(matches)
+
+    def find(self, password):
+        """
+        Todas las palabras de diccionario incrustadas en la contraseña como
+        (inicio, fin, palabra, categoría), ordenadas por posición
+        """
+        return [(start, end, self.word(word_id), self.categories[self.word_category[word_id]])
+                for start, end, word_id in self.matches(password)]
+
+    def words_in(self, password):
+        """
+        Palabras encontradas que no están contenidas en otra coincidencia mayor
+        """
+        return self.maximal_words(self.matches(password))
+
+    def maximal_words(self, matches):
+        """
+        Palabras de una lista ordenada de coincidencias (inicio, fin, id),
+        descartando las contenidas en otra mayor
+        """
+        # Barrido por (inicio, -fin): un tramo está contenido en otro distinto
+        # si alguno anterior en ese orden llega al menos hasta su fin
+        contained = set()
+        furthest = -1
+        for start, end in sorted({(start, end) for start, end, _ in matches},
+                                 key=lambda span: (span[0], -span[1])):
+            if furthest >= end:
+                contained.add((start, end))
+            furthest = max(furthest, end)
+
+        words = []
+        seen = set()
+        for start, end, word_id in matches:
+            if (start, end) in contained:
+                continue
+            word = self.word(word_id)
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+        return words
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diccionario Aho–Corasick para contraseñas')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Compilar listas de palabras')
+    build.add_argument('output', help='Archivo de diccionario a generar')
+    build.add_argument('wordlists', nargs='+', metavar='CATEGORIA=ARCHIVO',
+                       help='Listas de palabras (p. ej. english=en.txt spanish=es.txt.gz)')
+    build.add_argument('--min-length', type=int, default=4,
+                       help='Longitud mínima de palabra')
+
+    find = subparsers.add_parser('find', help='Buscar palabras en contraseñas')
+    find.add_argument('dictionary', help='Archivo de diccionario')
+    find.add_argument('passwords', nargs='+', help='Contraseñas a examinar')
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        wordlists = {}
+        for spec in args.wordlists:
+            category, _, path = spec.rpartition('=')
+            wordlists[category or path] = iter_passwords(path)
+        matcher = DictionaryMatcher.build(wordlists, min_length=args.min_length)
+        matcher.save(args.output)
+        print(f"Diccionario generado: {args.output} ({len(matcher)} palabras)")
+    else:
+        matcher = DictionaryMatcher.load(args.dictionary)
+        for password in args.passwords:
+            print(f"{password}: {', '.join(matcher.words_in(password)) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,68 @@
 import secrets
 import string
-import random
+
+AMBIGUOUS = "0O1lI|"
+
+
+class SecureCharStream:
+    """
+    Flujo de caracteres aleatorios uniformes de un alfabeto ASCII. Lee bloques
+    de secrets.token_bytes y aplica muestreo por rechazo sin sesgo con
+    bytes.translate, sin una llamada al CSPRNG por carácter
+    """
+    def __init__(self, alphabet, block_size=65536):
+        if not 1 <= len(alphabet) <= 256 or not alphabet.isascii():
+            raise ValueError("El alfabeto debe tener entre 1 y 256 caracteres ASCII")
+        size = len(alphabet)
+        # Bytes >= limit se descartan para que cada carácter sea equiprobable
+        limit = 256 - 256 % size
+        self._table = bytes(ord(alphabet[b % size]) if b < limit else 0 for b in range(256))
+        self._rejected = bytes(range(limit, 256))
+        self._block_size = block_size
+        self._buffer = ''
+        self._position = 0
+
+    def take(self, n):
+        """
+        Devuelve n caracteres aleatorios del alfabeto
+        """
+        if len(self._buffer) - self._position < n:
+            data = [self._buffer[self._position:]]
+            available = len(data[0])
+            while available < n:
+                chunk = secrets.token_bytes(max(self._block_size, n))
+                chunk = chunk.translate(self._table, self._rejected).decode('ascii')
+                data.append(chunk)
+                available += len(chunk)
+            self._buffer = ''.join(data)
+            self._position = 0
+        result = self._buffer[self._position:self._position + n]
+        self._position += n
+        return result
+
+
+class SecureIndexStream:
+    """
+    Enteros uniformes en [0, n) a partir de bytes del CSPRNG con rechazo
+    """
+    def __init__(self, block_size=4096):
+        self._block_size = block_size
+        self._buffer = b''
+        self._position = 0
+
+    def below(self, n):
+        if n > 256:
+            return secrets.randbelow(n)
+        limit = 256 - 256 % n
+        while True:
+            if self._position >= len(self._buffer):
+                self._buffer = secrets.token_bytes(self._block_size)
+                self._position = 0
+            value = self._buffer[self._position]
+            self._position += 1
+            if value < limit:
+                return value % n
+
 
 class PasswordGenerator:
     def __init__(self):
@@ -8,6 +70,7 @@ class PasswordGenerator:
         self.uppercase = string.ascii_uppercase
         self.digits = string.digits
         self.symbols = "!@#$%&*()_+-=[]{}|;:,.<>?"
+        self._random = secrets.SystemRandom()
         
     def generate_password(self, length=12, use_uppercase=True, use_lowercase=True, 
                          use_digits=True, use_symbols=True, exclude_ambiguous=False):
@@ -42,8 +105,7 @@ class PasswordGenerator:
         
         # Excluir caracteres ambiguos si se solicita
         if exclude_ambiguous:
-            ambiguous = "0O1lI|"
-            charset = ''.join(c for c in charset if c not in ambiguous)
+            charset = ''.join(c for c in charset if c not in AMBIGUOUS)
             
         # Generar contraseña
         password = required_chars.copy()
@@ -52,11 +114,67 @@ class PasswordGenerator:
         for _ in range(length - len(required_chars)):
             password.append(secrets.choice(charset))
             
-        # Mezclar la contraseña
-        random.shuffle(password)
+        # Mezclar la contraseña (con el CSPRNG, no con el módulo random)
+        self._random.shuffle(password)
         
         return ''.join(password)
     
+    def constrained(self, length=None, use_uppercase=True, use_lowercase=True,
+                    use_digits=True, use_symbols=True, exclude_ambiguous=False,
+                    min_score=None, min_entropy=None, banned=(), max_repeat=None,
+                    policy=None, user=None, analyzer=None):
+        """
+        Espacio de contraseñas que cumplen las restricciones, para generarlas
+        de una vez y de forma uniforme en lugar de generar y analizar hasta
+        acertar. 'min_score' es la puntuación del analizador, 'min_entropy'
+        los bits exactos del espacio, 'banned' subcadenas prohibidas (también
+        en leetspeak) y 'policy' una política de policy.py. Sin longitud se
+        elige la menor que cumple los objetivos (12 si no hay ninguno).
+        Devuelve un ConstrainedPasswords con generate(), generate_batch(),
+        'length' y 'entropy'
+        """
+        from constrained import constrained_passwords, policy_constraints
+        classes = {}
+        if use_lowercase:
+            classes['lowercase'] = self.lowercase
+        if use_uppercase:
+            classes['uppercase'] = self.uppercase
+        if use_digits:
+            classes['digits'] = self.digits
+        if use_symbols:
+            classes['symbols'] = self.symbols
+        if not classes:
+            raise ValueError("Debe seleccionar al menos un tipo de carácter")
+        if exclude_ambiguous:
+            classes = {name: ''.join(c for c in chars if c not in AMBIGUOUS)
+                       for name, chars in classes.items()}
+        
+        constraints = {'min_length': 4, 'leet_banned': set(banned)}
+        if policy is not None:
+            constraints = policy_constraints(policy, user)
+            constraints['leet_banned'].update(banned)
+            analyzer = analyzer or policy.analyzer
+        if max_repeat is not None:
+            current = constraints.get('max_repeat')
+            constraints['max_repeat'] = max_repeat if current is None else min(current, max_repeat)
+        if min_score is not None:
+            constraints['min_score'] = max(constraints.get('min_score', 0), min_score)
+        if length is None and min_entropy is None and 'min_score' not in constraints and \
+                'min_analysis_entropy' not in constraints:
+            length = max(12, constraints['min_length'])
+            length = min(length, constraints.get('max_length', length))
+        if length is not None and length < 4:
+            raise ValueError("La longitud mínima debe ser 4 caracteres")
+        return constrained_passwords(classes, length=length, min_entropy=min_entropy,
+                                     analyzer=analyzer, **constraints)
+    
+    def generate_constrained(self, count, **kwargs):
+        """
+        Genera en lote contraseñas que cumplen las restricciones de
+        constrained(), todas de la misma longitud y equiprobables
+        """
+        return self.constrained(**kwargs).generate_batch(count)
+    
     def generate_pronounceable(self, length=12, separator='-'):
         """
         Genera una contraseña pronunciable usando palabras simples
@@ -101,11 +219,123 @@ class PasswordGenerator:
             
         return result[:length]
     
+    def generate_passphrase(self, wordlist, words=6, separator='-', capitalize=False):
+        """
+        Genera una frase de paso tipo diceware con palabras elegidas
+        uniformemente de una lista (ruta o IndexedWordlist). Su entropía
+        exacta es passphrase_entropy(wordlist, words)
+        """
+        return next(self.generate_passphrases(1, wordlist, words, separator, capitalize))
+    
+    def generate_passphrases(self, count, wordlist, words=6, separator='-', capitalize=False):
+        """
+        Genera frases de paso en lote de forma perezosa. La lista se consulta
+        por índice, sin cargarla en memoria
+        """
+        wordlist = _open_wordlist(wordlist)
+        if words < 1:
+            raise ValueError("La frase debe tener al menos una palabra")
+        if len(wordlist) < 2:
+            raise ValueError("La lista debe tener al menos dos palabras distintas")
+        
+        size = len(wordlist)
+        indexes = SecureIndexStream()
+        for _ in range(count):
+            chosen = [wordlist[indexes.below(size)] for _ in range(words)]
+            if capitalize:
+                chosen = [word.capitalize() for word in chosen]
+            yield separator.join(chosen)
+    
+    def passphrase_entropy(self, wordlist, words=6):
+        """
+        Bits exactos de una frase de 'words' palabras de la lista (las
+        mayúsculas y el separador son fijos y no suman entropía)
+        """
+        return _open_wordlist(wordlist).entropy(words)
+    
     def generate_multiple(self, count=5, **kwargs):
         """
         Genera múltiples contraseñas
         """
-        passwords = []
+        return list(self.generate_batch(count, **kwargs))
+    
+    def generate_batch(self, count, length=12, use_uppercase=True, use_lowercase=True,
+                       use_digits=True, use_symbols=True, exclude_ambiguous=False):
+        """
+        Genera contraseñas en lote de forma perezosa, con la misma
+        distribución que generate_password pero leyendo el CSPRNG por bloques
+        """
+        if length < 4:
+            raise ValueError("La longitud mínima debe ser 4 caracteres")
+        
+        classes = []
+        if use_lowercase:
+            classes.append(self.lowercase)
+        if use_uppercase:
+            classes.append(self.uppercase)
+        if use_digits:
+            classes.append(self.digits)
+        if use_symbols:
+            classes.append(self.symbols)
+        
+        if not classes:
+            raise ValueError("Debe seleccionar al menos un tipo de carácter")
+        
+        # Los ambiguos se excluyen también de los caracteres obligatorios
+        if exclude_ambiguous:
+            classes = [''.join(c for c in chars if c not in AMBIGUOUS) for chars in classes]
+        
+        charset_stream = SecureCharStream(''.join(classes))
+        class_streams = [SecureCharStream(chars) for chars in classes]
+        positions = SecureIndexStream()
+        fill_length = length - len(classes)
+        
         for _ in range(count):
-            passwords.append(self.generate_password(**kwargs))
-        return passwords
\ No newline at end of file
+            password = list(charset_stream.take(fill_length))
+            # Insertar cada carácter obligatorio en una posición uniforme:
+            # equivale a barajar, porque el relleno es i.i.d.
+            for stream in class_streams:
+                password.insert(positions.below(len(password) + 1), stream.take(1))
+            yield ''.join(password)
+    
+    def write_passwords(self, stream, count, buffer_lines=8192, **kwargs):
+        """
+        Escribe contraseñas en un flujo de texto por bloques, sin construir
+        la lista completa en memoria
+        """
+        self._write_lines(stream, self.generate_batch(count, **kwargs), buffer_lines)
+    
+    def write_passphrases(self, stream, count, wordlist, buffer_lines=8192, **kwargs):
+        """
+        Escribe frases de paso en un flujo de texto por bloques
+        """
+        self._write_lines(stream, self.generate_passphrases(count, wordlist, **kwargs),
+                          buffer_lines)
+    
+    def write_constrained(self, stream, count, space, buffer_lines=8192):
+        """
+        Escribe contraseñas de un espacio restringido (ver constrained())
+        en un flujo de texto por bloques
+        """
+        self._write_lines(stream, space.generate_batch(count), buffer_lines)
+    
+    @staticmethod
+    def _write_lines(stream, lines, buffer_lines=8192):
+        batch = []
+        for password in lines:
+            batch.append(password)
+            if len(batch) >= buffer_lines:
+                batch.append('')
+                stream.write('\n'.join(batch))
+                batch = []
+        if batch:
+            batch.append('')
+            stream.write('\n'.join(batch))
+        stream.flush()
+
+
+def _open_wordlist(wordlist):
+    if isinstance(wordlist, str):
+        from wordlist import IndexedWordlist
+        wordlist = IndexedWordlist(wordlist)
+    return wordlist
@@ -0,0 +1,596 @@
+"""
+Estimación del número de intentos necesarios para adivinar una contraseña,
+al estilo de zxcvbn: se enumeran coincidencias de diccionario, secuencias,
+repeticiones, patrones de teclado y fechas, y una programación dinámica
+busca la descomposición que minimiza los intentos. La longitud analizada,
+el número de coincidencias y los números de piezas que la programación
+dinámica guarda por posición están acotados, así que la latencia también
+"""
+
+import math
+import re
+import time
+from collections import namedtuple
+
+from dictionary import LEET_ALTERNATIVE, LEET_TABLE
+
+BRUTEFORCE_CARDINALITY = 10
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+MIN_YEAR_SPACE = 20
+REFERENCE_YEAR = time.localtime().tm_year
+DATE_MIN_YEAR = 1000
+DATE_MAX_YEAR = 2050
+MAX_DELTA = 5
+
+# Intentos por segundo de cada escenario de ataque
+ATTACK_RATES = {
+    'online_throttled': 100 / 3600,   # servicio con límite de intentos
+    'online': 10,                     # servicio sin límite
+    'offline_slow_hash': 1e4,         # bcrypt/scrypt/argon2
+    'offline_fast_hash': 1e10,        # MD5/SHA-1 en varias GPU
+    'offline_gpu': 1e12,              # misma hipótesis que crack_time
+}
+
+Match = namedtuple('Match', ['pattern', 'i', 'j', 'token', 'guesses', 'detail'])
+
+# Teclados: filas de teclas (sin y con mayúsculas) y columna de la primera
+QWERTY = (
+    (0, ('`~', '1!', '2@', '3#', '4$', '5%', '6^', '7&', '8*', '9(', '0)', '-_', '=+')),
+    (1, ('qQ', 'wW', 'eE', 'rR', 'tT', 'yY', 'uU', 'iI', 'oO', 'pP', '[{', ']}', '\\|')),
+    (1, ('aA', 'sS', 'dD', 'fF', 'gG', 'hH', 'jJ', 'kK', 'lL', ';:', '\'"')),
+    (1, ('zZ', 'xX', 'cC', 'vV', 'bB', 'nN', 'mM', ',<', '.>', '/?')),
+)
+KEYPAD = (
+    (1, ('/', '*', '-')),
+    (0, ('7', '8', '9', '+')),
+    (0, ('4', '5', '6')),
+    (0, ('1', '2', '3')),
+    (1, ('0', '.')),
+)
+SLANTED_NEIGHBORS = ((-1, 0), (0, -1), (1, -1), (1, 0), (0, 1), (-1, 1))
+ALIGNED_NEIGHBORS = ((-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1))
+SHIFTED_KEYS = frozenset(key[1] for _, keys in QWERTY for key in keys)
+
+_RECENT_YEAR = re.compile(r'19\d\d|20\d\d')
+_DATE_WITH_SEPARATOR = re.compile(r'^(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})$')
+_DIGITS = re.compile(r'\d+')
+_GREEDY_REPEAT = re.compile(r'(.+)\1+', re.DOTALL)
+_LAZY_REPEAT = re.compile(r'(.+?)\1+', re.DOTALL)
+_LAZY_ANCHORED_REPEAT = re.compile(r'^(.+?)\1+$', re.DOTALL)
+_START_UPPER = re.compile(r'^[A-Z][^A-Z]+$')
+_END_UPPER = re.compile(r'^[^A-Z]+[A-Z]$')
+_ALL_UPPER = re.compile(r'^[^a-z]+$')
+
+# Particiones posibles de una fecha sin separadores según su longitud
+DATE_SPLITS = {
+    4: ((1, 2), (2, 3)),
+    5: ((1, 3), (2, 3)),
+    6: ((1, 2), (2, 4), (4, 5)),
+    7: ((1, 3), (2, 3), (4, 5), (4, 6)),
+    8: ((2, 4), (4, 6)),
+}
+
+
+def _build_graph(rows, neighbors):
+    """
+    Grafo de adyacencia: carácter -> lista de teclas vecinas (None si no hay)
+    """
+    positions = {}
+    for y, (start, keys) in enumerate(rows):
+        for x, key in enumerate(keys, start):
+            positions[(x, y)] = key
+    graph = {}
+    for (x, y), key in positions.items():
+        adjacent = [positions.get((x + dx, y + dy)) for dx, dy in neighbors]
+        for ch in key:
+            graph[ch] = adjacent
+    return graph
+
+
+def _graph_stats(graph):
+    degree = sum(sum(1 for key in adjacent if key) for adjacent in graph.values())
+    return len(graph), degree / len(graph)
+
+
+GRAPHS = {
+    'qwerty': _build_graph(QWERTY, SLANTED_NEIGHBORS),
+    'keypad': _build_graph(KEYPAD, ALIGNED_NEIGHBORS),
+}
+GRAPH_STATS = {name: _graph_stats(graph) for name, graph in GRAPHS.items()}
+
+
+def parse_attack_rates(values):
+    """
+    Convierte ['nombre=intentos_por_segundo', ...] en un dict de escenarios
+    que se suman (o sustituyen) a los de ATTACK_RATES
+    """
+    rates = dict(ATTACK_RATES)
+    for value in values:
+        name, _, rate = value.partition('=')
+        try:
+            rate = float(rate)
+        except ValueError:
+            rate = 0
+        if not name.strip() or rate <= 0:
+            raise ValueError(f"Escenario de ataque inválido: {value} (usa nombre=intentos_por_segundo)")
+        rates[name.strip()] = rate
+    return rates
+
+
+def _lower(text):
+    """
+    Minúsculas sin cambiar la longitud del texto: los caracteres cuya
+    minúscula tiene varios (como 'İ') se sustituyen por uno que no coincide
+    con nada
+    """
+    lower = text.lower()
+    if len(lower) == len(text):
+        return lower
+    return ''.join('\0' if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+
+def _choose(n, k):
+    return math.comb(n, k) if 0 <= k <= n else 0
+
+
+def uppercase_variations(token):
+    """
+    Multiplicador por el uso de mayúsculas en una palabra de diccionario
+    """
+    if token == token.lower():
+        return 1
+    if _START_UPPER.match(token) or _END_UPPER.match(token) or _ALL_UPPER.match(token):
+        return 2
+    upper = sum(1 for ch in token if ch.isupper())
+    lower = sum(1 for ch in token if ch.islower())
+    return sum(_choose(upper + lower, i) for i in range(1, min(upper, lower) + 1)) or 1
+
+
+def l33t_variations(token, word):
+    """
+    Multiplicador por las sustituciones leetspeak (token en minúsculas)
+    """
+    substitutions = {}
+    for ch, letter in zip(token, word):
+        if ch != letter:
+            substitutions[ch] = letter
+    variations = 1
+    for ch, letter in substitutions.items():
+        subbed = token.count(ch)
+        unsubbed = token.count(letter)
+        if not subbed or not unsubbed:
+            variations *= 2
+        else:
+            variations *= sum(_choose(subbed + unsubbed, i)
+                              for i in range(1, min(subbed, unsubbed) + 1))
+    return variations
+
+
+def format_seconds(seconds):
+    """
+    Duración legible en español
+    """
+    units = (('siglo', 'siglos', 100 * 365.25 * 86400), ('año', 'años', 365.25 * 86400),
+             ('mes', 'meses', 30.44 * 86400), ('día', 'días', 86400),
+             ('hora', 'horas', 3600), ('minuto', 'minutos', 60), ('segundo', 'segundos', 1))
+    if seconds < 1:
+        return "menos de 1 segundo"
+    if seconds >= 1e6 * units[0][2]:
+        return "más de un millón de siglos"
+    for singular, plural, size in units:
+        if seconds >= size:
+            count = round(seconds / size)
+            return f"{count:,} {singular if count == 1 else plural}"
+
+
+class GuessEstimator:
+    """
+    Estimador de intentos por coincidencias. 'ranked_words' es un dict
+    palabra -> rango (1 = la más frecuente); 'dictionary' es un
+    DictionaryMatcher opcional, cuyos rangos también se usan.
+
+    Solo se analizan los primeros 'max_length' caracteres (el resultado es
+    entonces una cota inferior), se conservan como mucho 'max_matches'
+    coincidencias, las de menos intentos por carácter, y en cada posición la
+    búsqueda guarda como mucho 'max_sequence_lengths' números de piezas
+    """
+    def __init__(self, ranked_words=None, dictionary=None, max_length=64, max_matches=300,
+                 graphs=None, max_sequence_lengths=8):
+        self.ranked_words = dict(ranked_words or {})
+        # Tablas de teclado: nombre -> grafo de adyacencia
+        if graphs is None:
+            self.graphs, self.graph_stats = GRAPHS, GRAPH_STATS
+        else:
+            self.graphs = graphs
+            self.graph_stats = {name: _graph_stats(graph) for name, graph in graphs.items()}
+        self.max_word_length = max(map(len, self.ranked_words), default=0)
+        self.dictionary = dictionary
+        self.max_length = max_length
+        self.max_matches = max_matches
+        self.max_sequence_lengths = max_sequence_lengths
+
+    def estimate(self, password):
+        """
+        Devuelve {'guesses', 'guesses_log10', 'sequence', 'truncated'}. La
+        secuencia es la descomposición óptima como (patrón, texto, intentos)
+        """
+        truncated = len(password) > self.max_length
+        text = password[:self.max_length]
+        guesses, sequence = self._most_guessable(text, self.omnimatch(text))
+        guesses = int(guesses)
+        return {
+            'guesses': guesses,
+            'guesses_log10': round(math.log10(guesses), 2) if guesses > 0 else 0.0,
+            'sequence': [(match.pattern, match.token, match.guesses) for match in sequence],
+            'truncated': truncated,
+        }
+
+    # Coincidencias
+    def omnimatch(self, password):
+        matches = []
+        matches += self._dictionary_matches(password)
+        matches += self._spatial_matches(password)
+        matches += self._sequence_matches(password)
+        matches += self._repeat_matches(password)
+        matches += self._date_matches(password)
+        matches += self._year_matches(password)
+        if len(matches) > self.max_matches:
+            matches.sort(key=lambda m: math.log10(max(m.guesses, 1)) / (m.j - m.i + 1))
+            del matches[self.max_matches:]
+        return matches
+
+    def _dictionary_matches(self, password):
+        matches = []
+        lower = _lower(password)
+        n = len(password)
+
+        # Listas integradas: texto tal cual, con leetspeak y al revés
+        if self.ranked_words:
+            variants = [(lower, False)]
+            for table in (LEET_TABLE, LEET_ALTERNATIVE):
+                normalized = lower.translate(table).translate(LEET_TABLE)
+                if normalized != lower and (normalized, True) not in variants:
+                    variants.append((normalized, True))
+            reversed_lower = lower[::-1]
+            for i in range(n):
+                for j in range(i + 1, min(n, i + self.max_word_length) + 1):
+                    for text, leet in variants:
+                        rank = self.ranked_words.get(text[i:j])
+                        if rank is not None:
+                            matches.append(self._dictionary_match(
+                                password, i, j, text[i:j], rank, leet=leet))
+                    word = reversed_lower[n - j:n - i]
+                    rank = self.ranked_words.get(word)
+                    if rank is not None and word != lower[i:j]:
+                        matches.append(self._dictionary_match(
+                            password, i, j, word, rank, reverse=True))
+
+        # Diccionario compilado (Aho–Corasick, con leetspeak)
+        if self.dictionary is not None:
+            dictionary = self.dictionary
+            for start, end, word_id in dictionary.matches(lower):
+                word = dictionary.word(word_id)
+                matches.append(self._dictionary_match(
+                    password, start, end, word, dictionary.word_rank[word_id],
+                    leet=lower[start:end] != word))
+            for start, end, word_id in dictionary.matches(lower[::-1]):
+                word = dictionary.word(word_id)
+                i, j = n - end, n - start
+                if lower[i:j] != word:
+                    matches.append(self._dictionary_match(
+                        password, i, j, word, dictionary.word_rank[word_id], reverse=True))
+        return matches
+
+    @staticmethod
+    def _dictionary_match(password, i, j, word, rank, leet=False, reverse=False):
+        token = password[i:j]
+        guesses = rank * uppercase_variations(token)
+        if leet:
+            guesses *= l33t_variations(token.lower(), word)
+        if reverse:
+            guesses *= 2
+        pattern = 'reverse_dictionary' if reverse else 'l33t' if leet else 'dictionary'
+        return Match(pattern, i, j - 1, token, guesses, word)
+
+    def _spatial_matches(self, password):
+        matches = []
+        n = len(password)
+        for name, graph in self.graphs.items():
+            starting_positions, average_degree = self.graph_stats[name]
+            i = 0
+            while i < n - 1:
+                j = i + 1
+                last_direction = None
+                turns = 0
+                shifted = 1 if name == 'qwerty' and password[i] in SHIFTED_KEYS else 0
+                while True:
+                    found = False
+                    if j < n:
+                        adjacent = graph.get(password[j - 1], ())
+                        for direction, key in enumerate(adjacent):
+                            if key and password[j] in key:
+                                found = True
+                                if key.index(password[j]) == 1:
+                                    shifted += 1
+                                if last_direction != direction:
+                                    turns += 1
+                                    last_direction = direction
+                                break
+                    if found:
+                        j += 1
+                        continue
+                    if j - i > 2:
+                        guesses = _spatial_guesses(j - i, turns, shifted, starting_positions,
+                                                   average_degree)
+                        matches.append(Match('spatial', i, j - 1, password[i:j], guesses, name))
+                    i = j
+                    break
+        return matches
+
+    @staticmethod
+    def _sequence_matches(password):
+        matches = []
+        n = len(password)
+        if n < 2:
+            return matches
+
+        def update(i, j, delta):
+            if (j - i > 1 or abs(delta) == 1) and 0 < abs(delta) <= MAX_DELTA:
+                token = password[i:j + 1]
+                first = token[0]
+                if first in 'aAzZ019':
+                    base = 4
+                elif first.isdigit():
+                    base = 10
+                else:
+                    base = 26
+                if delta < 0:
+                    base *= 2
+                matches.append(Match('sequence', i, j, token, base * len(token),
+                                     'asc' if delta > 0 else 'desc'))
+
+        i = 0
+        last_delta = None
+        for k in range(1, n):
+            delta = ord(password[k]) - ord(password[k - 1])
+            if last_delta is None:
+                last_delta = delta
+            if delta == last_delta:
+                continue
+            update(i, k - 1, last_delta)
+            i = k - 1
+            last_delta = delta
+        update(i, n - 1, last_delta)
+        return matches
+
+    def _repeat_matches(self, password):
+        matches = []
+        position = 0
+        while position < len(password):
+            greedy = _GREEDY_REPEAT.search(password, position)
+            if greedy is None:
+                break
+            lazy = _LAZY_REPEAT.search(password, position)
+            if len(greedy.group(0)) > len(lazy.group(0)):
+                match = greedy
+                base = _LAZY_ANCHORED_REPEAT.match(match.group(0)).group(1)
+            else:
+                match = lazy
+                base = match.group(1)
+            base_guesses, _ = self._most_guessable(base, self.omnimatch(base),
+                                                   exclude_additive=True)
+            count = len(match.group(0)) // len(base)
+            matches.append(Match('repeat', match.start(), match.end() - 1, match.group(0),
+                                 base_guesses * count, base))
+            position = match.end()
+        return matches
+
+    @staticmethod
+    def _year_matches(password):
+        return [Match('year', m.start(), m.end() - 1, m.group(0),
+                      max(abs(int(m.group(0)) - REFERENCE_YEAR), MIN_YEAR_SPACE), m.group(0))
+                for m in _RECENT_YEAR.finditer(password)]
+
+    @staticmethod
+    def _date_matches(password):
+        matches = []
+        n = len(password)
+        for run in _DIGITS.finditer(password):
+            start, end = run.span()
+            for i in range(start, end - 3):
+                for j in range(i + 3, min(end, i + 8)):
+                    token = password[i:j + 1]
+                    best = None
+                    for k, l in DATE_SPLITS[len(token)]:
+                        date = _map_ints_to_dmy((int(token[:k]), int(token[k:l]), int(token[l:])))
+                        if date and (best is None or abs(date[0] - REFERENCE_YEAR) <
+                                     abs(best[0] - REFERENCE_YEAR)):
+                            best = date
+                    if best:
+                        matches.append(Match('date', i, j, token, _date_guesses(best[0], False),
+                                             '-'.join(map(str, best))))
+        for i in range(n - 5):
+            for j in range(i + 5, min(n, i + 10)):
+                token = password[i:j + 1]
+                found = _DATE_WITH_SEPARATOR.match(token)
+                if not found:
+                    continue
+                date = _map_ints_to_dmy((int(found.group(1)), int(found.group(3)),
+                                         int(found.group(4))))
+                if date:
+                    matches.append(Match('date', i, j, token, _date_guesses(date[0], True),
+                                         '-'.join(map(str, date))))
+        # Se descartan las fechas contenidas en otra fecha mayor: en orden de
+        # inicio (y de final descendente) basta con el mayor final visto
+        kept = set()
+        furthest = -1
+        for index in sorted(range(len(matches)), key=lambda k: (matches[k].i, -matches[k].j)):
+            if matches[index].j > furthest:
+                kept.add(index)
+                furthest = matches[index].j
+        return [m for index, m in enumerate(matches) if index in kept]
+
+    # Descomposición óptima
+    def _most_guessable(self, password, matches, exclude_additive=False):
+        """
+        Programación dinámica de zxcvbn: para cada posición final y número
+        de piezas guarda la mejor secuencia y devuelve (intentos, secuencia)
+        """
+        n = len(password)
+        if not n:
+            return 1, []
+        by_end = [[] for _ in range(n)]
+        for match in matches:
+            by_end[match.j].append(match)
+        for bucket in by_end:
+            bucket.sort(key=lambda m: m.i)
+
+        best_match = [{} for _ in range(n)]
+        best_product = [{} for _ in range(n)]
+        best_guesses = [{} for _ in range(n)]
+
+        def minimum(token):
+            if len(token) == n:
+                return 1
+            return (MIN_SUBMATCH_GUESSES_SINGLE_CHAR if len(token) == 1
+                    else MIN_SUBMATCH_GUESSES_MULTI_CHAR)
+
+        factorials = [math.factorial(length) for length in range(n + 2)]
+        additive = [0 if exclude_additive else MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (length - 1)
+                    for length in range(n + 1)]
+        max_lengths = self.max_sequence_lengths
+
+        def update(match, length):
+            k = match.j
+            product = max(match.guesses, minimum(match.token))
+            if length > 1:
+                product *= best_product[match.i - 1][length - 1]
+            guesses = factorials[length] * product + additive[length]
+            candidates = best_guesses[k]
+            for other_length, other_guesses in candidates.items():
+                if other_length <= length and other_guesses <= guesses:
+                    return
+            candidates[length] = guesses
+            best_match[k][length] = match
+            best_product[k][length] = product
+            # Como mucho max_lengths números de piezas por posición: se
+            # descarta la secuencia con más intentos
+            if len(candidates) > max_lengths:
+                worst = max(candidates, key=candidates.get)
+                del candidates[worst]
+                del best_match[k][worst]
+                del best_product[k][worst]
+
+        def bruteforce(i, j):
+            token = password[i:j + 1]
+            guesses = BRUTEFORCE_CARDINALITY ** len(token)
+            floor = (MIN_SUBMATCH_GUESSES_SINGLE_CHAR + 1 if len(token) == 1
+                     else MIN_SUBMATCH_GUESSES_MULTI_CHAR + 1)
+            return Match('bruteforce', i, j, token, max(guesses, floor), None)
+
+        # Secuencias que se pueden alargar con fuerza bruta. Una que acaba en
+        # k con l piezas y producto p llega a k' con (l+1)!·p·10^(k'-k) más el
+        # término aditivo, así que se compara por su peso (l+1)!·p·10^(n-k-1):
+        # si otra anterior con menos o las mismas piezas pesa lo mismo o menos,
+        # su extensión llega antes a cada k' y esta se descartaría siempre. La
+        # fuerza bruta desde el principio hace de secuencia de 0 piezas
+        scale = [BRUTEFORCE_CARDINALITY ** (n - i) for i in range(n + 1)]
+        lightest = [scale[0]] * (n + 1)   # piezas -> menor peso con esas o menos
+        extendable = [()] * n
+        for k in range(n):
+            for match in by_end[k]:
+                if match.i > 0:
+                    for length in list(best_match[match.i - 1]):
+                        update(match, length + 1)
+                else:
+                    update(match, 1)
+            update(bruteforce(0, k), 1)
+            for i in range(1, k + 1):
+                if extendable[i - 1]:
+                    candidate = bruteforce(i, k)
+                    for length in extendable[i - 1]:
+                        update(candidate, length + 1)
+            sources = [(length, best_product[k][length] * factorials[length + 1] * scale[k + 1])
+                       for length, last in best_match[k].items()
+                       if last.pattern != 'bruteforce']
+            sources = [(length, weight) for length, weight in sources
+                       if weight < lightest[length]]
+            extendable[k] = [length for length, _ in sources]
+            for length, weight in sources:
+                for more in range(length, n + 1):
+                    if weight >= lightest[more]:
+                        break
+                    lightest[more] = weight
+
+        length = min(best_guesses[n - 1], key=best_guesses[n - 1].get)
+        guesses = best_guesses[n - 1][length]
+        sequence = []
+        k = n - 1
+        while k >= 0:
+            match = best_match[k][length]
+            sequence.insert(0, match)
+            k = match.i - 1
+            length -= 1
+        return guesses, sequence
+
+
+def _spatial_guesses(length, turns, shifted, starting_positions, average_degree):
+    guesses = 0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += _choose(i - 1, j - 1) * starting_positions * average_degree ** j
+    if shifted:
+        unshifted = length - shifted
+        if not unshifted:
+            guesses *= 2
+        else:
+            guesses *= sum(_choose(shifted + unshifted, i)
+                           for i in range(1, min(shifted, unshifted) + 1))
+    return guesses
+
+
+def _map_ints_to_dm(a, b):
+    for day, month in ((a, b), (b, a)):
+        if 1 <= day <= 31 and 1 <= month <= 12:
+            return day, month
+    return None
+
+
+def _two_to_four_digit_year(year):
+    if year > 99:
+        return year
+    return 1900 + year if year > 50 else 2000 + year
+
+
+def _map_ints_to_dmy(ints):
+    """
+    Interpreta tres enteros como fecha: devuelve (año, mes, día) o None
+    """
+    if ints[1] > 31 or ints[1] <= 0:
+        return None
+    over_12 = over_31 = under_1 = 0
+    for value in ints:
+        if 99 < value < DATE_MIN_YEAR or value > DATE_MAX_YEAR:
+            return None
+        over_31 += value > 31
+        over_12 += value > 12
+        under_1 += value <= 0
+    if over_31 >= 2 or over_12 == 3 or under_1 >= 2:
+        return None
+    splits = ((ints[2], ints[0], ints[1]), (ints[0], ints[1], ints[2]))
+    for year, a, b in splits:
+        if DATE_MIN_YEAR <= year <= DATE_MAX_YEAR:
+            day_month = _map_ints_to_dm(a, b)
+            return (year, day_month[1], day_month[0]) if day_month else None
+    for year, a, b in splits:
+        day_month = _map_ints_to_dm(a, b)
+        if day_month:
+            return _two_to_four_digit_year(year), day_month[1], day_month[0]
+    return None
+
+
+def _date_guesses(year, separator):
+    guesses = max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE) * 365
+    return guesses * 4 if separator else guesses
@@ -0,0 +1,284 @@
+"""
+Análisis incremental para formularios que analizan la contraseña en cada
+pulsación. La sesión guarda, para cada posición del texto, los patrones y
+las palabras de diccionario que empiezan en ella (y cuáles no están
+contenidas en otra mayor); una edición solo vuelve a examinar la ventana de
+posiciones que la rodea, así que escribir o borrar un carácter cuesta lo
+mismo con 8 que con 200 caracteres
+"""
+
+import re
+from collections import Counter
+
+from result import AnalysisResult
+from scanner import DATE_PATTERN, DIGITS, LOWERCASE, UPPERCASE
+
+# Coincidencias solapadas: una por cada posición en la que empiezan
+_DATE_AT = re.compile(f'(?={DATE_PATTERN})')
+_REPEAT_AT = re.compile(r'(?=(\w)\1\1)')
+
+# Clase de cada carácter ASCII (el resto cuenta como símbolo)
+_CLASSES = {**{ch: 'lowercase' for ch in LOWERCASE}, **{ch: 'uppercase' for ch in UPPERCASE},
+            **{ch: 'digits' for ch in DIGITS}}
+
+
+def _irregular(ch):
+    """
+    Caracteres cuya minúscula no es un único carácter o depende del
+    contexto (sigma final): con ellos las posiciones no se corresponden
+    """
+    return ch == 'Σ' or len(ch.lower()) != 1
+
+
+class AnalysisSession:
+    """
+    Sesión de análisis incremental. Los resultados de result() coinciden
+    exactamente con analyze_password(session.text).
+
+    Las ediciones y result() cuestan tiempo constante más la copia del texto
+    y, en medio del texto, el desplazamiento de las listas por posición.
+    Los patrones personalizados que no son literales y los caracteres
+    Unicode con minúscula irregular vuelven al análisis completo
+    """
+    def __init__(self, analyzer, text=''):
+        self.analyzer = analyzer
+        self.scanner = analyzer.scanner
+        self.dictionary = analyzer.dictionary
+        self.window = max([4, 3] + [len(token) for token in self.scanner.tokens] +
+                          [self.dictionary.max_word_length if self.dictionary else 0])
+        self._text = ''
+        self._lower = []
+        # Por posición: etiquetas de patrón y (longitud, id de palabra) que
+        # empiezan en ella, y de esas las no contenidas en otra coincidencia
+        self._labels = []
+        self._words = []
+        self._maximal = []
+        self._label_counts = Counter()
+        # Palabras maximales en orden de aparición (None si hay que recalcularlo)
+        self._word_order = []
+        self._class_counts = Counter()
+        self._irregular = 0
+        if text:
+            self.append(text)
+
+    @property
+    def text(self):
+        return self._text
+
+    def __len__(self):
+        return len(self._text)
+
+    # Ediciones
+    def append(self, text):
+        """
+        Añade texto al final (lo que se escribe en el campo)
+        """
+        self.replace(len(self._text), len(self._text), text)
+        return self
+
+    def delete(self, start, stop=None):
+        """
+        Borra text[start:stop] (por defecto un carácter). delete(-1) es la
+        tecla de retroceso
+        """
+        if stop is None:
+            # Un carácter; con start=-1, el último
+            stop = start + 1 if start != -1 else len(self._text)
+        return self.replace(start, stop, '')
+
+    def replace(self, start, stop, text):
+        """
+        Sustituye text[start:stop] por el texto indicado (inserción si
+        start == stop)
+        """
+        n = len(self._text)
+        start, stop, _ = slice(start, stop).indices(n)
+        stop = max(start, stop)
+        inserted = len(text)
+        window = self.window
+        was_irregular = self._irregular > 0
+        # Una palabra solo puede contener a otra que empiece menos de
+        # max_word_length posiciones después que ella
+        reach = self.dictionary.max_word_length - 1 if self.dictionary is not None else 0
+
+        # Quitar lo que aportaban las posiciones afectadas
+        low = max(0, start - window + 1)
+        self._forget(low, stop)
+        removed = self._forget_maximal(low, stop + reach)
+        for ch in self._text[start:stop]:
+            self._class_counts[_CLASSES.get(ch, 'symbols')] -= 1
+            self._irregular -= _irregular(ch)
+
+        # Aplicar la edición
+        self._text = self._text[:start] + text + self._text[stop:]
+        self._lower[start:stop] = [ch.lower() for ch in text]
+        self._labels[start:stop] = [()] * inserted
+        self._words[start:stop] = [()] * inserted
+        self._maximal[start:stop] = [()] * inserted
+        for ch in text:
+            self._class_counts[_CLASSES.get(ch, 'symbols')] += 1
+            self._irregular += _irregular(ch)
+
+        if self._irregular:
+            # El índice queda desactualizado hasta que desaparezcan esos caracteres
+            return self
+        if was_irregular:
+            self._rebuild()
+        else:
+            self._index(low, start + inserted)
+            # El orden de aparición solo cambia si cambian las maximales de la ventana
+            if self._mark_maximal(low, start + inserted + reach) != removed:
+                self._word_order = None
+        return self
+
+    def _forget(self, low, high):
+        counts = self._label_counts
+        for labels in self._labels[low:high]:
+            for label in labels:
+                counts[label] -= 1
+        self._labels[low:high] = [()] * (high - low)
+        self._words[low:high] = [()] * (high - low)
+
+    def _forget_maximal(self, low, high):
+        """
+        Quita las palabras maximales que empiezan en [low, high) y devuelve
+        sus ids en orden
+        """
+        removed = [word_id for maximal in self._maximal[low:high] for _, word_id in maximal]
+        self._maximal[low:high] = [()] * len(self._maximal[low:high])
+        return removed
+
+    def _mark_maximal(self, low, high):
+        """
+        Vuelve a decidir qué coincidencias de [low, high) no están contenidas
+        en otra (mismo criterio que DictionaryMatcher.maximal_words) y
+        devuelve sus ids en orden
+        """
+        high = min(high, len(self._text))
+        if self.dictionary is None or low >= high:
+            return []
+        words = self._words
+        added = []
+        # Fin más lejano de las coincidencias que empiezan antes de cada posición
+        furthest = -1
+        for position in range(max(0, low - self.dictionary.max_word_length + 1), high):
+            matches = words[position]
+            if not matches:
+                continue
+            # Ordenadas por longitud: solo las más largas pueden ser maximales
+            end = position + matches[-1][0]
+            if position >= low and furthest < end:
+                maximal = tuple(match for match in matches if match[0] == matches[-1][0])
+                self._maximal[position] = maximal
+                added.extend(word_id for _, word_id in maximal)
+            furthest = max(furthest, end)
+        return added
+
+    def _index(self, low, high):
+        """
+        Vuelve a calcular los patrones y palabras que empiezan en [low, high)
+        """
+        high = min(high, len(self._text))
+        if low >= high:
+            return
+        span = high - low
+        chunk = ''.join(self._lower[low:high + self.window - 1])
+        scanner = self.scanner
+        hits = {}
+        for token, labels in scanner.tokens.items():
+            position = chunk.find(token)
+            while 0 <= position < span:
+                hits.setdefault(position, []).extend(labels)
+                position = chunk.find(token, position + 1)
+        specials = [(_DATE_AT, ['date_pattern'])]
+        if scanner.repeat_labels:
+            specials.append((_REPEAT_AT, scanner.repeat_labels))
+        for regex, labels in specials:
+            for match in regex.finditer(chunk):
+                if match.start() >= span:
+                    break
+                hits.setdefault(match.start(), []).extend(labels)
+        counts = self._label_counts
+        for offset, labels in hits.items():
+            self._labels[low + offset] = tuple(labels)
+            for label in labels:
+                counts[label] += 1
+
+        if self.dictionary is not None:
+            starts = {}
+            for variant in _chunk_variants(chunk):
+                for begin, end, word_id in self.dictionary._scan(variant):
+                    if begin < span:
+                        starts.setdefault(begin, set()).add((end - begin, word_id))
+            for begin, matches in starts.items():
+                self._words[low + begin] = tuple(sorted(matches))
+
+    def _rebuild(self):
+        """
+        Reconstruye el índice completo (tras salir del modo irregular)
+        """
+        n = len(self._text)
+        self._label_counts.clear()
+        self._labels = [()] * n
+        self._words = [()] * n
+        self._maximal = [()] * n
+        self._index(0, n)
+        self._mark_maximal(0, n)
+        self._word_order = None
+
+    # Resultado
+    def character_sets(self):
+        counts = self._class_counts
+        sets = {
+            'lowercase': counts['lowercase'] > 0,
+            'uppercase': counts['uppercase'] > 0,
+            'digits': counts['digits'] > 0,
+            'symbols': counts['symbols'] > 0,
+            'count': 0
+        }
+        sets['count'] = sets['lowercase'] + sets['uppercase'] + sets['digits'] + sets['symbols']
+        return sets
+
+    def _dictionary_words(self):
+        if self.dictionary is None:
+            return None
+        if self._word_order is None:
+            # Solo se recorren las posiciones con palabras maximales
+            word_ids = dict.fromkeys(word_id for maximal in filter(None, self._maximal)
+                                     for _, word_id in maximal)
+            self._word_order = [self.dictionary.word(word_id) for word_id in word_ids]
+        return list(self._word_order)
+
+    def result(self):
+        """
+        Análisis del texto actual (mismo resultado que analyze_password)
+        """
+        password = self.text
+        if not password:
+            return self.analyzer.analyze_password(password)
+        if self._irregular or self.scanner.fallback:
+            # Sin correspondencia de posiciones: análisis completo
+            return self.analyzer.analyze_password(password)
+
+        sets = self.character_sets()
+        words = self._dictionary_words()
+        patterns = self.scanner.ordered({label for label, count in self._label_counts.items()
+                                         if count})
+        if words:
+            patterns.append('dictionary_word')
+        return AnalysisResult.from_values(self.analyzer, {
+            'password': password,
+            'length': len(password),
+            'character_sets': sets,
+            'entropy': self.scanner.entropy(len(password), sets),
+            'patterns': patterns,
+            'dictionary_words': words,
+        })
+
+
+def _chunk_variants(chunk):
+    from dictionary import LEET_ALTERNATIVE, LEET_TABLE
+    variants = [chunk.translate(LEET_TABLE)]
+    if '1' in chunk or '|' in chunk:
+        variants.append(chunk.translate(LEET_ALTERNATIVE).translate(LEET_TABLE))
+    return variants
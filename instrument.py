@@ -0,0 +1,179 @@
+"""
+Instrumentación opcional por etapas del analizador. Al activarla se
+envuelven los métodos de cada etapa en la propia instancia; al desactivarla
+se eliminan los envoltorios, así que sin perfil el coste es exactamente cero
+"""
+
+import time
+
+# Etapa -> (objeto dentro del analizador, método). '' es el propio analizador
+STAGES = (
+    ('character_sets', '', '_analyze_character_sets'),
+    ('patterns', '', '_detect_patterns'),
+    ('entropy', 'scanner', 'entropy'),
+    ('crack_time', '', '_crack_time_for_entropy'),
+    ('is_common', '', '_is_common_password'),
+    ('breach_lookup', '', '_breach_count'),
+    ('dictionary', '', '_find_dictionary_words'),
+    ('score', '', '_calculate_score'),
+    ('feedback', '', '_generate_feedback'),
+    ('guesses', '', '_estimate_guesses'),
+    ('markov', '', '_markov_bits'),
+    ('pcfg', '', '_pcfg_bits'),
+)
+STAGE_NAMES = tuple(stage for stage, _, _ in STAGES)
+
+
+class StageStats:
+    """
+    Contadores de una etapa: llamadas, tiempo propio acumulado e histograma
+    en cubos de potencias de dos (el cubo k cuenta tiempos < 2**k ns)
+    """
+    __slots__ = ('calls', 'total_ns', 'max_ns', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = {}
+
+    def add(self, elapsed_ns):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        bucket = elapsed_ns.bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def percentile(self, percent):
+        """
+        Percentil aproximado (límite superior del cubo que lo contiene), en ns
+        """
+        if not self.calls:
+            return 0
+        target = self.calls * percent / 100
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= target:
+                return min(2 ** bucket, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'total_ns': self.total_ns,
+            'mean_ns': self.total_ns // self.calls if self.calls else 0,
+            'max_ns': self.max_ns,
+            'p50_ns': self.percentile(50),
+            'p99_ns': self.percentile(99),
+            'histogram': {2 ** bucket: count for bucket, count in sorted(self.histogram.items())},
+        }
+
+
+class StageProfiler:
+    """
+    Perfil por etapas de PasswordAnalyzer. El tiempo de cada etapa es
+    exclusivo: si la puntuación calcula los patrones al consultarlos, ese
+    tiempo cuenta en 'patterns' y no en 'score'.
+
+    Los hooks son callables hook(etapa, ns) que se llaman en cada medición
+    para exportar a un sistema de métricas propio; snapshot() devuelve todos
+    los contadores para exportarlos bajo demanda
+    """
+    def __init__(self, hooks=(), clock=time.perf_counter_ns):
+        self.stages = {stage: StageStats() for stage in STAGE_NAMES}
+        self.hooks = list(hooks)
+        self.clock = clock
+        self._child_ns = 0
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def wrap(self, stage, func):
+        """
+        Devuelve func envuelta con la medición de la etapa indicada
+        """
+        stats = self.stages[stage]
+        clock = self.clock
+        hooks = self.hooks
+
+        def timed(*args):
+            outer_child = self._child_ns
+            self._child_ns = 0
+            start = clock()
+            try:
+                return func(*args)
+            finally:
+                elapsed = clock() - start
+                own = elapsed - self._child_ns
+                self._child_ns = outer_child + elapsed
+                stats.add(own)
+                for hook in hooks:
+                    hook(stage, own)
+        timed.__wrapped__ = func
+        return timed
+
+    def install(self, analyzer):
+        """
+        Envuelve los métodos de las etapas en la instancia del analizador
+        (idempotente: siempre se parte del método original de la clase)
+        """
+        for stage, owner_name, method in STAGES:
+            owner = getattr(analyzer, owner_name) if owner_name else analyzer
+            original = getattr(type(owner), method).__get__(owner)
+            setattr(owner, method, self.wrap(stage, original))
+
+    @staticmethod
+    def uninstall(analyzer):
+        """
+        Elimina los envoltorios y deja los métodos de la clase
+        """
+        for _, owner_name, method in STAGES:
+            owner = getattr(analyzer, owner_name) if owner_name else analyzer
+            owner.__dict__.pop(method, None)
+
+    def reset(self):
+        """
+        Pone a cero los contadores (los envoltorios instalados siguen activos)
+        """
+        for stats in self.stages.values():
+            stats.__init__()
+
+    def snapshot(self):
+        """
+        Contadores de todas las etapas como dict serializable
+        """
+        return {stage: stats.to_dict() for stage, stats in self.stages.items()}
+
+    def report(self, file=None):
+        """
+        Imprime el desglose por etapas ordenado por tiempo acumulado
+        """
+        total = sum(stats.total_ns for stats in self.stages.values()) or 1
+        print(f"{'etapa':14}  {'llamadas':>10}  {'total ms':>10}  {'%':>6}  "
+              f"{'media µs':>9}  {'p50 µs':>8}  {'p99 µs':>8}", file=file)
+        for stage, stats in sorted(self.stages.items(), key=lambda item: -item[1].total_ns):
+            if not stats.calls:
+                continue
+            print(f"{stage:14}  {stats.calls:10}  {stats.total_ns / 1e6:10.1f}  "
+                  f"{stats.total_ns / total * 100:5.1f}%  "
+                  f"{stats.total_ns / stats.calls / 1000:9.2f}  "
+                  f"{stats.percentile(50) / 1000:8.2f}  {stats.percentile(99) / 1000:8.2f}",
+                  file=file)
+        print("\nHistograma (límite superior del cubo: % de llamadas):", file=file)
+        for stage, stats in self.stages.items():
+            if not stats.calls:
+                continue
+            buckets = [f"<{_format_ns(2 ** bucket)} {count / stats.calls * 100:.0f}%"
+                       for bucket, count in sorted(stats.histogram.items())
+                       if count / stats.calls >= 0.01]
+            print(f"  {stage:14}  {' | '.join(buckets)}", file=file)
+
+
+def _format_ns(ns):
+    if ns < 1000:
+        return f"{ns}ns"
+    if ns < 1000000:
+        return f"{ns / 1000:g}µs"
+    return f"{ns / 1000000:g}ms"
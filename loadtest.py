@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga del servicio HTTP local (server.py / main.py --serve).
+Abre C conexiones keep-alive concurrentes y mide peticiones por segundo
+y latencias p50/p99 vistas por el cliente
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+from benchmark import synthetic_corpus
+
+
+async def _request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                  ).encode('latin-1') + body)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("el servidor cerró la conexión")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def _client(host, port, jobs, latencies, errors):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as e:
+        errors.append(f"conexión: {e}")
+        return
+    try:
+        while jobs:
+            path, payload = jobs.pop()
+            start = time.perf_counter()
+            try:
+                status, response = await _request(reader, writer, 'POST', path, payload)
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+                # La conexión queda inservible: este cliente deja de enviar
+                errors.append(f"conexión: {str(e) or type(e).__name__}")
+                return
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(f"{status} {response.get('error', '')}".strip())
+    finally:
+        writer.close()
+
+
+def _percentile_ms(ordered, percent):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, len(ordered) * percent // 100)] * 1000, 3)
+
+
+async def run_load(host='127.0.0.1', port=8765, requests=5000, concurrency=32,
+                   endpoint='analyze', batch_size=100):
+    """
+    Lanza la carga y devuelve un dict con el resumen de resultados
+    """
+    corpus = synthetic_corpus(requests * (batch_size if endpoint == 'batch' else 1))
+    if endpoint == 'batch':
+        jobs = [('/batch', {'passwords': corpus[i:i + batch_size], 'fields': ['score']})
+                for i in range(0, len(corpus), batch_size)]
+    elif endpoint == 'generate':
+        jobs = [('/generate', {'count': 1, 'length': 16})] * requests
+    else:
+        jobs = [('/analyze', {'password': password, 'fields': ['score', 'strength']})
+                for password in corpus]
+    jobs.reverse()
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, jobs, latencies, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        _, server_stats = await _request(reader, writer, 'GET', '/stats')
+        writer.close()
+    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+        server_stats = None
+
+    # Solo cuentan para throughput y latencia las respuestas correctas
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_samples': Counter(errors).most_common(5),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': _percentile_ms(latencies, 50),
+        'p99_ms': _percentile_ms(latencies, 99),
+        'server': server_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga del servicio local')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('-n', '--requests', type=int, default=5000)
+    parser.add_argument('-c', '--concurrency', type=int, default=32)
+    parser.add_argument('--endpoint', choices=['analyze', 'batch', 'generate'], default='analyze')
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load(args.host, args.port, args.requests, args.concurrency,
+                                  args.endpoint, args.batch_size))
+    server = result.pop('server')
+    print(f"Peticiones: {result['requests']} ({result['errors']} errores) "
+          f"en {result['seconds']}s")
+    print(f"Throughput: {result['requests_per_second']} peticiones/s")
+    if result['requests']:
+        print(f"Latencia cliente: p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms")
+    else:
+        print("Latencia cliente: sin respuestas correctas")
+    for error, count in result['error_samples']:
+        print(f"  ✗ {count} × {error}")
+    if server is not None:
+        print(f"Tamaño medio de micro-lote en el servidor: {server['average_batch_size']}")
+
+
+if __name__ == '__main__':
+    main()
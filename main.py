@@ -6,17 +6,78 @@ Autor: [Tu nombre]
 
 import argparse
 import sys
-from colorama import init, Fore, Style, Back
-from generator import PasswordGenerator
-from analyzer import PasswordAnalyzer
 
-# Inicializar colorama para Windows
-init()
+# colorama y los módulos de análisis se importan bajo demanda, para que los
+# modos no interactivos (-g, -a, --stdio) arranquen rápido
+Fore = Style = Back = None
+
+
+def load_colors():
+    """
+    Importa e inicializa colorama (solo los modos con salida en color)
+    """
+    global Fore, Style, Back
+    if Fore is None:
+        from colorama import init, Fore, Style, Back
+        # Inicializar colorama para Windows
+        init()
+
+
+def build_analyzer(args):
+    """
+    Crea el analizador con las opciones de la línea de comandos
+    """
+    from analyzer import PasswordAnalyzer
+    if args.snapshot:
+        # Estado ya preparado: patrones, diccionario y tablas de teclado
+        analyzer = PasswordAnalyzer.from_snapshot(args.snapshot, cache_size=args.cache_size,
+                                                  cache_policy=args.cache_policy)
+        if args.attack_rates is not None:
+            analyzer.attack_rates = args.attack_rates
+        return analyzer
+    return PasswordAnalyzer(corpus=args.corpus, dictionary=args.dictionary,
+                            cache_size=args.cache_size, cache_policy=args.cache_policy,
+                            attack_rates=args.attack_rates, model=args.model)
+
+def load_checkpoint(args, parser):
+    """
+    Punto de control del análisis masivo (con su estado si se pide --resume)
+    """
+    if not args.checkpoint:
+        if args.resume:
+            parser.error("--resume necesita --checkpoint")
+        return None
+    from checkpoint import Checkpoint, CheckpointError
+    try:
+        checkpoint = Checkpoint(args.checkpoint, args.file, every=args.checkpoint_every)
+        if args.resume and checkpoint.load() is None:
+            print(f"{Fore.YELLOW}⚠️  No hay punto de control en {args.checkpoint}: "
+                  f"se empieza desde el principio{Style.RESET_ALL}", file=sys.stderr)
+        elif checkpoint.state is not None and \
+                ('kind' in checkpoint.state['summary']) != bool(args.aggregate):
+            raise CheckpointError("El punto de control se guardó con otro valor de --aggregate")
+    except CheckpointError as e:
+        parser.error(str(e))
+    return checkpoint
 
 class PasswordTool:
-    def __init__(self):
-        self.generator = PasswordGenerator()
-        self.analyzer = PasswordAnalyzer()
+    def __init__(self, corpus=None, dictionary=None, cache_size=0, cache_policy='lru',
+                 analyzer=None):
+        load_colors()
+        if analyzer is None:
+            from analyzer import PasswordAnalyzer
+            analyzer = PasswordAnalyzer(corpus=corpus, dictionary=dictionary,
+                                        cache_size=cache_size, cache_policy=cache_policy)
+        self.analyzer = analyzer
+        self._generator = None
+    
+    @property
+    def generator(self):
+        # El generador solo se crea si algún modo lo usa
+        if self._generator is None:
+            from generator import PasswordGenerator
+            self._generator = PasswordGenerator()
+        return self._generator
         
     def print_banner(self):
         """
@@ -72,6 +133,15 @@ class PasswordTool:
         print(f"Fuerza: {color}{analysis['strength']}{Style.RESET_ALL}")
         print(f"Entropía: {analysis['entropy']} bits")
         print(f"Tiempo estimado de cracking: {analysis['crack_time']}")
+        print(f"Intentos estimados: 10^{analysis['guesses_log10']:.1f}")
+        from guesses import format_seconds
+        for scenario, seconds in analysis['crack_seconds'].items():
+            print(f"  {scenario}: {format_seconds(seconds)}")
+        if analysis.get('markov_bits') is not None:
+            print(f"Probabilidad según el modelo: Markov {analysis['markov_bits']} bits, "
+                  f"PCFG {analysis['pcfg_bits']} bits")
+        if analysis.get('breach_count') is not None:
+            print(f"Apariciones en filtraciones: {analysis['breach_count']:,}")
         print(f"{Fore.CYAN}{'─' * 30}{Style.RESET_ALL}")
         
         # Mostrar tipos de caracteres
@@ -114,19 +184,26 @@ class PasswordTool:
             
             count = int(input("¿Cuántas contraseñas generar? (1-10): ") or "1")
             count = max(1, min(10, count))
+            min_score = input("Puntuación mínima garantizada (0-100, Enter = sin mínimo): ")
+            
+            options = dict(use_uppercase=use_uppercase, use_lowercase=use_lowercase,
+                           use_digits=use_digits, use_symbols=use_symbols,
+                           exclude_ambiguous=exclude_ambiguous)
+            if min_score:
+                # Se generan directamente entre las que alcanzan la puntuación
+                try:
+                    space = self.generator.constrained(length=length, min_score=int(min_score),
+                                                       analyzer=self.analyzer, **options)
+                except ValueError as e:
+                    print(f"{Fore.RED}❌ {e}{Style.RESET_ALL}")
+                    return
+                passwords = list(space.generate_batch(count))
+            else:
+                passwords = self.generator.generate_multiple(count, length=length, **options)
             
             print(f"\n{Fore.GREEN}🔑 Contraseñas generadas:{Style.RESET_ALL}")
             
-            for i in range(count):
-                password = self.generator.generate_password(
-                    length=length,
-                    use_uppercase=use_uppercase,
-                    use_lowercase=use_lowercase,
-                    use_digits=use_digits,
-                    use_symbols=use_symbols,
-                    exclude_ambiguous=exclude_ambiguous
-                )
-                
+            for i, password in enumerate(passwords):
                 # Analizar automáticamente
                 analysis = self.analyzer.analyze_password(password)
                 color = self.get_color_by_strength(analysis['strength'])
@@ -134,21 +211,13 @@ class PasswordTool:
                 print(f"{i+1}. {Fore.WHITE}{password}{Style.RESET_ALL} "
                      f"({color}{analysis['strength']}{Style.RESET_ALL} - "
                      f"{analysis['score']}/100)")
+            if min_score:
+                print(f"Entropía exacta del espacio: {space.entropy:.2f} bits")
             
             # Opción para analizar una contraseña específica
             choice = input(f"\n¿Analizar alguna contraseña en detalle? (número/n): ")
             if choice.isdigit() and 1 <= int(choice) <= count:
-                idx = int(choice) - 1
-                passwords = []
-                for i in range(count):
-                    pwd = self.generator.generate_password(
-                        length=length, use_uppercase=use_uppercase,
-                        use_lowercase=use_lowercase, use_digits=use_digits,
-                        use_symbols=use_symbols, exclude_ambiguous=exclude_ambiguous
-                    )
-                    passwords.append(pwd)
-                
-                analysis = self.analyzer.analyze_password(passwords[idx])
+                analysis = self.analyzer.analyze_password(passwords[int(choice) - 1])
                 self.display_analysis(analysis)
                 
         except ValueError as e:
@@ -183,6 +252,7 @@ class PasswordTool:
         choice = input("Selecciona una opción (1-3): ")
         
         passwords = []
+        source = None
         
         if choice == '1':
             print("Ingresa contraseñas (una por línea, línea vacía para terminar):")
@@ -194,52 +264,299 @@ class PasswordTool:
                 
         elif choice == '2':
             filename = input("Nombre del archivo: ")
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    passwords = [line.strip() for line in f if line.strip()]
-            except FileNotFoundError:
-                print(f"{Fore.RED}❌ Archivo no encontrado{Style.RESET_ALL}")
-                return
-            except Exception as e:
-                print(f"{Fore.RED}❌ Error leyendo archivo: {str(e)}{Style.RESET_ALL}")
-                return
+            # El archivo se recorre en streaming, sin cargarlo en memoria
+            from bulk import iter_passwords
+            source = lambda: iter_passwords(filename)
                 
         elif choice == '3':
             passwords = ['123456', 'password', 'admin', 'qwerty', 'abc123',
                         'password123', 'contraseña', 'letmein', 'welcome',
                         'Myp@ssw0rd!2024']
         
-        if not passwords:
-            print(f"{Fore.RED}❌ No hay contraseñas para analizar{Style.RESET_ALL}")
-            return
-        
-        print(f"\n{Fore.GREEN}📊 Analizando {len(passwords)} contraseñas...{Style.RESET_ALL}\n")
+        if source is None:
+            if not passwords:
+                print(f"{Fore.RED}❌ No hay contraseñas para analizar{Style.RESET_ALL}")
+                return
+            source = lambda: passwords
         
-        results = []
-        for password in passwords:
-            analysis = self.analyzer.analyze_password(password)
-            results.append(analysis)
+        print(f"\n{Fore.GREEN}📊 Analizando contraseñas...{Style.RESET_ALL}\n")
         
-        # Mostrar resumen
-        print(f"{Fore.CYAN}─── RESUMEN DEL ANÁLISIS ───{Style.RESET_ALL}")
+        # Agregado combinable: se puede guardar y sumar al de otros análisis
+        from aggregate import AuditAggregate
+        summary = AuditAggregate()
+        try:
+            for analysis in self.analyzer.analyze_stream(source()):
+                summary.add(analysis)
+        except FileNotFoundError:
+            print(f"{Fore.RED}❌ Archivo no encontrado{Style.RESET_ALL}")
+            return
+        except Exception as e:
+            print(f"{Fore.RED}❌ Error leyendo archivo: {str(e)}{Style.RESET_ALL}")
+            return
         
-        strength_counts = {}
-        for result in results:
-            strength = result['strength']
-            strength_counts[strength] = strength_counts.get(strength, 0) + 1
+        if not summary.total:
+            print(f"{Fore.RED}❌ No hay contraseñas para analizar{Style.RESET_ALL}")
+            return
         
-        for strength, count in strength_counts.items():
-            color = self.get_color_by_strength(strength)
-            print(f"{color}{strength:12}{Style.RESET_ALL}: {count:2} contraseñas")
+        self.print_summary(summary)
+        if self.analyzer.profiler is not None:
+            self.print_profile()
         
-        print(f"{Fore.CYAN}{'─' * 28}{Style.RESET_ALL}")
+        path = input("\nGuardar el agregado para combinarlo (archivo, Enter = no): ").strip()
+        if path:
+            summary.save(path)
+            print(f"{Fore.GREEN}✅ Agregado guardado en {path}{Style.RESET_ALL}")
         
-        # Mostrar detalles si se solicita
+        # Mostrar detalles si se solicita (se vuelve a recorrer la fuente)
         if input("\n¿Ver análisis detallado? (s/N): ").lower() == 's':
-            for i, result in enumerate(results, 1):
+            for i, result in enumerate(self.analyzer.analyze_stream(source()), 1):
                 print(f"\n{Fore.YELLOW}--- Contraseña {i} ---{Style.RESET_ALL}")
                 self.display_analysis(result)
     
+    def print_summary(self, summary, file=None):
+        """
+        Muestra el resumen de un análisis masivo
+        """
+        print(f"{Fore.CYAN}─── RESUMEN DEL ANÁLISIS ({summary.total} contraseñas) ───{Style.RESET_ALL}",
+              file=file)
+        
+        for strength, count in summary.strength_counts.items():
+            color = self.get_color_by_strength(strength)
+            print(f"{color}{strength:12}{Style.RESET_ALL}: {count:2} contraseñas", file=file)
+        
+        print(f"{Fore.CYAN}{'─' * 28}{Style.RESET_ALL}", file=file)
+    
+    def stream_analysis(self, paths, summary_every=0, workers=1, writer=None,
+                        checkpoint=None, output=None, progress=False, aggregate=None):
+        """
+        Análisis masivo no interactivo: emite cada resultado en cuanto se
+        calcula (como texto o con un escritor JSONL/CSV) y resúmenes
+        parciales por stderr. Con 'checkpoint' guarda periódicamente la
+        posición y el resumen, y si ya tiene un estado cargado continúa
+        desde él; 'output' describe la salida para validarla al reanudar.
+        Con 'aggregate' (ruta) el resumen es un agregado combinable que se
+        guarda al terminar
+        """
+        from bulk import BulkSummary, PasswordReader
+        summary_class = BulkSummary
+        if aggregate is not None:
+            from aggregate import AuditAggregate as summary_class
+        state = checkpoint.state if checkpoint is not None else None
+        if state is not None:
+            summary = summary_class.from_dict(state['summary'])
+            reader = PasswordReader(paths, start=tuple(state['position']), lines=state['lines'],
+                                    mark_every=checkpoint.every)
+            print(f"{Fore.CYAN}↻ Reanudando tras {state['lines']:,} contraseñas{Style.RESET_ALL}",
+                  file=sys.stderr)
+        else:
+            summary = summary_class()
+            reader = PasswordReader(paths, mark_every=checkpoint.every if checkpoint else 0)
+        reporter = None
+        if progress:
+            from checkpoint import ProgressReporter
+            reporter = ProgressReporter(reader)
+        
+        # El perfil por etapas solo mide el proceso actual
+        if self.analyzer.profiler is not None and workers != 1:
+            print(f"{Fore.YELLOW}⚠️  --profile usa un solo proceso{Style.RESET_ALL}", file=sys.stderr)
+            workers = 1
+        
+        if workers == 1:
+            analyses = self.analyzer.analyze_stream(reader)
+        else:
+            # Los trabajadores calculan las columnas pedidas y el nivel del resumen
+            fields = writer.fields + ('strength',) if writer else ('score', 'strength')
+            if aggregate is not None:
+                from aggregate import AGGREGATE_FIELDS
+                fields = tuple(dict.fromkeys(fields + AGGREGATE_FIELDS))
+            analyses = self.analyzer.analyze_many(reader, workers=workers or None,
+                                                  fields=fields)
+        
+        marks = reader.marks
+        for analysis in analyses:
+            summary.add(analysis)
+            if writer is not None:
+                writer.write(analysis)
+            else:
+                print(f"{analysis['score']:3}/100  {analysis['strength']:12}  {analysis['password']}")
+            
+            if summary_every and summary.total % summary_every == 0:
+                if writer is not None:
+                    writer.flush()
+                sys.stdout.flush()
+                self.print_summary(summary, file=sys.stderr)
+            if reporter is not None:
+                reporter.update(summary.total)
+            # Las marcas del lector dicen en qué byte acaba cada bloque ya procesado
+            if marks and marks[0][0] == summary.total:
+                lines, file_index, offset = marks.popleft()
+                offset_out = writer.tell() if writer is not None else None
+                sys.stdout.flush()
+                checkpoint.save((file_index, offset), lines, summary, output, offset_out)
+        
+        if writer is not None:
+            writer.flush()
+        sys.stdout.flush()
+        if reporter is not None:
+            reporter.finish(summary.total)
+        if aggregate is not None:
+            summary.save(aggregate)
+        if checkpoint is not None:
+            checkpoint.remove()
+        self.print_summary(summary, file=sys.stderr)
+        if aggregate is not None:
+            print(f"{Fore.GREEN}✅ Agregado guardado en {aggregate} "
+                  f"(combínalo con: python aggregate.py merge){Style.RESET_ALL}", file=sys.stderr)
+        # Con varios procesos cada trabajador tiene su propia caché
+        if self.analyzer.cache is not None and workers == 1:
+            self.print_cache_report(file=sys.stderr)
+        if self.analyzer.profiler is not None:
+            self.print_profile(file=sys.stderr)
+    
+    def reuse_report(self, paths, top=20, exact=False, plaintext='show', hash_key=None):
+        """
+        Contraseñas más reutilizadas de los archivos, con su número de
+        apariciones y el análisis de fuerza de cada una
+        """
+        from bulk import iter_passwords, password_digest
+        import reuse
+        
+        passwords = iter_passwords(paths)
+        if exact:
+            report = reuse.top_reused_exact(passwords, top)
+        else:
+            report = reuse.top_reused_sketch(passwords, top)
+        
+        mode = "exacto" if report.exact else "aproximado"
+        distinct = f", {report.distinct:,} distintas" if report.distinct is not None else ""
+        print(f"{Fore.CYAN}─── CONTRASEÑAS MÁS REUTILIZADAS ({report.total:,} leídas{distinct}, "
+              f"recuento {mode}) ───{Style.RESET_ALL}")
+        for rank, entry in enumerate(report.top, 1):
+            analysis = self.analyzer.analyze_password(entry.password)
+            color = self.get_color_by_strength(analysis['strength'])
+            share = entry.count / report.total * 100 if report.total else 0
+            error = f" (±{entry.error:,})" if entry.error else ""
+            label = (entry.password if plaintext == 'show'
+                     else password_digest(entry.password, hash_key)[:16])
+            print(f"{rank:3}. {entry.count:>12,}{error}  {share:6.2f}%  "
+                  f"{color}{analysis['strength']:12}{Style.RESET_ALL} {analysis['score']:3}/100  "
+                  f"{label}")
+        return report
+    
+    def similarity_report(self, paths, distance=1, reference=None, top=20, user_separator=None,
+                          plaintext='show', hash_key=None):
+        """
+        Grupos de contraseñas casi iguales entre cuentas (y respecto a una
+        lista de filtradas). Con usuarios, cada cuenta afectada sale por
+        stdout con su grupo y el informe va por stderr
+        """
+        from bulk import iter_accounts, iter_passwords, password_digest
+        from similarity import find_near_duplicates
+        
+        passwords = (password for password, _ in iter_accounts(paths, user_separator))
+        report = find_near_duplicates(passwords, distance=distance,
+                                      reference=iter_passwords(reference) if reference else ())
+        
+        def label(password):
+            return password if plaintext == 'show' else password_digest(password, hash_key)[:16]
+        
+        file = sys.stderr if user_separator else sys.stdout
+        affected = sum(cluster.accounts for cluster in report.clusters)
+        print(f"{Fore.CYAN}─── VARIANTES CASI IGUALES (distancia ≤ {distance}): "
+              f"{len(report.clusters):,} grupos, {affected:,} de {report.total:,} cuentas "
+              f"───{Style.RESET_ALL}", file=file)
+        for number, cluster in enumerate(report.clusters[:top], 1):
+            breached = f" {Fore.RED}[variante de filtrada]{Style.RESET_ALL}" if cluster.breached else ""
+            print(f"{Fore.YELLOW}#{number:<4}{Style.RESET_ALL} {cluster.accounts:>10,} cuentas  "
+                  f"{len(cluster.members):,} variantes{breached}", file=file)
+            for member in cluster.members[:5]:
+                count = "filtrada" if member.reference else f"{member.count:,}"
+                print(f"      {count:>10}  {label(member.password)}  ~ "
+                      f"{label(member.nearest)} (d={member.distance})", file=file)
+        if report.skipped:
+            print(f"{Fore.YELLOW}⚠️  {report.skipped:,} contraseñas fuera del rango de longitud "
+                  f"indexado{Style.RESET_ALL}", file=file)
+        if report.truncated:
+            print(f"{Fore.YELLOW}⚠️  {report.truncated:,} claves con demasiadas variantes se "
+                  f"compararon solo en parte{Style.RESET_ALL}", file=file)
+        
+        if user_separator:
+            # Segunda pasada: las cuentas de cada grupo
+            sys.stderr.flush()
+            clusters = report.cluster_of()
+            for password, user in iter_accounts(paths, user_separator):
+                number = clusters.get(password)
+                if number is not None and user is not None:
+                    print(f"{user}\t{number}\t{label(password)}")
+        return report
+    
+    def policy_audit(self, paths, policy, workers=1, user_separator=None, all_rules=False):
+        """
+        Auditoría de cumplimiento de una política sobre archivos completos:
+        las contraseñas que no cumplen salen por stdout con sus reglas y el
+        recuento por regla por stderr
+        """
+        from collections import deque
+        from bulk import iter_accounts
+        from parallel import check_parallel
+        from policy import PolicyReport
+        
+        report = PolicyReport(policy.rule_ids)
+        # Se guarda la contraseña de cada par en orden para poder mostrarla
+        passwords = deque()
+        
+        def tracked():
+            for password, user in iter_accounts(paths, user_separator):
+                passwords.append(password)
+                yield password, user
+        
+        for failed in check_parallel(policy, tracked(), workers=workers or None,
+                                     all_rules=all_rules):
+            password = passwords.popleft()
+            report.add(failed)
+            if failed:
+                print(f"{','.join(failed)}\t{password}")
+        sys.stdout.flush()
+        self.print_policy_report(policy, report, file=sys.stderr)
+        return report
+    
+    def print_policy_report(self, policy, report, file=None):
+        """
+        Muestra el resultado de una auditoría de política
+        """
+        title = f" {policy.name}" if policy.name else ""
+        print(f"{Fore.CYAN}─── POLÍTICA{title}: {report.compliant}/{report.total} "
+              f"contraseñas cumplen ───{Style.RESET_ALL}", file=file)
+        for rule_id, count in report.violations.items():
+            color = Fore.RED if count else Fore.GREEN
+            print(f"{color}{rule_id:20}{Style.RESET_ALL} {count:8}  {policy.messages[rule_id]}",
+                  file=file)
+    
+    def print_profile(self, file=None):
+        """
+        Muestra el desglose de tiempo por etapa del análisis
+        """
+        print(f"{Fore.CYAN}─── PERFIL POR ETAPAS ───{Style.RESET_ALL}", file=file)
+        self.analyzer.profiler.report(file=file)
+    
+    def print_cache_report(self, top=10, file=None):
+        """
+        Muestra las estadísticas de la caché y las contraseñas más repetidas
+        (identificadas por su hash con clave, nunca en claro)
+        """
+        info = self.analyzer.cache_info()
+        lookups = info.hits + info.misses
+        hit_rate = info.hits / lookups * 100 if lookups else 0
+        print(f"{Fore.CYAN}─── CACHÉ DE RESULTADOS ───{Style.RESET_ALL}", file=file)
+        print(f"Aciertos: {info.hits}  Fallos: {info.misses}  ({hit_rate:.1f}%)", file=file)
+        print(f"Entradas: {info.currsize}/{info.maxsize}  Expulsiones: {info.evictions}", file=file)
+        
+        print(f"\n{Fore.MAGENTA}Contraseñas más repetidas:{Style.RESET_ALL}", file=file)
+        for digest, count, analysis in self.analyzer.cache.most_common(top):
+            color = self.get_color_by_strength(analysis['strength'])
+            print(f"  {digest[:16]}  {count:8} veces  {color}{analysis['strength']}{Style.RESET_ALL}",
+                  file=file)
+    
     def run_interactive(self):
         """
         Ejecuta la interfaz interactiva
@@ -273,42 +590,291 @@ def main():
                        help='Generar contraseña rápida')
     parser.add_argument('-a', '--analyze', type=str, 
                        help='Analizar contraseña específica')
-    parser.add_argument('-l', '--length', type=int, default=12,
-                       help='Longitud de contraseña a generar')
+    parser.add_argument('-l', '--length', type=int,
+                       help='Longitud de contraseña a generar (por defecto 12)')
     parser.add_argument('--no-symbols', action='store_true',
                        help='No incluir símbolos en generación')
+    parser.add_argument('--no-ambiguous', action='store_true',
+                       help='Excluir caracteres ambiguos (0, O, 1, l, I, |) en generación')
+    parser.add_argument('--min-score', type=int, metavar='N',
+                       help='Con -g, generar solo contraseñas con puntuación N o más')
+    parser.add_argument('--min-entropy', type=float, metavar='BITS',
+                       help='Con -g, entropía exacta mínima del espacio de contraseñas')
+    parser.add_argument('--ban', nargs='+', default=[], metavar='PALABRA',
+                       help='Con -g, subcadenas prohibidas (también en leetspeak)')
+    parser.add_argument('--max-repeat', type=int, metavar='N',
+                       help='Con -g, máximo de caracteres iguales seguidos')
+    parser.add_argument('--passphrase', metavar='LISTA',
+                       help='Generar frases de paso diceware con una lista de palabras')
+    parser.add_argument('--words', type=int, default=6, metavar='N',
+                       help='Palabras por frase de paso')
+    parser.add_argument('--separator', default='-',
+                       help='Separador entre las palabras de la frase')
+    parser.add_argument('--count', type=int, default=1, metavar='N',
+                       help='Número de contraseñas a generar con -g o --passphrase')
+    parser.add_argument('--out', metavar='ARCHIVO',
+                       help='Archivo de salida de la generación o del análisis masivo (- = stdout)')
+    parser.add_argument('-f', '--file', nargs='+', metavar='ARCHIVO',
+                       help='Análisis masivo en streaming (admite .gz/.xz/.bz2 y - para stdin)')
+    parser.add_argument('--format', choices=['text', 'jsonl', 'csv'], default='text',
+                       help='Formato de salida del análisis masivo')
+    parser.add_argument('--columns', metavar='C1,C2',
+                       help='Columnas de la salida JSONL/CSV (por defecto: password,length,'
+                            'score,strength,entropy,crack_time,is_common,patterns)')
+    parser.add_argument('--plaintext', choices=['show', 'omit', 'hash'], default='show',
+                       help='Contraseña en la salida JSONL/CSV: en claro, omitida o hash SHA-256')
+    parser.add_argument('--hash-key', metavar='CLAVE',
+                       help='Clave para el hash de --plaintext hash (HMAC-SHA256)')
+    parser.add_argument('--flush-every', type=int, default=10000, metavar='N',
+                       help='Escribir la salida JSONL/CSV en bloques de N filas')
+    parser.add_argument('--reuse-top', type=int, metavar='N',
+                       help='Informe de las N contraseñas más reutilizadas de -f')
+    parser.add_argument('--exact', action='store_true',
+                       help='Con --reuse-top, recuento exacto con ordenación externa en disco')
+    parser.add_argument('--similar', type=int, metavar='K',
+                       help='Agrupar las contraseñas de -f a distancia de edición K o menos')
+    parser.add_argument('--similar-reference', nargs='+', metavar='ARCHIVO',
+                       help='Con --similar, detectar también variantes de estas filtradas')
+    parser.add_argument('--similar-top', type=int, default=20, metavar='N',
+                       help='Con --similar, grupos que se muestran')
+    parser.add_argument('--policy', metavar='ARCHIVO',
+                       help='Auditar -f (o -a) contra una política JSON/YAML, o generar '
+                            'con -g contraseñas que la cumplen')
+    parser.add_argument('--user', metavar='USUARIO',
+                       help='Con -g --policy, usuario o correo para no_user_fragments')
+    parser.add_argument('--user-separator', metavar='SEP',
+                       help='Con --policy o --similar, cada línea es usuario SEP contraseña')
+    parser.add_argument('--all-rules', action='store_true',
+                       help='Con --policy, evaluar todas las reglas y no solo la primera que falla')
+    parser.add_argument('--summary-every', type=int, default=0, metavar='N',
+                       help='Mostrar un resumen parcial cada N contraseñas')
+    parser.add_argument('--aggregate', metavar='ARCHIVO',
+                       help='Guardar un agregado combinable del análisis masivo '
+                            '(ver aggregate.py merge)')
+    parser.add_argument('--checkpoint', metavar='ARCHIVO',
+                       help='Guardar el avance del análisis masivo para poder reanudarlo')
+    parser.add_argument('--checkpoint-every', type=int, default=100000, metavar='N',
+                       help='Guardar el punto de control cada N contraseñas')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continuar el análisis masivo desde --checkpoint')
+    parser.add_argument('--progress', action='store_true',
+                       help='Mostrar progreso (contraseñas/s, ETA y memoria) por stderr')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                       help='Procesos para el análisis masivo (0 = todos los núcleos)')
+    parser.add_argument('--corpus', metavar='ARCHIVO',
+                       help='Corpus binario de contraseñas filtradas (ver corpus.py build)')
+    parser.add_argument('--dictionary', metavar='ARCHIVO',
+                       help='Diccionario compilado de palabras (ver dictionary.py build)')
+    parser.add_argument('--model', metavar='ARCHIVO',
+                       help='Modelo Markov/PCFG entrenado (ver markov.py train)')
+    parser.add_argument('--snapshot', metavar='ARCHIVO',
+                       help='Cargar el analizador de un snapshot (ver snapshot.py build)')
+    parser.add_argument('--cache-size', type=int, default=0, metavar='N',
+                       help='Caché de resultados para contraseñas repetidas (0 = desactivada)')
+    parser.add_argument('--cache-policy', choices=['lru', 'lfu'], default='lru',
+                       help='Política de expulsión de la caché')
+    parser.add_argument('--attack-rate', action='append', default=[], metavar='NOMBRE=N',
+                       help='Escenario de ataque con N intentos por segundo (repetible)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Mostrar el tiempo por etapa tras el análisis masivo')
+    parser.add_argument('--serve', action='store_true',
+                       help='Servicio HTTP/JSON local (ver server.py)')
+    parser.add_argument('--host', default='127.0.0.1',
+                       help='Dirección de escucha del servicio')
+    parser.add_argument('--port', type=int, default=8765,
+                       help='Puerto del servicio')
+    
+    parser.add_argument('--stdio', action='store_true',
+                       help='Proceso persistente: peticiones y respuestas JSON por líneas')
     
     args = parser.parse_args()
-    tool = PasswordTool()
+    args.attack_rates = None
+    if args.attack_rate:
+        from guesses import parse_attack_rates
+        try:
+            args.attack_rates = parse_attack_rates(args.attack_rate)
+        except ValueError as e:
+            parser.error(str(e))
     
-    if args.generate:
-        # Modo rápido de generación
+    if args.stdio:
+        # Proceso persistente para scripts (una petición JSON por línea)
+        import service
+        service.serve_stdio(build_analyzer(args))
+        
+    elif args.serve:
+        # Servicio de larga duración con el analizador ya cargado
+        import server
+        server.run(build_analyzer(args), host=args.host, port=args.port, workers=args.workers)
+        
+    elif args.passphrase:
+        from generator import PasswordGenerator
+        from wordlist import IndexedWordlist
+        generator = PasswordGenerator()
+        wordlist = IndexedWordlist(args.passphrase)
+        entropy = generator.passphrase_entropy(wordlist, args.words)
+        summary = (f"Entropía: {entropy:.2f} bits ({args.words} palabras de una lista de "
+                   f"{len(wordlist):,})")
+        
+        if args.count > 1 or args.out:
+            # Todas las frases tienen la misma entropía: se informa una vez por stderr
+            out = sys.stdout if args.out in (None, '-') else open(args.out, 'w', encoding='utf-8')
+            try:
+                generator.write_passphrases(out, args.count, wordlist, words=args.words,
+                                            separator=args.separator)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            print(summary, file=sys.stderr)
+            return
+        
+        print(f"Frase de paso: {generator.generate_passphrase(wordlist, args.words, args.separator)}")
+        print(summary)
+        
+    elif args.generate and (args.min_score is not None or args.min_entropy is not None or
+                            args.policy or args.ban or args.max_repeat or args.no_ambiguous):
+        # Generación restringida: una pasada uniforme, sin generar y analizar en bucle
+        from generator import PasswordGenerator
+        generator = PasswordGenerator()
+        analyzer = build_analyzer(args)
+        policy = None
+        try:
+            if args.policy:
+                from policy import load_policy
+                policy = load_policy(args.policy, analyzer=analyzer)
+            space = generator.constrained(length=args.length, use_symbols=not args.no_symbols,
+                                          exclude_ambiguous=args.no_ambiguous,
+                                          min_score=args.min_score, min_entropy=args.min_entropy,
+                                          banned=args.ban, max_repeat=args.max_repeat,
+                                          policy=policy, user=args.user, analyzer=analyzer)
+        except ValueError as e:
+            sys.exit(f"❌ {e}")
+        summary = (f"Entropía exacta: {space.entropy:.2f} bits ({space.count:.3e} contraseñas "
+                   f"válidas de {space.length} caracteres)")
+        
+        if args.count > 1 or args.out:
+            out = sys.stdout if args.out in (None, '-') else open(args.out, 'w', encoding='utf-8')
+            try:
+                generator.write_constrained(out, args.count, space)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            print(summary, file=sys.stderr)
+            return
+        
+        password = space.generate()
+        analysis = analyzer.analyze_password(password)
+        print(f"Contraseña: {password}")
+        print(f"Fuerza: {analysis['strength']} ({analysis['score']}/100)")
+        print(summary)
+        
+    elif args.generate:
+        from generator import PasswordGenerator
         generator = PasswordGenerator()
+        args.length = args.length or 12
+        
+        if args.count > 1 or args.out:
+            # Generación masiva en streaming, sin análisis por contraseña
+            out = sys.stdout if args.out in (None, '-') else open(args.out, 'w', encoding='utf-8')
+            try:
+                generator.write_passwords(out, args.count, length=args.length,
+                                          use_symbols=not args.no_symbols)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+            return
+        
+        # Modo rápido de generación
         password = generator.generate_password(
             length=args.length,
             use_symbols=not args.no_symbols
         )
-        analyzer = PasswordAnalyzer()
-        analysis = analyzer.analyze_password(password)
+        analysis = build_analyzer(args).analyze_password(password)
         
         print(f"Contraseña: {password}")
         print(f"Fuerza: {analysis['strength']} ({analysis['score']}/100)")
         
     elif args.analyze:
         # Modo rápido de análisis
-        analyzer = PasswordAnalyzer()
-        analysis = analyzer.analyze_password(args.analyze)
+        tool = PasswordTool(analyzer=build_analyzer(args))
+        analysis = tool.analyzer.analyze_password(args.analyze)
         tool.display_analysis(analysis)
+        if args.policy:
+            from policy import load_policy
+            policy = load_policy(args.policy, analyzer=tool.analyzer)
+            failed = policy.violations(args.analyze)
+            if failed:
+                print(f"{Fore.RED}❌ No cumple la política:{Style.RESET_ALL}")
+                for rule_id in failed:
+                    print(f"  • {rule_id}: {policy.messages[rule_id]}")
+            else:
+                print(f"{Fore.GREEN}✅ Cumple la política{Style.RESET_ALL}")
+        
     else:
-        # Modo interactivo
-        tool.run_interactive()
+        tool = PasswordTool(analyzer=build_analyzer(args))
+        if args.profile:
+            tool.analyzer.enable_profiling()
+        
+        if args.file and args.reuse_top:
+            # Reutilización: sketch en memoria fija o recuento exacto en disco
+            tool.reuse_report(args.file, top=args.reuse_top, exact=args.exact,
+                              plaintext=args.plaintext, hash_key=args.hash_key)
+        
+        elif args.file and args.similar is not None:
+            # Variantes casi iguales con un índice de borrados (sin comparar todas las parejas)
+            if not 1 <= args.similar <= 3:
+                parser.error("--similar debe estar entre 1 y 3")
+            tool.similarity_report(args.file, distance=args.similar,
+                                   reference=args.similar_reference, top=args.similar_top,
+                                   user_separator=args.user_separator,
+                                   plaintext=args.plaintext, hash_key=args.hash_key)
+        
+        elif args.file and args.policy:
+            # Auditoría de cumplimiento (solo calcula lo que piden las reglas)
+            from policy import load_policy
+            policy = load_policy(args.policy, analyzer=tool.analyzer)
+            tool.policy_audit(args.file, policy, workers=args.workers,
+                              user_separator=args.user_separator, all_rules=args.all_rules)
+        
+        elif args.file and args.format != 'text':
+            # Salida estructurada para pipelines (jq, DuckDB, Spark)
+            import bulk
+            try:
+                columns = bulk.parse_columns(args.columns) if args.columns else bulk.DEFAULT_COLUMNS
+            except ValueError as e:
+                parser.error(str(e))
+            output = {'format': args.format, 'out': args.out, 'columns': list(columns),
+                      'plaintext': args.plaintext}
+            checkpoint = load_checkpoint(args, parser)
+            try:
+                truncate_at = checkpoint.output_offset(output) if checkpoint else None
+            except ValueError as e:
+                parser.error(str(e))
+            with bulk.open_writer(args.format, args.out, truncate_at=truncate_at, columns=columns,
+                                  plaintext=args.plaintext, hash_key=args.hash_key,
+                                  flush_every=args.flush_every) as writer:
+                tool.stream_analysis(args.file, summary_every=args.summary_every,
+                                    workers=args.workers, writer=writer, checkpoint=checkpoint,
+                                    output=output, progress=args.progress,
+                                    aggregate=args.aggregate)
+        
+        elif args.file:
+            # Modo masivo en streaming
+            checkpoint = load_checkpoint(args, parser)
+            tool.stream_analysis(args.file, summary_every=args.summary_every,
+                                workers=args.workers, checkpoint=checkpoint,
+                                progress=args.progress, aggregate=args.aggregate)
+        else:
+            # Modo interactivo
+            tool.run_interactive()
 
 if __name__ == '__main__':
     try:
         main()
     except KeyboardInterrupt:
+        load_colors()
         print(f"\n{Fore.YELLOW}👋 Operación cancelada por el usuario{Style.RESET_ALL}")
         sys.exit(0)
     except Exception as e:
+        load_colors()
         print(f"\n{Fore.RED}❌ Error inesperado: {str(e)}{Style.RESET_ALL}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
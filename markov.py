@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Modelo probabilístico de contraseñas entrenado sobre un corpus filtrado:
+cadenas de Markov de n-gramas de caracteres y estructuras PCFG (L6D4S1).
+El modelo entrenado se guarda como arrays densos en un archivo binario que
+se proyecta con mmap al arrancar, y puntuar una contraseña son unas pocas
+consultas a esos arrays. El resultado son bits: -log2 de la probabilidad
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import mmap
+import string
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+MAGIC = b'PWMODEL\x00'
+HEADER = struct.Struct('<8sI')  # magic, longitud de los metadatos JSON
+
+# Alfabeto del modelo de Markov: ASCII imprimible, un símbolo para el resto
+# de caracteres y un símbolo de frontera (inicio y fin de la contraseña)
+ALPHABET = string.digits + string.ascii_letters + string.punctuation + ' '
+OTHER = len(ALPHABET)
+BOUNDARY = OTHER + 1
+SYMBOLS = BOUNDARY + 1
+_INDEX = {ch: i for i, ch in enumerate(ALPHABET)}
+
+# Tamaño del alfabeto de cada clase PCFG (para segmentos nunca vistos)
+CLASS_SIZES = {'L': 52, 'D': 10, 'S': len(string.punctuation) + 1}
+
+# Arrays del modelo, en el orden en que se guardan en disco ('Q' primero,
+# para que queden alineados a 8 bytes)
+HASH_ARRAYS = ('structure_keys', 'terminal_keys')
+COST_ARRAYS = ('structure_costs', 'terminal_costs', 'transitions')
+
+
+def _key(text):
+    """
+    Hash de 64 bits de una estructura o segmento (las tablas guardan hashes)
+    """
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(),
+                          'little')
+
+
+def _char_class(ch):
+    if ch.isalpha():
+        return 'L'
+    if ch.isdigit():
+        return 'D'
+    return 'S'
+
+
+def segments(password):
+    """
+    Divide la contraseña en segmentos de la misma clase:
+    'Pass2024!' -> [('L', 'Pass'), ('D', '2024'), ('S', '!')]
+    """
+    result = []
+    for ch in password:
+        cls = _char_class(ch)
+        if result and result[-1][0] == cls:
+            result[-1][1].append(ch)
+        else:
+            result.append((cls, [ch]))
+    return [(cls, ''.join(chars)) for cls, chars in result]
+
+
+def structure(password):
+    """
+    Estructura PCFG de la contraseña, p. ej. 'L4D4S1'
+    """
+    return ''.join(f"{cls}{len(text)}" for cls, text in segments(password))
+
+
+class _BoundedCounter(dict):
+    """
+    Contador con un máximo de entradas: al superarlo se descartan las de
+    menor frecuencia (conteo con pérdida), así que la memoria está acotada
+    aunque el corpus tenga millones de estructuras o segmentos distintos
+    """
+    def __init__(self, max_entries):
+        super().__init__()
+        self.max_entries = max_entries
+        self.floor = 0
+
+    def add(self, key, count=1):
+        self[key] = self.get(key, 0) + count
+        if len(self) > self.max_entries:
+            self.prune()
+
+    def prune(self):
+        while len(self) > self.max_entries // 2:
+            self.floor += 1
+            for key in [key for key, count in self.items() if count <= self.floor]:
+                del self[key]
+
+
+class PasswordModel:
+    """
+    Modelo de Markov + PCFG sobre arrays compactos. Se entrena con train()
+    leyendo el corpus en streaming, se guarda con save() y se carga con
+    load() sin copiar los arrays
+    """
+    def __init__(self, arrays, meta, path=None):
+        for name in HASH_ARRAYS + COST_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.order = meta['order']
+        self.trained_on = meta['trained_on']
+        self.unseen_structure = meta['unseen_structure']
+        # (clase, longitud) -> coste de un segmento nunca visto
+        self.unseen_terminal = meta['unseen_terminal']
+        self.meta = meta
+        self.path = path
+
+    @classmethod
+    def train(cls, passwords, order=3, alpha=0.01, max_structures=100000,
+              max_terminals=1000000, max_length=64):
+        """
+        Entrena el modelo con un iterable de contraseñas. Las transiciones
+        de Markov se cuentan en un array denso de tamaño fijo y las tablas
+        PCFG tienen un máximo de entradas, así que la memoria no depende del
+        tamaño del corpus
+        """
+        if not 2 <= order <= 3:
+            raise ValueError("El orden del modelo de Markov debe ser 2 o 3")
+        counts = array('I', bytes(4 * SYMBOLS ** order))
+        structures = _BoundedCounter(max_structures)
+        terminals = _BoundedCounter(max_terminals)
+        total = 0
+        for password in passwords:
+            if len(password) > max_length:
+                continue
+            total += 1
+            for index in _transition_indexes(password, order):
+                counts[index] += 1
+            parts = segments(password)
+            structures.add(''.join(f"{c}{len(text)}" for c, text in parts))
+            for c, text in parts:
+                terminals.add(f"{c}{len(text)}\x00{text}")
+
+        # Costes de Markov: -log2 P(c | contexto) con suavizado aditivo
+        transitions = array('f', bytes(4 * len(counts)))
+        for context in range(SYMBOLS ** (order - 1)):
+            base = context * SYMBOLS
+            row = counts[base:base + SYMBOLS]
+            denominator = sum(row) + alpha * SYMBOLS
+            for symbol, count in enumerate(row):
+                transitions[base + symbol] = -math.log2((count + alpha) / denominator)
+
+        # Estructuras: P(estructura); segmentos: P(texto | clase y longitud)
+        structure_total = sum(structures.values())
+        structure_items = sorted((_key(text), -math.log2(count / structure_total))
+                                 for text, count in structures.items())
+        class_totals = {}
+        for key, count in terminals.items():
+            group = key.split('\x00', 1)[0]
+            class_totals[group] = class_totals.get(group, 0) + count
+        terminal_items = sorted(
+            (_key(key), -math.log2(count / class_totals[key.split('\x00', 1)[0]]))
+            for key, count in terminals.items())
+
+        arrays = {
+            'structure_keys': array('Q', (key for key, _ in structure_items)),
+            'structure_costs': array('f', (cost for _, cost in structure_items)),
+            'terminal_keys': array('Q', (key for key, _ in terminal_items)),
+            'terminal_costs': array('f', (cost for _, cost in terminal_items)),
+            'transitions': transitions,
+        }
+        meta = {
+            'order': order,
+            'trained_on': total,
+            # Un suceso no visto cuenta como uno más entre los observados
+            'unseen_structure': math.log2(structure_total + 1),
+            'unseen_terminal': {group: math.log2(count + 1)
+                                for group, count in class_totals.items()},
+        }
+        return cls(arrays, meta)
+
+    def save(self, path):
+        """
+        Guarda el modelo en disco (arrays alineados, aptos para mmap)
+        """
+        sizes = {name: len(getattr(self, name)) for name in HASH_ARRAYS + COST_ARRAYS}
+        meta = dict(self.meta, sizes=sizes, byteorder=sys.byteorder)
+        meta = json.dumps(meta).encode('utf-8')
+        meta += b' ' * (-(HEADER.size + len(meta)) % 8)
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(meta)))
+            f.write(meta)
+            for name in HASH_ARRAYS:
+                f.write(array('Q', getattr(self, name)).tobytes())
+            for name in COST_ARRAYS:
+                f.write(array('f', getattr(self, name)).tobytes())
+        self.path = path
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carga el modelo proyectando el archivo en memoria (sin copiarlo)
+        """
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, meta_length = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Formato de modelo no reconocido: {path}")
+        meta = json.loads(bytes(mm[HEADER.size:HEADER.size + meta_length]))
+
+        view = memoryview(mm)
+        offset = HEADER.size + meta_length
+        arrays = {}
+        for names, typecode in ((HASH_ARRAYS, 'Q'), (COST_ARRAYS, 'f')):
+            for name in names:
+                size = meta['sizes'][name] * struct.calcsize(typecode)
+                data = view[offset:offset + size].cast(typecode)
+                if meta['byteorder'] != sys.byteorder:
+                    data = array(typecode, data)
+                    data.byteswap()
+                arrays[name] = data
+                offset += size
+        return cls(arrays, meta, path=path)
+
+    def __getstate__(self):
+        # Los procesos trabajadores vuelven a proyectar el archivo
+        if self.path is not None:
+            return {'path': self.path}
+        state = {name: array('Q', getattr(self, name)) for name in HASH_ARRAYS}
+        state.update({name: array('f', getattr(self, name)) for name in COST_ARRAYS})
+        state['meta'] = self.meta
+        return state
+
+    def __setstate__(self, state):
+        if 'path' in state:
+            other = self.load(state['path'])
+            self.__dict__.update(other.__dict__)
+        else:
+            self.__init__(state, state['meta'])
+
+    # Puntuación
+    def markov_bits(self, password):
+        """
+        -log2 P(contraseña) según la cadena de Markov (incluye el fin)
+        """
+        transitions = self.transitions
+        return round(sum(transitions[index]
+                         for index in _transition_indexes(password, self.order)), 2)
+
+    def pcfg_bits(self, password):
+        """
+        -log2 P(contraseña) según la gramática: P(estructura) por el
+        producto de P(segmento | clase y longitud)
+        """
+        parts = segments(password)
+        bits = _lookup(self.structure_keys, self.structure_costs,
+                       _key(''.join(f"{c}{len(text)}" for c, text in parts)))
+        if bits is None:
+            bits = self.unseen_structure
+        for c, text in parts:
+            group = f"{c}{len(text)}"
+            cost = _lookup(self.terminal_keys, self.terminal_costs, _key(f"{group}\x00{text}"))
+            if cost is None:
+                # Segmento nunca visto: suceso raro por un texto uniforme de la clase
+                cost = (self.unseen_terminal.get(group, 0) +
+                        len(text) * math.log2(CLASS_SIZES[c]))
+            bits += cost
+        return round(bits, 2)
+
+    def score(self, password):
+        return {'markov_bits': self.markov_bits(password),
+                'pcfg_bits': self.pcfg_bits(password)}
+
+
+def _transition_indexes(password, order):
+    """
+    Posiciones en la tabla de transiciones de cada carácter (y del fin)
+    """
+    context_size = SYMBOLS ** (order - 1)
+    context = 0
+    for _ in range(order - 1):
+        context = context * SYMBOLS + BOUNDARY
+    indexes = []
+    for symbol in [_INDEX.get(ch, OTHER) for ch in password] + [BOUNDARY]:
+        index = context * SYMBOLS + symbol
+        indexes.append(index)
+        context = index % context_size
+    return indexes
+
+
+def _lookup(keys, costs, key):
+    position = bisect_left(keys, key)
+    if position < len(keys) and keys[position] == key:
+        return costs[position]
+    return None
+
+
+def main():
+    from bulk import iter_passwords
+
+    parser = argparse.ArgumentParser(description='Modelo Markov/PCFG de contraseñas')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    train = subparsers.add_parser('train', help='Entrenar el modelo con un corpus')
+    train.add_argument('output', help='Archivo de modelo a generar')
+    train.add_argument('sources', nargs='+',
+                       help='Contraseñas en claro, una por línea (admite .gz/.xz/.bz2 y -)')
+    train.add_argument('--order', type=int, default=3, choices=[2, 3],
+                       help='Orden de la cadena de Markov (3 = trigramas)')
+    train.add_argument('--max-structures', type=int, default=100000,
+                       help='Máximo de estructuras PCFG distintas en memoria')
+    train.add_argument('--max-terminals', type=int, default=1000000,
+                       help='Máximo de segmentos distintos en memoria')
+
+    score = subparsers.add_parser('score', help='Puntuar contraseñas con un modelo')
+    score.add_argument('model', help='Archivo de modelo')
+    score.add_argument('passwords', nargs='+', help='Contraseñas a puntuar')
+
+    args = parser.parse_args()
+    if args.command == 'train':
+        model = PasswordModel.train(iter_passwords(args.sources), order=args.order,
+                                    max_structures=args.max_structures,
+                                    max_terminals=args.max_terminals)
+        model.save(args.output)
+        print(f"Modelo generado: {args.output} ({model.trained_on} contraseñas)")
+    else:
+        model = PasswordModel.load(args.model)
+        for password in args.passwords:
+            result = model.score(password)
+            print(f"{password}: Markov {result['markov_bits']} bits, "
+                  f"PCFG {result['pcfg_bits']} bits")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import os
+from collections import deque
+from multiprocessing import Pool
+
+from result import AnalysisResult, SUMMARY_FIELDS
+
+# Analizador (o política) propio de cada proceso trabajador
+_worker_analyzer = None
+_worker_policy = None
+
+
+def _init_worker(analyzer):
+    """
+    Inicializa el proceso trabajador con su analizador. Con 'fork' el objeto
+    se hereda copy-on-write; con 'spawn' se serializa una sola vez por proceso
+    """
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _init_policy_worker(policy):
+    global _worker_policy
+    _worker_policy = policy
+
+
+def _check_chunk(chunk, all_rules):
+    """
+    Valida un bloque de pares (contraseña, usuario) contra la política y
+    devuelve las reglas incumplidas de cada uno
+    """
+    return [_check(_worker_policy, password, user, all_rules) for password, user in chunk]
+
+
+def _check(policy, password, user, all_rules):
+    if all_rules:
+        return policy.violations(password, user)
+    failed = policy.check(password, user)
+    return [failed] if failed else []
+
+
+def _analyze_chunk(chunk, fields):
+    """
+    Analiza un bloque de contraseñas dentro del trabajador y devuelve solo
+    una tupla con los valores de 'fields' por contraseña (None si está
+    vacía). Serializar tuplas de valores simples cuesta mucho menos que
+    serializar objetos AnalysisResult, y el proceso principal, que recibe
+    los resultados de todos los trabajadores, no se convierte en el cuello
+    de botella
+    """
+    analyze = _worker_analyzer.analyze_password
+    rows = []
+    for password in chunk:
+        if password:
+            analysis = analyze(password, fields)
+            rows.append(tuple([analysis[name] for name in fields]))
+        else:
+            rows.append(None)
+    return rows
+
+
+def _analyze_chunk_dicts(chunk, fields):
+    """
+    Como _analyze_chunk, pero devuelve dicts listos para serializar a JSON
+    """
+    analyze = _worker_analyzer.analyze_password
+    return [analyze(password).to_dict(fields) for password in chunk]
+
+
+def iter_chunks(passwords, chunksize):
+    """
+    Agrupa un iterable en bloques de tamaño fijo sin materializarlo
+    """
+    chunk = []
+    for password in passwords:
+        chunk.append(password)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _receive(analyzer, chunk, rows, fields):
+    """
+    Reconstruye los resultados en el proceso principal a partir de las
+    contraseñas del bloque y las filas del trabajador (campos perezosos)
+    """
+    # Descriptores de los slots: asignarlos directamente evita setattr por nombre
+    slots = [getattr(AnalysisResult, '_' + name).__set__ for name in fields]
+    for password, values in zip(chunk, rows):
+        if values is None:
+            yield analyzer.analyze_password(password)
+            continue
+        result = AnalysisResult(analyzer, password)
+        for assign, value in zip(slots, values):
+            assign(result, value)
+        yield result
+
+
+def analyze_parallel(analyzer, passwords, workers=None, chunksize=1000, max_pending=None,
+                     fields=None):
+    """
+    Reparte bloques de contraseñas entre procesos y devuelve los análisis en
+    el orden de entrada. Solo hay 'max_pending' bloques en vuelo a la vez,
+    así que la memoria no depende del tamaño de la entrada. Los trabajadores
+    calculan 'fields' (por defecto, los del resumen masivo)
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        yield from analyzer.analyze_stream(passwords, fields)
+        return
+
+    # La contraseña y la longitud ya las tiene el proceso principal
+    fields = tuple(name for name in dict.fromkeys(fields or SUMMARY_FIELDS)
+                   if name not in ('password', 'length'))
+    max_pending = max_pending or workers * 4
+    pool = Pool(workers, initializer=_init_worker, initargs=(analyzer,))
+    try:
+        pending = deque()
+        for chunk in iter_chunks(passwords, chunksize):
+            pending.append((chunk, pool.apply_async(_analyze_chunk, (chunk, fields))))
+            if len(pending) >= max_pending:
+                chunk, result = pending.popleft()
+                yield from _receive(analyzer, chunk, result.get(), fields)
+        while pending:
+            chunk, result = pending.popleft()
+            yield from _receive(analyzer, chunk, result.get(), fields)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def check_parallel(policy, entries, workers=None, chunksize=1000, max_pending=None,
+                   all_rules=False):
+    """
+    Valida pares (contraseña, usuario) contra una política repartiendo
+    bloques entre procesos; devuelve la lista de reglas incumplidas de cada
+    par, en el orden de entrada y con memoria acotada
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for password, user in entries:
+            yield _check(policy, password, user, all_rules)
+        return
+
+    max_pending = max_pending or workers * 4
+    pool = Pool(workers, initializer=_init_policy_worker, initargs=(policy,))
+    try:
+        pending = deque()
+        for chunk in iter_chunks(entries, chunksize):
+            pending.append(pool.apply_async(_check_chunk, (chunk, all_rules)))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,322 @@
+"""
+Políticas de contraseñas declarativas (JSON o YAML) para auditorías de
+cumplimiento. Una política se compila una vez en una lista de
+comprobaciones ordenadas de la más barata a la más cara; la validación se
+detiene en la primera regla que falla y los campos del análisis solo se
+calculan si alguna regla los necesita
+
+Ejemplo (YAML):
+
+    name: acme
+    rules:
+      - min_length: 12
+      - require_classes: [lowercase, uppercase, digits]
+      - banned_substrings: [acme, password]
+      - max_repeat: 2
+      - no_user_fragments: 4
+      - not_common: true
+      - min_score: 60
+"""
+
+import json
+import re
+
+from dictionary import LEET_TABLE, normalize
+
+CLASS_NAMES = ('lowercase', 'uppercase', 'digits', 'symbols')
+CLASS_LABELS = {'lowercase': 'minúsculas', 'uppercase': 'mayúsculas', 'digits': 'números',
+                'symbols': 'símbolos'}
+
+# Campos numéricos del análisis que se pueden exigir con min_<campo>
+ANALYSIS_MINIMUMS = {
+    'min_entropy': ('entropy', 4),
+    'min_score': ('score', 6),
+    'min_guesses_log10': ('guesses_log10', 7),
+    'min_markov_bits': ('markov_bits', 5),
+    'min_pcfg_bits': ('pcfg_bits', 5),
+}
+
+_USER_SEPARATORS = re.compile(r'[^0-9a-zñáéíóúü]+')
+
+
+class PolicyError(ValueError):
+    """
+    Política mal escrita o con reglas desconocidas
+    """
+
+
+class _Context:
+    """
+    Datos de una contraseña durante la validación: el análisis se crea solo
+    si una regla lo consulta, y cada campo se calcula al leerlo
+    """
+    __slots__ = ('password', 'user', 'analyzer', '_lower', '_analysis')
+
+    def __init__(self, password, user, analyzer):
+        self.password = password
+        self.user = user
+        self.analyzer = analyzer
+        self._lower = None
+        self._analysis = None
+
+    @property
+    def lower(self):
+        if self._lower is None:
+            self._lower = self.password.lower()
+        return self._lower
+
+    @property
+    def analysis(self):
+        if self._analysis is None:
+            self._analysis = self.analyzer.analyze_password(self.password)
+        return self._analysis
+
+
+# Compiladores de reglas: valor de la regla -> (coste, test, mensaje).
+# El test devuelve True si la contraseña cumple
+def _min_length(value):
+    value = _integer('min_length', value)
+    return 0, lambda ctx: len(ctx.password) >= value, f"Menos de {value} caracteres"
+
+
+def _max_length(value):
+    value = _integer('max_length', value)
+    return 0, lambda ctx: len(ctx.password) <= value, f"Más de {value} caracteres"
+
+
+def _require_classes(value):
+    if isinstance(value, str):
+        value = [value]
+    unknown = [name for name in value if name not in CLASS_NAMES]
+    if unknown or not value:
+        raise PolicyError(f"Clases de caracteres desconocidas en require_classes: {unknown} "
+                          f"(válidas: {', '.join(CLASS_NAMES)})")
+    required = tuple(value)
+
+    def test(ctx):
+        sets = ctx.analyzer.scanner.character_sets(ctx.password)
+        return all(sets[name] for name in required)
+    return 1, test, f"Faltan caracteres de tipo: {', '.join(CLASS_LABELS[n] for n in required)}"
+
+
+def _min_classes(value):
+    value = _integer('min_classes', value)
+
+    def test(ctx):
+        return ctx.analyzer.scanner.character_sets(ctx.password)['count'] >= value
+    return 1, test, f"Menos de {value} tipos de caracteres"
+
+
+def _banned_substrings(value):
+    if isinstance(value, str):
+        value = [value]
+    words = sorted({word.lower() for word in value if word}, key=len, reverse=True)
+    if not words:
+        raise PolicyError("banned_substrings necesita al menos una palabra")
+    # Una sola alternancia para todas las palabras, sobre el texto normalizado
+    # (minúsculas y leetspeak: 'p@ssw0rd' contiene 'password')
+    regex = re.compile('|'.join(map(re.escape, dict.fromkeys(map(normalize, words)))))
+
+    def test(ctx):
+        return regex.search(ctx.lower.translate(LEET_TABLE)) is None
+    return 2, test, "Contiene una palabra prohibida"
+
+
+def _max_repeat(value):
+    value = _integer('max_repeat', value)
+    if value < 1:
+        raise PolicyError("max_repeat debe ser al menos 1")
+    regex = re.compile(r'(.)\1{%d}' % value, re.DOTALL)
+    return 2, lambda ctx: regex.search(ctx.password) is None, \
+        f"Más de {value} caracteres iguales seguidos"
+
+
+def _no_user_fragments(value):
+    # true equivale a fragmentos de 4 caracteres
+    size = 4 if value is True else _integer('no_user_fragments', value)
+    if size < 2:
+        raise PolicyError("no_user_fragments debe ser al menos 2")
+
+    def test(ctx):
+        if not ctx.user:
+            return True
+        lower = ctx.lower
+        for piece in _USER_SEPARATORS.split(ctx.user.lower()):
+            for start in range(len(piece) - size + 1):
+                if piece[start:start + size] in lower:
+                    return False
+        return True
+    return 3, test, "Contiene fragmentos del usuario o del correo"
+
+
+def _not_common(value):
+    if not value:
+        return None
+    return 4, lambda ctx: not ctx.analysis.is_common, "Contraseña común o filtrada"
+
+
+def _max_breach_count(value):
+    value = _integer('max_breach_count', value)
+
+    def test(ctx):
+        count = ctx.analysis.breach_count
+        return count is None or count <= value
+    return 5, test, f"Aparece más de {value} veces en filtraciones"
+
+
+def _analysis_minimum(name):
+    field, cost = ANALYSIS_MINIMUMS[name]
+
+    def compile_rule(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise PolicyError(f"{name} debe ser un número")
+
+        def test(ctx):
+            actual = ctx.analysis[field]
+            # Sin modelo Markov/PCFG el campo es None y la regla no aplica
+            return actual is None or actual >= value
+        return cost, test, f"{field} por debajo de {value}"
+    return compile_rule
+
+
+RULES = {
+    'min_length': _min_length,
+    'max_length': _max_length,
+    'require_classes': _require_classes,
+    'min_classes': _min_classes,
+    'banned_substrings': _banned_substrings,
+    'max_repeat': _max_repeat,
+    'no_user_fragments': _no_user_fragments,
+    'not_common': _not_common,
+    'max_breach_count': _max_breach_count,
+}
+RULES.update({name: _analysis_minimum(name) for name in ANALYSIS_MINIMUMS})
+
+
+def _integer(name, value):
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise PolicyError(f"{name} debe ser un entero no negativo")
+    return value
+
+
+class Policy:
+    """
+    Política compilada. check() devuelve la primera regla incumplida (o
+    None) y violations() todas; 'user' es el usuario o correo asociado a la
+    contraseña, si se conoce
+    """
+    def __init__(self, rules, name=None, analyzer=None):
+        if analyzer is None:
+            from analyzer import PasswordAnalyzer
+            analyzer = PasswordAnalyzer()
+        self.rules = list(rules)
+        self.name = name
+        self.analyzer = analyzer
+        self.rule_ids = []
+        compiled = []
+        for order, (rule, value) in enumerate(self.rules):
+            if rule not in RULES:
+                raise PolicyError(f"Regla desconocida: {rule} (válidas: {', '.join(RULES)})")
+            result = RULES[rule](value)
+            if result is None:
+                continue
+            cost, test, message = result
+            rule_id = rule if rule not in self.rule_ids else f"{rule}#{order + 1}"
+            self.rule_ids.append(rule_id)
+            compiled.append((cost, order, rule_id, test, message))
+        # Las reglas baratas primero; a igual coste, en el orden de la política
+        compiled.sort(key=lambda item: item[:2])
+        self._tests = tuple((rule_id, test) for _, _, rule_id, test, _ in compiled)
+        self.messages = {rule_id: message for _, _, rule_id, _, message in compiled}
+
+    @classmethod
+    def from_dict(cls, spec, analyzer=None):
+        """
+        Crea la política a partir del dict leído del archivo. 'rules' puede
+        ser un dict o una lista de dicts de una regla (permite repetir reglas)
+        """
+        if not isinstance(spec, dict) or 'rules' not in spec:
+            raise PolicyError("La política debe ser un objeto con una clave 'rules'")
+        rules = spec['rules']
+        if isinstance(rules, dict):
+            rules = list(rules.items())
+        elif isinstance(rules, list):
+            pairs = []
+            for item in rules:
+                if not isinstance(item, dict) or len(item) != 1:
+                    raise PolicyError(f"Cada regla debe ser un objeto de una sola clave: {item!r}")
+                pairs.extend(item.items())
+            rules = pairs
+        else:
+            raise PolicyError("'rules' debe ser un objeto o una lista")
+        return cls(rules, name=spec.get('name'), analyzer=analyzer)
+
+    def __reduce__(self):
+        # Las reglas compiladas son closures: cada proceso vuelve a compilarlas
+        return Policy, (self.rules, self.name, self.analyzer)
+
+    def check(self, password, user=None):
+        """
+        Primera regla incumplida (su identificador) o None si cumple
+        """
+        ctx = _Context(password, user, self.analyzer)
+        for rule_id, test in self._tests:
+            if not test(ctx):
+                return rule_id
+        return None
+
+    def violations(self, password, user=None):
+        """
+        Todas las reglas incumplidas, en orden de evaluación
+        """
+        ctx = _Context(password, user, self.analyzer)
+        return [rule_id for rule_id, test in self._tests if not test(ctx)]
+
+    def __call__(self, password, user=None):
+        return self.check(password, user) is None
+
+
+def load_policy(path, analyzer=None):
+    """
+    Lee una política de un archivo .json, .yaml o .yml
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    if path.endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise PolicyError("Las políticas YAML necesitan PyYAML (pip install pyyaml); "
+                              "usa JSON en su lugar")
+        spec = yaml.safe_load(text)
+    else:
+        try:
+            spec = json.loads(text)
+        except ValueError as e:
+            raise PolicyError(f"JSON inválido en {path}: {e}")
+    return Policy.from_dict(spec, analyzer=analyzer)
+
+
+class PolicyReport:
+    """
+    Resumen incremental de una auditoría: contraseñas revisadas, las que
+    cumplen y el número de incumplimientos por regla
+    """
+    def __init__(self, rule_ids=()):
+        self.total = 0
+        self.compliant = 0
+        self.violations = dict.fromkeys(rule_ids, 0)
+
+    def add(self, failed):
+        """
+        Acumula el resultado de una contraseña (lista de reglas incumplidas)
+        """
+        self.total += 1
+        if not failed:
+            self.compliant += 1
+        for rule_id in failed:
+            self.violations[rule_id] = self.violations.get(rule_id, 0) + 1
+
+    def to_dict(self):
+        return {'total': self.total, 'compliant': self.compliant,
+                'violations': dict(self.violations)}
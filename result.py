@@ -0,0 +1,235 @@
+from collections.abc import Mapping
+
+# Campos del análisis, en el mismo orden que el dict original
+FIELDS = ('password', 'length', 'score', 'strength', 'feedback', 'patterns',
+          'character_sets', 'entropy', 'crack_time', 'is_common', 'breach_count',
+          'dictionary_words', 'guesses', 'guesses_log10', 'crack_seconds', 'markov_bits',
+          'pcfg_bits')
+FIELD_SET = frozenset(FIELDS)
+
+# Campos que dependen del texto de la contraseña (el resto se deriva de ellos)
+PASSWORD_FIELDS = ('length', 'character_sets', 'entropy', 'patterns', 'is_common',
+                   'breach_count', 'dictionary_words')
+
+# Campos que necesita un resumen masivo (todo salvo los textos)
+SUMMARY_FIELDS = PASSWORD_FIELDS + ('score', 'strength')
+
+_MISSING = object()
+
+
+def _restore(state):
+    result = AnalysisResult.__new__(AnalysisResult)
+    result._analyzer = None
+    for name in FIELDS:
+        setattr(result, '_' + name, state.get(name, _MISSING))
+    return result
+
+
+class AnalysisResult(Mapping):
+    """
+    Resultado compacto de un análisis. Se comporta como el dict de siempre
+    (result['score'], .get(), .items()) pero cada campo se calcula solo la
+    primera vez que se consulta, así que un recorrido masivo que solo lee
+    la puntuación no genera el feedback ni el tiempo de cracking
+    """
+    __slots__ = ('_analyzer',) + tuple('_' + name for name in FIELDS)
+
+    def __init__(self, analyzer, password):
+        self._analyzer = analyzer
+        self._password = password
+        self._length = len(password)
+        self._score = _MISSING
+        self._strength = _MISSING
+        self._feedback = _MISSING
+        self._patterns = _MISSING
+        self._character_sets = _MISSING
+        self._entropy = _MISSING
+        self._crack_time = _MISSING
+        self._is_common = _MISSING
+        self._breach_count = _MISSING
+        self._dictionary_words = _MISSING
+        self._guesses = _MISSING
+        self._guesses_log10 = _MISSING
+        self._crack_seconds = _MISSING
+        self._markov_bits = _MISSING
+        self._pcfg_bits = _MISSING
+
+    @classmethod
+    def from_values(cls, analyzer, values):
+        """
+        Crea un resultado con todos los campos ya calculados
+        """
+        result = _restore(values)
+        result._analyzer = analyzer
+        return result
+
+    # Acceso tipo dict
+    def __getitem__(self, key):
+        if key not in FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __contains__(self, key):
+        return key in FIELD_SET
+
+    def __repr__(self):
+        computed = {name: getattr(self, '_' + name) for name in FIELDS
+                    if getattr(self, '_' + name) is not _MISSING}
+        return f"AnalysisResult({computed!r})"
+
+    def __reduce__(self):
+        # Solo viajan los campos calculados; el analizador no se serializa
+        state = {name: getattr(self, '_' + name) for name in FIELDS
+                 if getattr(self, '_' + name) is not _MISSING}
+        return _restore, (state,)
+
+    def attach(self, analyzer):
+        """
+        Asocia el analizador que calculará los campos pendientes
+        """
+        self._analyzer = analyzer
+        return self
+
+    def materialize(self, fields=FIELDS):
+        """
+        Fuerza el cálculo de los campos indicados
+        """
+        for name in fields:
+            getattr(self, name)
+        return self
+
+    def to_dict(self, fields=None):
+        """
+        Copia como dict normal (por ejemplo, para serializar a JSON)
+        """
+        return {name: getattr(self, name) for name in (fields or FIELDS)}
+
+    def clone(self, password):
+        """
+        Copia con otra contraseña y sin compartir listas mutables (caché)
+        """
+        result = _restore({})
+        result._analyzer = self._analyzer
+        for name in FIELDS:
+            value = getattr(self, '_' + name)
+            if isinstance(value, (list, dict)):
+                value = value.copy()
+            setattr(result, '_' + name, value)
+        result._password = password
+        return result
+
+    # Campos, calculados bajo demanda
+    @property
+    def password(self):
+        return self._password
+
+    @property
+    def length(self):
+        return self._length
+
+    @property
+    def character_sets(self):
+        if self._character_sets is _MISSING:
+            self._character_sets = self._analyzer._analyze_character_sets(self._password)
+        return self._character_sets
+
+    @property
+    def entropy(self):
+        if self._entropy is _MISSING:
+            self._entropy = self._analyzer.scanner.entropy(self._length, self.character_sets)
+        return self._entropy
+
+    @property
+    def dictionary_words(self):
+        if self._dictionary_words is _MISSING:
+            self._dictionary_words = self._analyzer._find_dictionary_words(self._password)
+        return self._dictionary_words
+
+    @property
+    def patterns(self):
+        if self._patterns is _MISSING:
+            patterns = self._analyzer._detect_patterns(self._password)
+            if self.dictionary_words:
+                patterns.append('dictionary_word')
+            self._patterns = patterns
+        return self._patterns
+
+    @property
+    def breach_count(self):
+        if self._breach_count is _MISSING:
+            self._breach_count = self._analyzer._breach_count(self._password)
+        return self._breach_count
+
+    @property
+    def is_common(self):
+        if self._is_common is _MISSING:
+            self._is_common = (bool(self.breach_count) or
+                               self._analyzer._is_common_password(self._password))
+        return self._is_common
+
+    @property
+    def score(self):
+        if self._score is _MISSING:
+            self._score = self._analyzer._calculate_score(self)
+        return self._score
+
+    @property
+    def strength(self):
+        if self._strength is _MISSING:
+            self._strength = self._analyzer._get_strength_level(self.score)
+        return self._strength
+
+    @property
+    def feedback(self):
+        if self._feedback is _MISSING:
+            self._feedback = self._analyzer._generate_feedback(self)
+        return self._feedback
+
+    @property
+    def crack_time(self):
+        if self._crack_time is _MISSING:
+            self._crack_time = self._analyzer._crack_time_for_entropy(self.entropy)
+        return self._crack_time
+
+    @property
+    def guesses(self):
+        if self._guesses is _MISSING:
+            estimate = self._analyzer._estimate_guesses(self._password)
+            self._guesses = estimate['guesses']
+            self._guesses_log10 = estimate['guesses_log10']
+        return self._guesses
+
+    @property
+    def guesses_log10(self):
+        if self._guesses_log10 is _MISSING:
+            # 'guesses' puede venir ya calculado sin su logaritmo (un
+            # trabajador de parallel.py que solo envió ese campo)
+            estimate = self._analyzer._estimate_guesses(self._password)
+            self._guesses_log10 = estimate['guesses_log10']
+            if self._guesses is _MISSING:
+                self._guesses = estimate['guesses']
+        return self._guesses_log10
+
+    @property
+    def crack_seconds(self):
+        if self._crack_seconds is _MISSING:
+            self._crack_seconds = self._analyzer._crack_seconds(self.guesses)
+        return self._crack_seconds
+
+    @property
+    def markov_bits(self):
+        if self._markov_bits is _MISSING:
+            self._markov_bits = self._analyzer._markov_bits(self._password)
+        return self._markov_bits
+
+    @property
+    def pcfg_bits(self):
+        if self._pcfg_bits is _MISSING:
+            self._pcfg_bits = self._analyzer._pcfg_bits(self._password)
+        return self._pcfg_bits
@@ -0,0 +1,253 @@
+"""
+Contraseñas más reutilizadas en volcados mayores que la memoria. El modo
+aproximado recorre la entrada una vez con memoria fija (count-min sketch +
+lista acotada de candidatas); el modo exacto ordena bloques en disco y los mezcla, como
+corpus.py
+"""
+
+import hashlib
+import heapq
+import math
+import struct
+import tempfile
+from array import array
+from collections import namedtuple
+
+# Una entrada del informe: 'error' es la sobreestimación máxima del contador
+ReusedPassword = namedtuple('ReusedPassword', ['password', 'count', 'error'])
+
+
+class CountMinSketch:
+    """
+    Matriz depth x width de contadores. Cada contraseña incrementa una celda
+    por fila (actualización conservadora: solo las que tienen el mínimo) y
+    su frecuencia estimada es el mínimo de esas celdas, que nunca se queda
+    por debajo de la real
+    """
+    def __init__(self, width=1 << 20, depth=4):
+        if width & (width - 1) or not 1 <= depth <= 8:
+            raise ValueError("width debe ser potencia de dos y depth estar entre 1 y 8")
+        self.width = width
+        self.depth = depth
+        self._mask = width - 1
+        self._offsets = [row * width for row in range(depth)]
+        self._unpack = struct.Struct(f'<{depth}I').unpack
+        self._cells = array('Q', bytes(8 * width * depth))
+
+    def _indexes(self, data):
+        # Un único hash de 4*depth bytes: 32 bits por fila
+        values = self._unpack(hashlib.blake2b(data, digest_size=4 * self.depth).digest())
+        mask = self._mask
+        return [offset + (value & mask) for offset, value in zip(self._offsets, values)]
+
+    def add(self, data, count=1):
+        """
+        Suma 'count' apariciones y devuelve la nueva estimación
+        """
+        cells = self._cells
+        indexes = self._indexes(data)
+        estimate = min(map(cells.__getitem__, indexes)) + count
+        for i in indexes:
+            if cells[i] < estimate:
+                cells[i] = estimate
+        return estimate
+
+    def estimate(self, data):
+        return min(map(self._cells.__getitem__, self._indexes(data)))
+
+
+class HeavyHitters:
+    """
+    Candidatas a más repetidas guiadas por un count-min sketch: se vigilan
+    como mucho 'capacity' contraseñas con su estimación, y una nueva entra
+    cuando su estimación supera la menor de las vigiladas. Montículo de
+    mínimos con borrado perezoso, así que cada actualización cuesta O(log k)
+    """
+    def __init__(self, capacity=10000):
+        if capacity < 1:
+            raise ValueError("La capacidad debe ser al menos 1")
+        self.capacity = capacity
+        # contraseña -> estimación actual
+        self._counts = {}
+        # (estimación, contraseña); las entradas desactualizadas se descartan al salir
+        self._heap = []
+
+    def __len__(self):
+        return len(self._counts)
+
+    def offer(self, key, estimate):
+        counts, heap = self._counts, self._heap
+        if key in counts:
+            counts[key] = estimate
+        elif len(counts) < self.capacity:
+            counts[key] = estimate
+        else:
+            while heap[0][0] != counts.get(heap[0][1]):
+                heapq.heappop(heap)
+            if estimate <= heap[0][0]:
+                return
+            del counts[heapq.heappop(heap)[1]]
+            counts[key] = estimate
+        heapq.heappush(heap, (estimate, key))
+        if len(heap) > 4 * self.capacity:
+            # Se reconstruye sin las entradas desactualizadas
+            self._heap = [(count, key) for key, count in counts.items()]
+            heapq.heapify(self._heap)
+
+    def most_common(self, n=None):
+        """
+        (contraseña, estimación) ordenadas de más a menos apariciones
+        """
+        return sorted(self._counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+
+class ReuseReport:
+    """
+    Resultado del recuento: total de contraseñas leídas, distintas (solo en
+    modo exacto) y las más repetidas como ReusedPassword
+    """
+    def __init__(self, total, top, distinct=None, exact=False):
+        self.total = total
+        self.top = top
+        self.distinct = distinct
+        self.exact = exact
+
+
+def top_reused_sketch(passwords, top=20, width=1 << 20, depth=4, capacity=None):
+    """
+    Top-N aproximado en una pasada y memoria fija. Los contadores nunca se
+    quedan por debajo de los reales y 'error' es la cota de sobreestimación
+    del sketch (e/width del total, con probabilidad 1 - e^-depth)
+    """
+    capacity = capacity or max(1000, top * 50)
+    sketch = CountMinSketch(width, depth)
+    candidates = HeavyHitters(capacity)
+    total = 0
+    for password in passwords:
+        total += 1
+        candidates.offer(password, sketch.add(password.encode('utf-8', errors='surrogatepass')))
+    bound = int(math.e / width * total)
+    entries = [ReusedPassword(password, count, min(bound, count))
+               for password, count in candidates.most_common(top)]
+    return ReuseReport(total, entries)
+
+
+# Registro de un bloque en disco: longitud del texto en UTF-8, número y texto.
+# Binario y con longitud delante, así que admite cualquier carácter ('\r',
+# '\t', '\n'...) dentro de la contraseña
+_RECORD = struct.Struct('<IQ')
+
+
+def write_run(pairs, directory=None):
+    """
+    Vuelca pares (texto, número) ya ordenados a un temporal binario y lo
+    deja listo para leerlo con read_run
+    """
+    run = tempfile.TemporaryFile(dir=directory, buffering=1 << 20)
+    pack = _RECORD.pack
+    buffer = []
+    for text, number in pairs:
+        data = text.encode('utf-8', errors='surrogatepass')
+        buffer.append(pack(len(data), number))
+        buffer.append(data)
+        if len(buffer) >= 16384:
+            run.write(b''.join(buffer))
+            buffer = []
+    run.write(b''.join(buffer))
+    run.seek(0)
+    return run
+
+
+def read_run(run):
+    """
+    Pares (texto, número) de un bloque escrito con write_run
+    """
+    read = run.read
+    size = _RECORD.size
+    unpack = _RECORD.unpack
+    while True:
+        header = read(size)
+        if not header:
+            return
+        length, number = unpack(header)
+        yield read(length).decode('utf-8', errors='surrogatepass'), number
+
+
+def count_sorted(passwords, run_size=1000000, directory=None):
+    """
+    (contraseña, apariciones) de cada contraseña distinta, en orden
+    alfabético y con memoria acotada: cuenta bloques de 'run_size'
+    contraseñas, los vuelca ordenados a disco y los mezcla
+    """
+    directory = directory or tempfile.gettempdir()
+    runs = []
+    try:
+        counts = {}
+        for password in passwords:
+            counts[password] = counts.get(password, 0) + 1
+            if len(counts) >= run_size:
+                runs.append(write_run(sorted(counts.items()), directory))
+                counts = {}
+        if counts or not runs:
+            runs.append(write_run(sorted(counts.items()), directory))
+        counts = None
+
+        current, current_count = None, 0
+        for password, count in heapq.merge(*(read_run(run) for run in runs)):
+            if password == current:
+                current_count += count
+                continue
+            if current is not None:
+                yield current, current_count
+            current, current_count = password, count
+        if current is not None:
+            yield current, current_count
+    finally:
+        for run in runs:
+            run.close()
+
+
+def top_reused_exact(passwords, top=20, run_size=1000000, directory=None):
+    """
+    Top-N exacto con memoria acotada: recorre las contraseñas distintas de
+    count_sorted conservando solo las N mayores
+    """
+    heap = []
+    total = distinct = 0
+    for password, count in count_sorted(passwords, run_size, directory):
+        total += count
+        distinct += 1
+        _push(heap, top, password, count)
+
+    entries = [ReusedPassword(password, count, 0)
+               for count, _, password in sorted(heap, key=lambda item: (-item[0], item[2]))]
+    return ReuseReport(total, entries, distinct=distinct, exact=True)
+
+
+def _push(heap, top, password, count):
+    # Montículo de mínimos con las N mayores; en empate gana el orden alfabético
+    item = (count, _Reversed(password), password)
+    if len(heap) < top:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+class _Reversed:
+    """
+    Envoltorio que invierte el orden (las contraseñas menores ganan el empate)
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __gt__(self, other):
+        return self.value < other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
@@ -0,0 +1,170 @@
+import math
+import re
+import string
+
+LOWERCASE = frozenset(string.ascii_lowercase)
+UPPERCASE = frozenset(string.ascii_uppercase)
+DIGITS = frozenset(string.digits)
+ALPHANUMERIC = LOWERCASE | UPPERCASE | DIGITS
+
+# Patrones con tratamiento propio dentro del escáner
+REPEAT_PATTERN = r'(\w)\1{2,}'
+DATE_PATTERN = r'(?:19|20)\d\d'
+KEYBOARD_SEQUENCES = ('qwerty', 'asdf', '1234', 'zxcv')
+
+# log2 del tamaño del conjunto de caracteres para cada combinación posible
+CHARSET_LOG2 = {size: math.log2(size) for size in range(1, 95)}
+
+
+def _literal_token(pattern):
+    """
+    Devuelve la cadena literal equivalente a un patrón simple ('admin',
+    'abc+') o None si el patrón necesita el motor de expresiones regulares
+    """
+    if re.fullmatch(r'\w+', pattern):
+        return pattern
+    match = re.fullmatch(r'(\w*)(\w)\+', pattern)
+    if match:
+        return match.group(1) + match.group(2)
+    return None
+
+
+def _may_start_together(token, kind):
+    """
+    Indica si un literal y un patrón especial pueden coincidir en la misma
+    posición (la alternancia de la regex solo informa de uno de ellos)
+    """
+    if kind == 'date':
+        return bool(re.match(DATE_PATTERN, token) or
+                    re.fullmatch(r'1|2|19|20|(?:19|20)\d', token))
+    return bool(re.fullmatch(r'\w+', token[:3]) and len(set(token[:3])) == 1)
+
+
+class PatternScanner:
+    """
+    Núcleo de análisis compilado una sola vez: clasifica los caracteres y
+    detecta todos los patrones débiles en una única pasada lineal
+    """
+    def __init__(self, weak_patterns, keyboard_patterns=KEYBOARD_SEQUENCES):
+        # Orden de salida idéntico al de los patrones configurados
+        self.order = list(weak_patterns) + ['date_pattern']
+        self.order += [f'keyboard_{pattern}' for pattern in keyboard_patterns]
+
+        tokens = {}
+        repeat_labels = []
+        self.fallback = []
+        for pattern in weak_patterns:
+            literal = _literal_token(pattern)
+            if pattern == REPEAT_PATTERN:
+                repeat_labels.append(pattern)
+            elif literal is not None:
+                tokens.setdefault(literal, []).append(pattern)
+            else:
+                # Patrones personalizados que no se pueden fusionar
+                self.fallback.append((pattern, re.compile(pattern)))
+        for pattern in keyboard_patterns:
+            tokens.setdefault(pattern, []).append(f'keyboard_{pattern}')
+        # Literales y repeticiones, para otros motores (vectorizado, incremental)
+        self.tokens = tokens
+        self.repeat_labels = repeat_labels
+
+        # Cada alternativa: (grupo, etiquetas, expresión para comprobarla sola)
+        alternatives = [('date', ('date_pattern',), DATE_PATTERN)]
+        if repeat_labels:
+            alternatives.append(('rep', tuple(repeat_labels), REPEAT_PATTERN))
+        for index, (token, labels) in enumerate(sorted(tokens.items(),
+                                                       key=lambda item: -len(item[0]))):
+            alternatives.append((f't{index}', tuple(labels), re.escape(token)))
+
+        parts = []
+        for group, _, source in alternatives:
+            if group == 'rep':
+                parts.append(r'(?P<rep>(?P<rep_char>\w)(?P=rep_char){2})')
+            else:
+                parts.append(f'(?P<{group}>{source})')
+        self.regex = re.compile('(?=' + '|'.join(parts) + ')')
+        self.labels = {group: labels for group, labels, _ in alternatives}
+
+        # Alternativas que pueden empezar en la misma posición que otra
+        self.conflicts = {}
+        literals = [(group, source.replace('\\', '')) for group, _, source in alternatives
+                    if group.startswith('t')]
+        for group, token in literals:
+            others = []
+            for other, other_token in literals:
+                if other != group and (token.startswith(other_token) or
+                                       other_token.startswith(token)):
+                    others.append((other, re.compile(re.escape(other_token))))
+            for special, source in (('date', DATE_PATTERN), ('rep', r'(\w)\1\1')):
+                if special in self.labels and _may_start_together(token, special):
+                    others.append((special, re.compile(source)))
+                    self.conflicts.setdefault(special, []).append(
+                        (group, re.compile(re.escape(token))))
+            if others:
+                self.conflicts.setdefault(group, []).extend(others)
+
+    def hits(self, text):
+        """
+        Devuelve el conjunto de etiquetas de patrón presentes en el texto
+        """
+        found = set()
+        labels = self.labels
+        conflicts = self.conflicts
+        for match in self.regex.finditer(text):
+            group = match.lastgroup
+            if group == 'rep_char':
+                group = 'rep'
+            found.update(labels[group])
+            if group in conflicts:
+                position = match.start()
+                for other, regex in conflicts[group]:
+                    if regex.match(text, position):
+                        found.update(labels[other])
+        for label, regex in self.fallback:
+            if regex.search(text):
+                found.add(label)
+        return found
+
+    def ordered(self, found):
+        """
+        Convierte un conjunto de etiquetas en la lista ordenada de patrones
+        """
+        return [label for label in self.order if label in found]
+
+    def detect_patterns(self, password):
+        """
+        Lista de patrones débiles detectados (sobre la contraseña en minúsculas)
+        """
+        return self.ordered(self.hits(password.lower()))
+
+    def character_sets(self, password):
+        """
+        Clasifica los caracteres de la contraseña en una sola pasada
+        """
+        chars = set(password)
+        sets = {
+            'lowercase': not chars.isdisjoint(LOWERCASE),
+            'uppercase': not chars.isdisjoint(UPPERCASE),
+            'digits': not chars.isdisjoint(DIGITS),
+            'symbols': not chars <= ALPHANUMERIC,
+            'count': 0
+        }
+        sets['count'] = sets['lowercase'] + sets['uppercase'] + sets['digits'] + sets['symbols']
+        return sets
+
+    def entropy(self, length, sets):
+        """
+        Entropía = longitud * log2(tamaño del conjunto de caracteres)
+        """
+        charset_size = (26 * sets['lowercase'] + 26 * sets['uppercase'] +
+                        10 * sets['digits'] + 32 * sets['symbols'])
+        if not length or not charset_size:
+            return 0
+        return round(length * CHARSET_LOG2[charset_size], 2)
+
+    def scan(self, password):
+        """
+        Análisis completo en una pasada: (patrones, tipos de caracteres, entropía)
+        """
+        sets = self.character_sets(password)
+        return self.detect_patterns(password), sets, self.entropy(len(password), sets)
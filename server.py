@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Servicio HTTP/JSON local para análisis y generación de contraseñas.
+Mantiene el analizador cargado, agrupa las peticiones concurrentes en
+micro-lotes y ejecuta el trabajo de CPU en un pool de procesos, de modo
+que el bucle de eventos nunca se bloquea
+
+Endpoints:
+    POST /analyze   {"password": "...", "fields": [...]}
+    POST /batch     {"passwords": ["...", ...], "fields": [...]}
+    POST /generate  {"count": 5, "length": 16, "use_symbols": true}
+    GET  /stats     latencias p50/p99, contadores y throughput
+    GET  /health
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import parallel
+import service
+from service import RequestError
+
+MAX_BODY = 16 * 1024 * 1024
+MAX_HEADER_LINES = 100
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class LatencyStats:
+    """
+    Contadores y ventana deslizante de latencias por endpoint
+    """
+    def __init__(self, window=10000):
+        self.window = window
+        self.started = time.monotonic()
+        self.latencies = {}
+        self.requests = {}
+        self.errors = 0
+        self.passwords = 0
+        self.batches = 0
+        self.batched_requests = 0
+
+    def record(self, endpoint, seconds, ok=True):
+        if endpoint not in self.latencies:
+            self.latencies[endpoint] = deque(maxlen=self.window)
+            self.requests[endpoint] = 0
+        self.latencies[endpoint].append(seconds)
+        self.requests[endpoint] += 1
+        if not ok:
+            self.errors += 1
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_requests += size
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        endpoints = {}
+        for endpoint, values in self.latencies.items():
+            ordered = sorted(values)
+            endpoints[endpoint] = {
+                'requests': self.requests[endpoint],
+                'p50_ms': round(_percentile(ordered, 50) * 1000, 3),
+                'p99_ms': round(_percentile(ordered, 99) * 1000, 3),
+                'requests_per_second': round(self.requests[endpoint] / uptime, 2) if uptime else 0,
+            }
+        return {
+            'uptime_seconds': round(uptime, 3),
+            'requests': sum(self.requests.values()),
+            'errors': self.errors,
+            'passwords': self.passwords,
+            'passwords_per_second': round(self.passwords / uptime, 2) if uptime else 0,
+            'micro_batches': self.batches,
+            'average_batch_size': round(self.batched_requests / self.batches, 2)
+                                  if self.batches else 0,
+            'endpoints': endpoints,
+        }
+
+
+def _percentile(ordered, percent):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+
+class MicroBatcher:
+    """
+    Agrupa análisis individuales concurrentes: el lote se envía al pool al
+    llenarse o cuando pasa max_delay desde la primera petición pendiente
+    """
+    def __init__(self, executor, stats, max_batch=256, max_delay=0.005, max_in_flight=None):
+        self.executor = executor
+        self.stats = stats
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.slots = asyncio.Semaphore(max_in_flight or (os.cpu_count() or 1) * 2)
+        self.pending = []
+        self.timer = None
+        # Lotes en curso: el bucle solo guarda referencias débiles a las tareas
+        self.tasks = set()
+
+    def submit(self, password, fields):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((password, fields, future))
+        if len(self.pending) >= self.max_batch:
+            self._flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush)
+        return future
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def close(self):
+        """
+        Envía lo pendiente y espera a que terminen todos los lotes en curso
+        """
+        self._flush()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def _run(self, batch):
+        # Se calcula la unión de campos pedidos y se recorta por petición
+        fields = []
+        for _, requested, _ in batch:
+            fields.extend(name for name in requested if name not in fields)
+        passwords = [password for password, _, _ in batch]
+        self.stats.record_batch(len(batch))
+        try:
+            async with self.slots:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, parallel._analyze_chunk_dicts, passwords, tuple(fields))
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, requested, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result({name: result[name] for name in requested})
+
+
+class PasswordServer:
+    """
+    Servidor asyncio con HTTP/1.1 mínimo (keep-alive y Content-Length)
+    """
+    def __init__(self, analyzer, workers=None, max_batch=256, max_delay=0.005, chunksize=1000):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(self.workers, initializer=parallel._init_worker,
+                                            initargs=(analyzer,))
+        self.stats = LatencyStats()
+        self.batcher = MicroBatcher(self.executor, self.stats, max_batch, max_delay,
+                                    max_in_flight=self.workers * 2)
+        self.chunksize = chunksize
+        self.routes = {
+            '/analyze': ('POST', self.analyze),
+            '/batch': ('POST', self.batch),
+            '/generate': ('POST', self.generate),
+            '/stats': ('GET', self.get_stats),
+            '/health': ('GET', self.health),
+        }
+
+    # Endpoints
+    async def analyze(self, request):
+        password, fields = service.parse_analyze(request)
+        self.stats.passwords += 1
+        return await self.batcher.submit(password, fields)
+
+    async def batch(self, request):
+        passwords, fields = service.parse_batch(request)
+        self.stats.passwords += len(passwords)
+        loop = asyncio.get_running_loop()
+        chunks = parallel.iter_chunks(passwords, self.chunksize)
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self.executor, parallel._analyze_chunk_dicts, chunk, fields)
+            for chunk in chunks))
+        return {'results': [result for chunk in results for result in chunk]}
+
+    async def generate(self, request):
+        count, options = service.parse_generate(request)
+        passwords = await asyncio.get_running_loop().run_in_executor(
+            self.executor, service.generate_passwords, count, options)
+        return {'passwords': passwords}
+
+    async def get_stats(self, request):
+        return self.stats.snapshot()
+
+    async def health(self, request):
+        return {'status': 'ok', 'workers': self.workers}
+
+    # HTTP
+    async def dispatch(self, method, path, body):
+        route = self.routes.get(path.split('?', 1)[0])
+        if route is None:
+            raise RequestError(f"Ruta desconocida: {path}", status=404)
+        expected, handler = route
+        if method != expected:
+            raise RequestError(f"Método no permitido: {method}", status=405)
+        request = {}
+        if body:
+            try:
+                request = json.loads(body)
+            except ValueError:
+                raise RequestError("El cuerpo no es JSON válido")
+            if not isinstance(request, dict):
+                raise RequestError("El cuerpo debe ser un objeto JSON")
+        return await handler(request)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.monotonic()
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                    headers = await self._read_headers(reader)
+                except (ValueError, RequestError):
+                    await self._respond(writer, 400, {'error': "Petición HTTP inválida"}, False)
+                    break
+                keep_alive = (headers.get('connection', '').lower() != 'close' and
+                              version == 'HTTP/1.1')
+                status = 200
+                try:
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY:
+                        raise RequestError("Cuerpo demasiado grande", status=413)
+                    body = await reader.readexactly(length) if length else b''
+                    payload = await self.dispatch(method, path, body)
+                except RequestError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except ValueError:
+                    status, payload = 400, {'error': "Content-Length inválido"}
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as e:
+                    status, payload = 500, {'error': str(e)}
+                if status == 413:
+                    keep_alive = False
+                await self._respond(writer, status, payload, keep_alive)
+                endpoint = path.split('?', 1)[0]
+                self.stats.record(endpoint if endpoint in self.routes else 'other',
+                                  time.monotonic() - start, status == 200)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Apagado del servidor: se cierra la conexión sin más (en Python 3.11
+            # una tarea de conexión cancelada ensucia la salida con trazas)
+            pass
+        finally:
+            writer.close()
+
+    async def _read_headers(self, reader):
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return headers
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        raise RequestError("Demasiadas cabeceras")
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8765, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            try:
+                await self.batcher.close()
+            finally:
+                self.executor.shutdown(cancel_futures=True)
+
+
+def run(analyzer, host='127.0.0.1', port=8765, workers=None, **kwargs):
+    """
+    Arranca el servidor y bloquea hasta Ctrl+C
+    """
+    server = PasswordServer(analyzer, workers=workers, **kwargs)
+
+    def ready(listener):
+        addresses = ', '.join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}"
+                              for sock in listener.sockets)
+        print(f"Servicio escuchando en {addresses} ({server.workers} procesos)", flush=True)
+
+    asyncio.run(server.serve(host, port, ready))
+
+
+def main():
+    import argparse
+    from analyzer import PasswordAnalyzer
+
+    parser = argparse.ArgumentParser(description='Servicio HTTP/JSON de análisis de contraseñas')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=0, metavar='N',
+                        help='Procesos de análisis (0 = todos los núcleos)')
+    parser.add_argument('--corpus', metavar='ARCHIVO')
+    parser.add_argument('--dictionary', metavar='ARCHIVO')
+    parser.add_argument('--model', metavar='ARCHIVO')
+    parser.add_argument('--snapshot', metavar='ARCHIVO')
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-delay-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.snapshot:
+        analyzer = PasswordAnalyzer.from_snapshot(args.snapshot)
+    else:
+        analyzer = PasswordAnalyzer(corpus=args.corpus, dictionary=args.dictionary,
+                                    model=args.model)
+    try:
+        run(analyzer, args.host, args.port, args.workers, max_batch=args.max_batch,
+            max_delay=args.max_delay_ms / 1000)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
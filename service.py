@@ -0,0 +1,168 @@
+"""
+Lógica común de los modos de servicio: validación de peticiones JSON y
+ejecución de análisis y generación
+"""
+
+import json
+import sys
+
+from result import FIELDS
+
+# Por defecto no se devuelve la contraseña en claro
+DEFAULT_FIELDS = tuple(name for name in FIELDS if name != 'password')
+MAX_BATCH_SIZE = 100000
+MAX_GENERATE_COUNT = 100000
+GENERATE_OPTIONS = ('length', 'use_uppercase', 'use_lowercase', 'use_digits',
+                    'use_symbols', 'exclude_ambiguous')
+
+# Generador propio de cada proceso trabajador
+_worker_generator = None
+
+
+class RequestError(Exception):
+    """
+    Petición inválida: se responde con el código y el mensaje indicados
+    """
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _fields(request):
+    fields = request.get('fields') or DEFAULT_FIELDS
+    if not isinstance(fields, list) and fields is not DEFAULT_FIELDS:
+        raise RequestError("'fields' debe ser una lista")
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown:
+        raise RequestError(f"Campos desconocidos: {', '.join(map(str, unknown))}")
+    return tuple(fields)
+
+
+def parse_analyze(request):
+    """
+    Valida {"password": str, "fields": [..]} y devuelve (password, fields)
+    """
+    password = request.get('password')
+    if not isinstance(password, str):
+        raise RequestError("'password' debe ser una cadena")
+    return password, _fields(request)
+
+
+def parse_batch(request):
+    """
+    Valida {"passwords": [str, ...], "fields": [..]}
+    """
+    passwords = request.get('passwords')
+    if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+        raise RequestError("'passwords' debe ser una lista de cadenas")
+    if len(passwords) > MAX_BATCH_SIZE:
+        raise RequestError(f"Máximo {MAX_BATCH_SIZE} contraseñas por lote", status=413)
+    return passwords, _fields(request)
+
+
+def parse_generate(request):
+    """
+    Valida {"count": int, "length": int, "use_symbols": bool, ...}
+    """
+    count = request.get('count', 1)
+    if not isinstance(count, int) or not 1 <= count <= MAX_GENERATE_COUNT:
+        raise RequestError(f"'count' debe estar entre 1 y {MAX_GENERATE_COUNT}")
+    options = {name: request[name] for name in GENERATE_OPTIONS if name in request}
+    length = options.get('length', 12)
+    if not isinstance(length, int) or not 4 <= length <= 1024:
+        raise RequestError("'length' debe estar entre 4 y 1024")
+    return count, options
+
+
+def generate_passwords(count, options):
+    """
+    Genera contraseñas (se ejecuta en el proceso trabajador)
+    """
+    global _worker_generator
+    if _worker_generator is None:
+        from generator import PasswordGenerator
+        _worker_generator = PasswordGenerator()
+    try:
+        return _worker_generator.generate_multiple(count, **options)
+    except ValueError as e:
+        raise RequestError(str(e))
+
+
+class PasswordService:
+    """
+    Atiende peticiones síncronas con un analizador ya inicializado (modo de
+    proceso persistente). Las respuestas tienen la misma forma que las del
+    servicio HTTP
+    """
+    def __init__(self, analyzer, generator=None):
+        self.analyzer = analyzer
+        self._generator = generator
+        self.operations = {
+            'analyze': self.analyze,
+            'batch': self.batch,
+            'generate': self.generate,
+        }
+
+    @property
+    def generator(self):
+        if self._generator is None:
+            from generator import PasswordGenerator
+            self._generator = PasswordGenerator()
+        return self._generator
+
+    def handle(self, request):
+        """
+        Atiende {"op": "analyze" | "batch" | "generate", ...}
+        """
+        if not isinstance(request, dict):
+            raise RequestError("La petición debe ser un objeto JSON")
+        operation = self.operations.get(request.get('op', 'analyze'))
+        if operation is None:
+            raise RequestError(f"Operación desconocida: {request.get('op')}", status=404)
+        return operation(request)
+
+    def analyze(self, request):
+        password, fields = parse_analyze(request)
+        return self.analyzer.analyze_password(password).to_dict(fields)
+
+    def batch(self, request):
+        passwords, fields = parse_batch(request)
+        analyze = self.analyzer.analyze_password
+        return {'results': [analyze(password).to_dict(fields) for password in passwords]}
+
+    def generate(self, request):
+        count, options = parse_generate(request)
+        try:
+            return {'passwords': self.generator.generate_multiple(count, **options)}
+        except ValueError as e:
+            raise RequestError(str(e))
+
+
+def serve_stdio(analyzer, stdin=None, stdout=None):
+    """
+    Bucle JSON-lines: una petición por línea en stdin y una respuesta por
+    línea en stdout, en el mismo orden. El campo "id" de la petición se
+    devuelve tal cual para que el llamante pueda emparejar respuestas:
+
+        {"id": 1, "op": "analyze", "password": "abc"}
+        {"id": 1, "ok": true, "result": {...}}
+    """
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout
+    service = PasswordService(analyzer)
+    for line in stdin:
+        if not line.strip():
+            continue
+        request_id = None
+        try:
+            request = json.loads(line)
+            if isinstance(request, dict):
+                request_id = request.get('id')
+            response = {'id': request_id, 'ok': True, 'result': service.handle(request)}
+        except RequestError as e:
+            response = {'id': request_id, 'ok': False, 'status': e.status, 'error': str(e)}
+        except ValueError:
+            response = {'id': request_id, 'ok': False, 'status': 400,
+                        'error': "La línea no es JSON válido"}
+        stdout.write(json.dumps(response, ensure_ascii=False) + '\n')
+        stdout.flush()
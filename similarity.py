@@ -0,0 +1,241 @@
+"""
+Contraseñas casi iguales entre cuentas ('Verano2023!' y 'Verano2024!')
+sin comparar todas las parejas. Índice de borrados simétrico: cada
+contraseña genera las cadenas que resultan de borrarle hasta 'distance'
+caracteres, y dos contraseñas a esa distancia de edición o menos comparten
+siempre alguna. Las claves se ordenan por bloques en disco, como en
+reuse.py, y solo se compara la distancia real dentro de cada clave, así que
+el coste crece de forma casi lineal con el número de contraseñas
+"""
+
+import heapq
+import mmap
+import tempfile
+from array import array
+from collections import namedtuple
+from itertools import combinations
+
+from dictionary import LEET_TABLE
+from reuse import count_sorted, read_run, write_run
+
+# Una contraseña de un grupo: 'nearest' es su vecina más cercana y 'reference'
+# indica que viene de la lista de filtradas y no de una cuenta
+Member = namedtuple('Member', ['password', 'count', 'nearest', 'distance', 'reference'])
+Cluster = namedtuple('Cluster', ['members', 'accounts', 'breached'])
+
+
+def normalize_variant(password):
+    """
+    Forma que se compara: minúsculas y leetspeak deshecho ('P@ssw0rd' y
+    'password' son la misma variante)
+    """
+    return password.lower().translate(LEET_TABLE)
+
+
+def deletion_keys(text, distance):
+    """
+    Todas las cadenas que salen de borrar hasta 'distance' caracteres,
+    incluida la propia cadena
+    """
+    keys = {text}
+    frontier = keys
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        keys |= frontier
+    return keys
+
+
+def edit_distance(a, b, limit):
+    """
+    Distancia de edición con transposiciones (OSA), o limit + 1 en cuanto
+    se sabe que la supera
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # El prefijo y el sufijo comunes no cuentan
+    shortest = min(len(a), len(b))
+    start = 0
+    while start < shortest and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+    if len(a) <= 1 and len(b) <= 1 or not a or not b:
+        return min(max(len(a), len(b)), limit + 1)
+    if len(a) == len(b) == 2 and a == b[::-1]:
+        return 1
+
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                value = min(value, before[j - 2] + 1)
+            current.append(value)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class SimilarityReport:
+    """
+    Resultado de la búsqueda: contraseñas leídas y distintas, grupos de
+    variantes (de más a menos cuentas) y cuántas contraseñas quedaron fuera
+    por longitud y cuántas claves se recortaron a 'max_bucket'
+    """
+    def __init__(self, total, distinct, clusters, distance, skipped=0, truncated=0):
+        self.total = total
+        self.distinct = distinct
+        self.clusters = clusters
+        self.distance = distance
+        self.skipped = skipped
+        self.truncated = truncated
+
+    def cluster_of(self):
+        """
+        Contraseña (de una cuenta) -> número de grupo, empezando en 1
+        """
+        return {member.password: number
+                for number, cluster in enumerate(self.clusters, 1)
+                for member in cluster.members if not member.reference}
+
+
+class _UnionFind:
+    """
+    Conjuntos disjuntos sobre identificadores 0..n-1 en un array compacto
+    """
+    def __init__(self, size):
+        self.parent = array('I', range(size))
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def _buckets(pairs):
+    """
+    Agrupa los pares ordenados por clave y devuelve los grupos de dos o más
+    """
+    current, bucket = None, []
+    for key, item in pairs:
+        if key != current:
+            if len(bucket) > 1:
+                yield bucket
+            current, bucket = key, []
+        bucket.append(item)
+    if len(bucket) > 1:
+        yield bucket
+
+
+def find_near_duplicates(passwords, distance=1, reference=(), normalize=True, min_length=4,
+                         max_length=32, max_bucket=500, run_size=1000000, directory=None):
+    """
+    Agrupa las contraseñas que están a 'distance' ediciones o menos unas de
+    otras (o de alguna de 'reference', p. ej. una lista de filtradas). Con
+    normalize se comparan en minúsculas y sin leetspeak. Las contraseñas
+    fuera de [min_length, max_length] no se indexan, y en cada clave solo
+    se comparan las 'max_bucket' primeras para acotar el peor caso
+    """
+    directory = directory or tempfile.gettempdir()
+    transform = normalize_variant if normalize else str
+    total = skipped = truncated = 0
+    runs = []
+    with tempfile.TemporaryFile(dir=directory) as storage:
+        # Contraseñas distintas, ordenadas, en un archivo: la i-ésima se lee con mmap
+        offsets = array('Q', [0])
+        counts = array('I')
+        for source in (passwords, reference):
+            for password, count in count_sorted(source, run_size, directory):
+                data = password.encode('utf-8', errors='surrogatepass')
+                storage.write(data)
+                offsets.append(offsets[-1] + len(data))
+                counts.append(count if source is passwords else 0)
+                total += count if source is passwords else 0
+            if source is passwords:
+                accounts = len(counts)
+        storage.flush()
+        size = len(counts)
+        texts = mmap.mmap(storage.fileno(), 0, access=mmap.ACCESS_READ) if offsets[-1] else b''
+
+        def text(i):
+            return texts[offsets[i]:offsets[i + 1]].decode('utf-8', errors='surrogatepass')
+
+        try:
+            pairs = []
+            for i in range(size):
+                variant = transform(text(i))
+                if not min_length <= len(variant) <= max_length:
+                    skipped += counts[i]
+                    continue
+                pairs.extend((key, i) for key in deletion_keys(variant, distance))
+                if len(pairs) >= run_size:
+                    pairs.sort()
+                    runs.append(write_run(pairs, directory))
+                    pairs = []
+            if pairs:
+                pairs.sort()
+                runs.append(write_run(pairs, directory))
+            pairs = None
+
+            groups = _UnionFind(size)
+            # Distancia a la vecina más cercana (255 = ninguna) y cuál es
+            best = bytearray(b'\xff') * size
+            nearest = array('i', [-1]) * size
+
+            def compare(bucket):
+                variants = [(i, transform(text(i))) for i in bucket]
+                for (a, va), (b, vb) in combinations(variants, 2):
+                    if a >= accounts and b >= accounts:
+                        continue
+                    # Ya agrupadas y con una vecina a la menor distancia posible
+                    if best[a] <= 1 and best[b] <= 1 and va != vb and \
+                            groups.find(a) == groups.find(b):
+                        continue
+                    found = edit_distance(va, vb, distance)
+                    if found > distance:
+                        continue
+                    groups.union(a, b)
+                    if found < best[a]:
+                        best[a], nearest[a] = found, b
+                    if found < best[b]:
+                        best[b], nearest[b] = found, a
+
+            for bucket in _buckets(heapq.merge(*(read_run(run) for run in runs))):
+                if len(bucket) > max_bucket:
+                    truncated += 1
+                    bucket = bucket[:max_bucket]
+                compare(bucket)
+
+            members = {}
+            for i in range(size):
+                if best[i] != 255:
+                    members.setdefault(groups.find(i), []).append(
+                        Member(text(i), counts[i], text(nearest[i]), best[i], i >= accounts))
+        finally:
+            for run in runs:
+                run.close()
+            if isinstance(texts, mmap.mmap):
+                texts.close()
+
+    clusters = []
+    for items in members.values():
+        items.sort(key=lambda member: (member.reference, -member.count, member.password))
+        clusters.append(Cluster(items, sum(member.count for member in items),
+                                any(member.reference for member in items)))
+    clusters.sort(key=lambda cluster: (-cluster.accounts, -len(cluster.members),
+                                       cluster.members[0].password))
+    return SimilarityReport(total, accounts, clusters, distance, skipped, truncated)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Snapshot del estado preparado del analizador: patrones compilados en el
+escáner, listas integradas, estimador de intentos con sus tablas de
+teclado y el autómata de diccionario incrustado con su formato de disco.
+Cargarlo es proyectar el archivo con mmap y deserializar un pickle
+pequeño, así que la CLI y cada proceso trabajador arrancan en milisegundos.
+
+Formato: cabecera, metadatos JSON, estado (pickle) y el diccionario
+alineado a 8 bytes. Dos sumas BLAKE2b detectan archivos corruptos (la de
+metadatos y estado se comprueba siempre; la del archivo entero, que incluye
+el diccionario, con verify) y la huella del código y de los archivos de
+origen detecta snapshots obsoletos
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import time
+
+MAGIC = b'PWSNAP\x00\x00'
+VERSION = 1
+# magic, versión, longitud de metadatos y de estado, suma de metadatos+estado y suma total
+HEADER = struct.Struct('<8sIIQ16s32s')
+# Módulos cuyo código determina el estado guardado (además de este)
+CODE_MODULES = ('analyzer', 'scanner', 'guesses', 'dictionary')
+# Atributos que se reconstruyen al cargar en lugar de guardarse en el estado
+EXTERNAL = ('corpus', 'dictionary', 'model', 'cache', 'profiler', 'snapshot_path')
+
+
+class SnapshotError(ValueError):
+    """
+    Snapshot ilegible, corrupto u obsoleto
+    """
+
+
+def code_fingerprint():
+    """
+    Huella del código de los módulos que preparan el estado
+    """
+    import importlib
+    digest = hashlib.blake2b(digest_size=16)
+    paths = [importlib.import_module(name).__file__ for name in CODE_MODULES] + [__file__]
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _file_fingerprint(path):
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def save_snapshot(analyzer, path):
+    """
+    Escribe el snapshot del analizador (el estimador de intentos se
+    construye antes para guardarlo ya preparado)
+    """
+    estimator = copy.copy(analyzer.guess_estimator)
+    estimator.dictionary = None
+    state = analyzer._prepared_state()
+    for name in EXTERNAL:
+        state.pop(name, None)
+    state['_guess_estimator'] = estimator
+    payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Corpus y modelo ya son archivos proyectados: se guarda dónde están. Del
+    # diccionario se copia el autómata, pero se vigila su archivo de origen
+    sources = {}
+    for name in ('corpus', 'model', 'dictionary'):
+        source = getattr(analyzer, name)
+        if source is not None and getattr(source, 'path', None) is not None:
+            sources[name] = _file_fingerprint(source.path)
+        elif source is not None and name != 'dictionary':
+            raise SnapshotError(f"El {name} debe estar en un archivo para guardar el snapshot")
+    meta = json.dumps({
+        'python': list(sys.version_info[:2]),
+        'code': code_fingerprint(),
+        'sources': sources,
+        'dictionary': analyzer.dictionary is not None,
+        'created': time.time(),
+    }).encode('utf-8')
+    meta += b' ' * (-(HEADER.size + len(meta)) % 8)
+    payload += b'\x00' * (-len(payload) % 8)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w+b') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(meta), len(payload), bytes(16), bytes(32)))
+        f.write(meta)
+        f.write(payload)
+        if analyzer.dictionary is not None:
+            analyzer.dictionary.write(f)
+        f.flush()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            state_sum = _state_checksum(view, len(meta), len(payload))
+            content_sum = hashlib.blake2b(view[HEADER.size:], digest_size=32).digest()
+            view.release()
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(meta), len(payload), state_sum, content_sum))
+    os.replace(tmp_path, path)
+
+
+def _state_checksum(view, meta_length, payload_length):
+    end = HEADER.size + meta_length + payload_length
+    return hashlib.blake2b(view[HEADER.size:end], digest_size=16).digest()
+
+
+def load_snapshot(path, cache_size=0, cache_policy='lru', verify=False):
+    """
+    Reconstruye el analizador de un snapshot. Siempre se comprueban la suma
+    de metadatos y estado y la huella del código y de las fuentes; con
+    verify también la suma del archivo entero (lee todo el diccionario, así
+    que se deja para 'snapshot.py check')
+    """
+    from analyzer import PasswordAnalyzer
+    try:
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"No se puede abrir el snapshot {path}: {e}")
+    view = memoryview(mm)
+    try:
+        magic, version, meta_length, payload_length, state_sum, content_sum = \
+            HEADER.unpack_from(view, 0)
+    except struct.error:
+        raise SnapshotError(f"Snapshot truncado: {path}")
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError(f"Formato de snapshot no reconocido: {path}")
+    if _state_checksum(view, meta_length, payload_length) != state_sum or \
+            verify and hashlib.blake2b(view[HEADER.size:], digest_size=32).digest() != content_sum:
+        raise SnapshotError(f"Snapshot corrupto (la suma no coincide): {path}")
+
+    offset = HEADER.size
+    meta = json.loads(bytes(view[offset:offset + meta_length]))
+    offset += meta_length
+    if meta['python'] != list(sys.version_info[:2]) or meta['code'] != code_fingerprint():
+        raise SnapshotError(f"Snapshot obsoleto: el código ha cambiado desde que se generó "
+                            f"({path}); vuelve a generarlo con snapshot.py build")
+    for name, (source, size, mtime_ns) in meta['sources'].items():
+        try:
+            current = _file_fingerprint(source)
+        except OSError:
+            raise SnapshotError(f"Falta el {name} del snapshot: {source}")
+        if current[1:] != [size, mtime_ns]:
+            raise SnapshotError(f"Snapshot obsoleto: {source} ha cambiado; vuelve a generarlo")
+
+    state = pickle.loads(view[offset:offset + payload_length])
+    offset += payload_length
+    analyzer = PasswordAnalyzer.__new__(PasswordAnalyzer)
+    analyzer.__dict__.update(state)
+
+    analyzer.dictionary = None
+    if meta['dictionary']:
+        from dictionary import DictionaryMatcher
+        analyzer.dictionary = DictionaryMatcher.from_buffer(view[offset:], source=path)
+    analyzer._guess_estimator.dictionary = analyzer.dictionary
+    analyzer.corpus = analyzer.model = None
+    if 'corpus' in meta['sources']:
+        from corpus import BreachCorpus
+        analyzer.corpus = BreachCorpus(meta['sources']['corpus'][0])
+    if 'model' in meta['sources']:
+        from markov import PasswordModel
+        analyzer.model = PasswordModel.load(meta['sources']['model'][0])
+    analyzer.cache = None
+    if cache_size:
+        from cache import ResultCache
+        analyzer.cache = ResultCache(cache_size, cache_policy)
+    analyzer.profiler = None
+    analyzer.snapshot_path = path
+    return analyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Snapshot del analizador para arranque rápido')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='Generar un snapshot')
+    build.add_argument('output', help='Archivo de snapshot a generar')
+    build.add_argument('--corpus', metavar='ARCHIVO')
+    build.add_argument('--dictionary', metavar='ARCHIVO')
+    build.add_argument('--model', metavar='ARCHIVO')
+
+    check = subparsers.add_parser('check', help='Comprobar un snapshot y medir su carga')
+    check.add_argument('snapshot', help='Archivo de snapshot')
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        from analyzer import PasswordAnalyzer
+        analyzer = PasswordAnalyzer(corpus=args.corpus, dictionary=args.dictionary,
+                                    model=args.model)
+        save_snapshot(analyzer, args.output)
+        print(f"Snapshot generado: {args.output} ({os.path.getsize(args.output):,} bytes)")
+    else:
+        start = time.perf_counter()
+        try:
+            load_snapshot(args.snapshot, verify=True)
+        except SnapshotError as e:
+            sys.exit(f"❌ {e}")
+        print(f"{args.snapshot}: válido, cargado en "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
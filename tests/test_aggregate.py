@@ -0,0 +1,81 @@
+import json
+import random
+import unittest
+
+from aggregate import AggregateError, AuditAggregate
+from analyzer import PasswordAnalyzer
+
+
+def _shard(analyses):
+    aggregate = AuditAggregate()
+    for analysis in analyses:
+        aggregate.add(analysis)
+    return aggregate
+
+
+def _counts(aggregate):
+    # Todo salvo el número de fragmentos combinados
+    data = aggregate.to_dict()
+    del data['shards']
+    return data
+
+
+class MergeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rnd = random.Random(9)
+        analyzer = PasswordAnalyzer()
+        passwords = ['password', 'Password1', '123456', 'qwerty', 'Tr0ub4dor&3', 'ñandú', 'a']
+        passwords += [''.join(rnd.choice('abcXYZ019!@ ') for _ in range(rnd.randint(1, 20)))
+                      for _ in range(150)]
+        cls.analyses = [analyzer.analyze_password(p) for p in passwords]
+        cls.full = _shard(cls.analyses)
+
+    def _random_shards(self, rnd):
+        cuts = sorted(rnd.sample(range(1, len(self.analyses)), rnd.randint(1, 8)))
+        bounds = [0] + cuts + [len(self.analyses)]
+        return [_shard(self.analyses[a:b]) for a, b in zip(bounds, bounds[1:])]
+
+    def test_any_split_and_order_gives_the_same_aggregate(self):
+        rnd = random.Random(4)
+        for _ in range(20):
+            shards = self._random_shards(rnd)
+            rnd.shuffle(shards)
+            merged = AuditAggregate.merged(shards)
+            self.assertEqual(_counts(merged), _counts(self.full))
+            self.assertEqual(merged.shards, len(shards))
+            self.assertEqual(merged.length_quantiles(), self.full.length_quantiles())
+            self.assertEqual(merged.entropy_quantiles(), self.full.entropy_quantiles())
+
+    def test_merge_is_associative_and_commutative(self):
+        rnd = random.Random(6)
+        for _ in range(10):
+            a, b, c = (_shard(rnd.sample(self.analyses, rnd.randint(0, 40))) for _ in range(3))
+            left = AuditAggregate.merged([AuditAggregate.merged([a, b]), c])
+            right = AuditAggregate.merged([a, AuditAggregate.merged([b, c])])
+            swapped = AuditAggregate.merged([c, b, a])
+            self.assertEqual(left.to_dict(), right.to_dict())
+            self.assertEqual(left.to_dict(), swapped.to_dict())
+
+    def test_empty_aggregate_is_neutral(self):
+        merged = AuditAggregate.merged([AuditAggregate(), self.full, AuditAggregate()])
+        self.assertEqual(_counts(merged), _counts(self.full))
+
+    def test_json_round_trip_merges_the_same(self):
+        rnd = random.Random(2)
+        shards = self._random_shards(rnd)
+        restored = [AuditAggregate.from_dict(json.loads(json.dumps(shard.to_dict())))
+                    for shard in shards]
+        self.assertEqual(AuditAggregate.merged(restored).to_dict(),
+                         AuditAggregate.merged(shards).to_dict())
+
+    def test_rejects_other_documents(self):
+        data = self.full.to_dict()
+        with self.assertRaises(AggregateError):
+            AuditAggregate.from_dict(dict(data, kind='otro'))
+        with self.assertRaises(AggregateError):
+            AuditAggregate.from_dict(dict(data, version=99))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import unittest
+
+from analyzer import PasswordAnalyzer
+from cache import ResultCache
+
+
+class _ReferenceCache:
+    """
+    Modelo directo de las políticas: se expulsa la entrada con menor
+    (último uso) en LRU y con menor (apariciones, llegada a ese recuento) en LFU
+    """
+    def __init__(self, maxsize, policy):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.entries = {}  # clave -> [valor, apariciones, instante]
+        self.clock = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.clock += 1
+        entry[1] += 1
+        entry[2] = self.clock
+        return entry[0]
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.entries[key][0] = value
+            return
+        if len(self.entries) >= self.maxsize:
+            if self.policy == 'lru':
+                victim = min(self.entries, key=lambda k: self.entries[k][2])
+            else:
+                victim = min(self.entries, key=lambda k: self.entries[k][1:])
+            del self.entries[victim]
+        self.clock += 1
+        self.entries[key] = [value, 1, self.clock]
+
+
+class EvictionTest(unittest.TestCase):
+    def test_policies_match_reference(self):
+        rnd = random.Random(11)
+        for policy in ('lru', 'lfu'):
+            for maxsize in (1, 2, 5, 17):
+                cache = ResultCache(maxsize, policy)
+                reference = _ReferenceCache(maxsize, policy)
+                evictions = 0
+                for step in range(3000):
+                    key = bytes([rnd.randrange(40)])
+                    if rnd.random() < 0.6:
+                        self.assertEqual(cache.get(key), reference.get(key), (policy, step))
+                    else:
+                        if key not in reference.entries and len(reference.entries) >= maxsize:
+                            evictions += 1
+                        cache.put(key, step)
+                        reference.put(key, step)
+                    self.assertEqual(set(cache._entries), set(reference.entries))
+                info = cache.info()
+                self.assertEqual(info.currsize, len(reference.entries))
+                self.assertLessEqual(info.currsize, maxsize)
+                self.assertEqual(info.evictions, evictions)
+
+    def test_lfu_keeps_frequent_entries(self):
+        cache = ResultCache(2, 'lfu')
+        cache.put(b'a', 1)
+        cache.put(b'b', 2)
+        cache.get(b'a')
+        cache.put(b'c', 3)
+        self.assertEqual(cache.get(b'a'), 1)
+        self.assertIsNone(cache.get(b'b'))
+
+    def test_cached_analysis_is_unchanged(self):
+        plain = PasswordAnalyzer()
+        cached = PasswordAnalyzer(cache_size=3, cache_policy='lfu')
+        passwords = ['password', 'Tr0ub4dor&3', 'password', 'qwerty', 'hola', 'password',
+                     'Tr0ub4dor&3', 'ñandú', 'qwerty']
+        for password in passwords:
+            self.assertEqual(cached.analyze_password(password).to_dict(),
+                             plain.analyze_password(password).to_dict())
+        self.assertGreater(cached.cache_info().hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
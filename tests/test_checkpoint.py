@@ -0,0 +1,94 @@
+import contextlib
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import bulk
+from checkpoint import Checkpoint, CheckpointError
+from main import PasswordTool
+
+OUTPUT = {'format': 'csv', 'out': None, 'columns': list(bulk.DEFAULT_COLUMNS),
+          'plaintext': 'show'}
+
+
+class _Interrupted(Exception):
+    pass
+
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = [os.path.join(self.directory, 'a.txt'),
+                      os.path.join(self.directory, 'b.txt.gz')]
+        with open(self.paths[0], 'w', encoding='utf-8') as f:
+            f.write(''.join(f'clave{i}\n\n' if i % 5 else f'Ñandú{i}!\r\n' for i in range(53)))
+        with gzip.open(self.paths[1], 'wt', encoding='utf-8') as f:
+            f.write(''.join(f'Verano{i}#\n' for i in range(41)))
+        self.tool = PasswordTool()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _run(self, out, checkpoint=None, fail_after=None):
+        truncate_at = checkpoint.output_offset(dict(OUTPUT, out=out)) if checkpoint else None
+        with bulk.open_writer('csv', out, truncate_at=truncate_at, flush_every=3) as writer:
+            if fail_after is not None:
+                write = writer.write
+
+                def failing(analysis):
+                    if writer.rows >= fail_after:
+                        raise _Interrupted()
+                    write(analysis)
+                writer.write = failing
+            with contextlib.redirect_stderr(io.StringIO()):
+                self.tool.stream_analysis(self.paths, writer=writer, checkpoint=checkpoint,
+                                          output=dict(OUTPUT, out=out))
+
+    def _read(self, path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_resume_gives_same_output(self):
+        full = os.path.join(self.directory, 'full.csv')
+        self._run(full)
+        for fail_after in (0, 6, 52, 60, 93):
+            out = os.path.join(self.directory, f'resumed{fail_after}.csv')
+            state = os.path.join(self.directory, f'estado{fail_after}.json')
+            with self.assertRaises(_Interrupted):
+                self._run(out, Checkpoint(state, self.paths, every=7), fail_after=fail_after)
+            checkpoint = Checkpoint(state, self.paths, every=7)
+            if checkpoint.load() is not None:
+                self.assertEqual(checkpoint.state['lines'] % 7, 0)
+                self.assertLessEqual(checkpoint.state['lines'], fail_after)
+            self._run(out, checkpoint)
+            self.assertEqual(self._read(out), self._read(full), fail_after)
+            self.assertFalse(os.path.exists(state))
+
+    def test_changed_input_is_rejected(self):
+        state = os.path.join(self.directory, 'estado.json')
+        out = os.path.join(self.directory, 'out.csv')
+        with self.assertRaises(_Interrupted):
+            self._run(out, Checkpoint(state, self.paths, every=7), fail_after=20)
+        with self.assertRaises(CheckpointError):
+            Checkpoint(state, self.paths[::-1]).load()
+        with open(self.paths[1], 'ab') as f:
+            f.write(b'x')
+        with self.assertRaises(CheckpointError):
+            Checkpoint(state, self.paths).load()
+
+    def test_other_output_is_rejected(self):
+        state = os.path.join(self.directory, 'estado.json')
+        out = os.path.join(self.directory, 'out.csv')
+        with self.assertRaises(_Interrupted):
+            self._run(out, Checkpoint(state, self.paths, every=7), fail_after=20)
+        checkpoint = Checkpoint(state, self.paths)
+        checkpoint.load()
+        with self.assertRaises(CheckpointError):
+            checkpoint.output_offset(dict(OUTPUT, out=out, format='jsonl'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import itertools
+import random
+import string
+import unittest
+
+from analyzer import PasswordAnalyzer
+from constrained import ConstrainedSpace
+from dictionary import DictionaryMatcher
+from generator import PasswordGenerator
+
+SMALL_CLASSES = {'lowercase': 'abc', 'uppercase': 'AB', 'digits': '01', 'symbols': '!'}
+
+
+def _brute_force(classes, required, min_classes, banned, max_repeat, length):
+    """
+    Contraseñas válidas de esa longitud enumerando todo el alfabeto
+    """
+    valid = set()
+    for chars in itertools.product(''.join(classes.values()), repeat=length):
+        password = ''.join(chars)
+        lower = password.lower()
+        if any(word.lower() in lower for word in banned):
+            continue
+        if max_repeat and any(lower[i:i + max_repeat + 1] == lower[i] * (max_repeat + 1)
+                              for i in range(len(lower) - max_repeat)):
+            continue
+        used = {name for name, group in classes.items() if any(c in group for c in password)}
+        if not set(required) <= used or len(used) < min_classes:
+            continue
+        valid.add(password)
+    return valid
+
+
+class UnrankTest(unittest.TestCase):
+    def test_unrank_is_a_bijection(self):
+        rnd = random.Random(5)
+        for _ in range(15):
+            banned = [''.join(rnd.choice('abc01!') for _ in range(rnd.randint(1, 3)))
+                      for _ in range(rnd.randint(0, 6))]
+            required = tuple(name for name in SMALL_CLASSES if rnd.random() < 0.3)
+            min_classes = rnd.randint(0, 3)
+            max_repeat = rnd.choice([None, 1, 2])
+            space = ConstrainedSpace(SMALL_CLASSES, required, min_classes, banned, max_repeat)
+            for length in range(5):
+                got = [space.unrank(length, rank) for rank in range(space.count(length))]
+                self.assertEqual(len(got), len(set(got)))
+                self.assertEqual(set(got), _brute_force(SMALL_CLASSES, required, min_classes,
+                                                        banned, max_repeat, length))
+
+    def test_rank_out_of_range(self):
+        space = ConstrainedSpace(SMALL_CLASSES)
+        with self.assertRaises(ValueError):
+            space.unrank(3, space.count(3))
+
+
+class DictionaryScoreTest(unittest.TestCase):
+    def test_samples_reach_min_score_with_dictionary(self):
+        rnd = random.Random(1)
+        words = [''.join(rnd.choice(string.ascii_lowercase) for _ in range(4)) for _ in range(500)]
+        words += ['love', 'casa', 'perro', 'gato', 'hola', 'amor', 'lola', 'sol1', 'rosa']
+        analyzer = PasswordAnalyzer(dictionary=DictionaryMatcher.build({'custom': words}))
+        space = PasswordGenerator().constrained(min_score=90, analyzer=analyzer)
+        for password in space.generate_batch(500):
+            self.assertGreaterEqual(analyzer.analyze_password(password)['score'], 90, password)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+
+from analyzer import PasswordAnalyzer
+from corpus import BreachCorpus, build_corpus
+
+
+class CorpusCommonTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        source = os.path.join(self.directory, 'filtradas.txt')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write('Summer\nmonkey\nDragon2020\n')
+        self.path = os.path.join(self.directory, 'corpus.bin')
+        build_corpus([source], self.path, plaintext=True)
+        self.corpus = BreachCorpus(self.path)
+        self.analyzer = PasswordAnalyzer(corpus=self.corpus)
+
+    def tearDown(self):
+        self.corpus.close()
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_exact_password_and_trailing_digits(self):
+        for password in ['Summer', 'Summer2024', 'monkey', 'monkey1', 'Dragon2020']:
+            self.assertTrue(self.analyzer._is_common_password(password), password)
+
+    def test_case_is_preserved(self):
+        # El corpus guarda el hash de la contraseña tal cual
+        for password in ['summer', 'summer2024', 'MONKEY', 'dragon2020']:
+            self.assertFalse(self.analyzer._is_common_password(password), password)
+
+
+if __name__ == '__main__':
+    unittest.main()
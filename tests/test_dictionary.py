@@ -0,0 +1,90 @@
+import os
+import random
+import tempfile
+import unittest
+
+from dictionary import DictionaryMatcher, _variants
+
+
+def _brute_force(matcher, password):
+    """
+    Coincidencias buscando cada subcadena de cada variante en el conjunto
+    de palabras
+    """
+    ids = {matcher.word(word_id): word_id for word_id in range(len(matcher))}
+    found = set()
+    for text in _variants(password):
+        for start in range(len(text)):
+            for end in range(start + 1, len(text) + 1):
+                if text[start:end] in ids:
+                    found.add((start, end, ids[text[start:end]]))
+    return sorted(found)
+
+
+def _quadratic_maximal(matcher, matches):
+    """
+    Definición directa: se descarta la coincidencia contenida en otra distinta
+    """
+    words = []
+    for start, end, word_id in matches:
+        if any(s <= start and end <= e and (s, e) != (start, end) for s, e, _ in matches):
+            continue
+        word = matcher.word(word_id)
+        if word not in words:
+            words.append(word)
+    return words
+
+
+class MatcherTest(unittest.TestCase):
+    def setUp(self):
+        rnd = random.Random(3)
+        # Alfabeto pequeño para que haya muchos solapamientos y prefijos comunes
+        self.wordlists = {
+            'a': [''.join(rnd.choice('abeilost') for _ in range(rnd.randint(3, 7)))
+                  for _ in range(300)],
+            'b': ['lola', 'ilusion', 'sol', 'best', 'bestia', 'tiesto'],
+        }
+        self.matcher = DictionaryMatcher.build(self.wordlists, min_length=3)
+        self.passwords = [''.join(rnd.choice('abeilostABE4310!|$7+x')
+                                  for _ in range(rnd.randint(0, 20)))
+                          for _ in range(300)]
+        self.passwords += ['', 'b3st14', 'L0L4sol', '1|us10n', 'TIESTO!!']
+
+    def test_matches_equal_brute_force(self):
+        for password in self.passwords:
+            self.assertEqual(self.matcher.matches(password),
+                             _brute_force(self.matcher, password), password)
+
+    def test_words_are_unique_and_long_enough(self):
+        words = [self.matcher.word(word_id) for word_id in range(len(self.matcher))]
+        self.assertEqual(len(words), len(set(words)))
+        self.assertTrue(all(len(word) >= 3 for word in words))
+
+    def test_maximal_words_match_definition(self):
+        rnd = random.Random(7)
+        for password in self.passwords:
+            matches = self.matcher.matches(password)
+            self.assertEqual(self.matcher.maximal_words(matches),
+                             _quadratic_maximal(self.matcher, matches), password)
+        # Tramos arbitrarios, con repetidos y mismos extremos
+        for _ in range(200):
+            matches = sorted((start, start + rnd.randint(1, 6), rnd.randrange(len(self.matcher)))
+                             for start in (rnd.randint(0, 12) for _ in range(rnd.randint(0, 25))))
+            self.assertEqual(self.matcher.maximal_words(matches),
+                             _quadratic_maximal(self.matcher, matches))
+
+    def test_loaded_matcher_is_equivalent(self):
+        fd, path = tempfile.mkstemp(suffix='.dict')
+        os.close(fd)
+        try:
+            self.matcher.save(path)
+            loaded = DictionaryMatcher.load(path)
+            for password in self.passwords:
+                self.assertEqual(loaded.matches(password), self.matcher.matches(password))
+            del loaded
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
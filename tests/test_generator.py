@@ -0,0 +1,61 @@
+import unittest
+from collections import Counter
+from unittest import mock
+
+from generator import AMBIGUOUS, PasswordGenerator, SecureCharStream, SecureIndexStream
+
+# Cada valor de byte exactamente una vez por bloque
+ALL_BYTES = bytes(range(256))
+
+
+class RejectionSamplingTest(unittest.TestCase):
+    def test_char_stream_is_unbiased(self):
+        for alphabet in ['a', 'ab', 'abc', 'abcdefghij', ''.join(map(chr, range(33, 127)))]:
+            with mock.patch('generator.secrets.token_bytes', lambda n: ALL_BYTES * (n // 256 + 1)):
+                stream = SecureCharStream(alphabet, block_size=256)
+                size = len(alphabet)
+                accepted = 256 - 256 % size
+                # Los bytes aceptados de un bloque reparten cada carácter por igual
+                counts = Counter(stream.take(accepted))
+            self.assertEqual(set(counts), set(alphabet))
+            self.assertEqual(set(counts.values()), {accepted // size}, alphabet)
+
+    def test_char_stream_rejects_alphabet_out_of_range(self):
+        for alphabet in ['', 'ñ', 'a' * 257]:
+            with self.assertRaises(ValueError):
+                SecureCharStream(alphabet)
+
+    def test_index_stream_is_unbiased(self):
+        for n in [1, 2, 3, 7, 10, 100, 255, 256]:
+            with mock.patch('generator.secrets.token_bytes', lambda size: ALL_BYTES):
+                stream = SecureIndexStream(block_size=256)
+                accepted = 256 - 256 % n
+                counts = Counter(stream.below(n) for _ in range(accepted))
+            self.assertEqual(set(counts), set(range(n)))
+            self.assertEqual(set(counts.values()), {accepted // n}, n)
+
+
+class BatchTest(unittest.TestCase):
+    def test_batch_respects_options(self):
+        generator = PasswordGenerator()
+        cases = [dict(length=4), dict(length=16, exclude_ambiguous=True),
+                 dict(length=8, use_symbols=False), dict(length=6, use_uppercase=False,
+                                                        use_digits=False)]
+        for options in cases:
+            classes = [chars for name, chars in [('use_lowercase', generator.lowercase),
+                                                 ('use_uppercase', generator.uppercase),
+                                                 ('use_digits', generator.digits),
+                                                 ('use_symbols', generator.symbols)]
+                       if options.get(name, True)]
+            if options.get('exclude_ambiguous'):
+                classes = [''.join(c for c in chars if c not in AMBIGUOUS) for chars in classes]
+            alphabet = set(''.join(classes))
+            for password in generator.generate_batch(500, **options):
+                self.assertEqual(len(password), options['length'])
+                self.assertLessEqual(set(password), alphabet)
+                for chars in classes:
+                    self.assertTrue(any(c in chars for c in password), (password, chars))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import time
+import unittest
+
+from guesses import GuessEstimator
+
+# Repeticiones largas: muchas coincidencias cortas que se encadenan
+WORST_CASES = ['ab' * 32, '7' * 64, 'ab' * 64, '01' * 32, '2020' * 16, '1234' * 16]
+
+
+class GuessLatencyTest(unittest.TestCase):
+    def test_worst_cases_stay_bounded(self):
+        estimator = GuessEstimator()
+        for password in WORST_CASES:
+            # Mejor de tres para no depender de la carga de la máquina
+            best = float('inf')
+            for _ in range(3):
+                start = time.perf_counter()
+                estimator.estimate(password)
+                best = min(best, time.perf_counter() - start)
+            self.assertLess(best, 0.025, password)
+
+    def test_bounds_keep_the_estimate(self):
+        bounded = GuessEstimator()
+        exhaustive = GuessEstimator(max_sequence_lengths=64)
+        for password in WORST_CASES + ['Tr0ub4dor&3', 'abc1990zxcv1234pass', '01011990!!']:
+            self.assertEqual(bounded.estimate(password), exhaustive.estimate(password))
+
+
+if __name__ == '__main__':
+    unittest.main()
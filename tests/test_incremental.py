@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from analyzer import PasswordAnalyzer
+from dictionary import DictionaryMatcher
+from incremental import AnalysisSession
+
+# Letras de las palabras, leetspeak, dígitos de fechas y Unicode irregular
+ALPHABET = 'abdegilnorstuvAEIOSX0134579!|@$ _-İΣñ'
+
+
+class SessionTest(unittest.TestCase):
+    def _fuzz(self, analyzer, seed, steps=250):
+        rnd = random.Random(seed)
+        session = AnalysisSession(analyzer)
+        for step in range(steps):
+            n = len(session)
+            action = rnd.random()
+            if action < 0.45 or not n:
+                session.append(''.join(rnd.choice(ALPHABET) for _ in range(rnd.randint(1, 3))))
+            elif action < 0.65:
+                session.delete(-1)
+            else:
+                start = rnd.randint(0, n)
+                stop = rnd.randint(start, min(n, start + 4))
+                session.replace(start, stop, ''.join(rnd.choice(ALPHABET)
+                                                     for _ in range(rnd.randint(0, 4))))
+            if len(session) > 40:
+                session.delete(0, rnd.randint(1, 20))
+            self.assertEqual(session.result().to_dict(),
+                             analyzer.analyze_password(session.text).to_dict(), (seed, step))
+
+    def test_matches_full_analysis(self):
+        self._fuzz(PasswordAnalyzer(), 1)
+
+    def test_matches_full_analysis_with_dictionary(self):
+        dictionary = DictionaryMatcher.build({
+            'custom': ['dragon', 'verano', 'lola', 'solo', 'sol', 'ilusion', 'lavado', 'tres',
+                       'trestres', 'verde', 'aver', 'rover', 'love', 'dios', 'sole'],
+        }, min_length=3)
+        analyzer = PasswordAnalyzer(dictionary=dictionary)
+        for seed in range(2, 6):
+            self._fuzz(analyzer, seed)
+
+    def test_words_in_order_of_appearance(self):
+        dictionary = DictionaryMatcher.build({'custom': ['verano', 'dragon', 'rana']})
+        session = AnalysisSession(PasswordAnalyzer(dictionary=dictionary), 'dr4g0nverano')
+        self.assertEqual(session.result()['dictionary_words'], ['dragon', 'verano'])
+        session.replace(0, 0, 'verano')
+        self.assertEqual(session.result()['dictionary_words'], ['verano', 'dragon'])
+        session.replace(6, 12, '')
+        self.assertEqual(session.result()['dictionary_words'], ['verano'])
+
+
+if __name__ == '__main__':
+    unittest.main()
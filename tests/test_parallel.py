@@ -0,0 +1,22 @@
+import unittest
+
+from analyzer import PasswordAnalyzer
+from parallel import analyze_parallel
+
+PASSWORDS = ['password123', 'Tr0ub4dor&3', 'correcthorsebatterystaple', 'qwerty',
+             '', 'ñandú2024!', 'abc1990zxcv1234pass', 'Xk9#mQ2$vL7@']
+
+
+class PartialFieldsTest(unittest.TestCase):
+    def test_parallel_matches_serial_with_partial_fields(self):
+        analyzer = PasswordAnalyzer()
+        for fields in [('guesses',), ('guesses_log10',), ('score', 'guesses')]:
+            serial = [analyzer.analyze_password(p).to_dict() for p in PASSWORDS]
+            parallel = [result.to_dict() for result in
+                        analyze_parallel(analyzer, PASSWORDS, workers=2, chunksize=3,
+                                         fields=fields)]
+            self.assertEqual(parallel, serial, fields)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+
+import reuse
+
+
+class ReuseRunsTest(unittest.TestCase):
+    def test_control_characters_survive_runs(self):
+        passwords = ['a\rb', 'x', 'x', 'tab\there', 'a\rb', 'línea\nrota', 'x']
+        # run_size=1 obliga a volcar y mezclar varios bloques en disco
+        report = reuse.top_reused_exact(passwords, top=5, run_size=1)
+        self.assertEqual(report.total, 7)
+        self.assertEqual(report.distinct, 4)
+        self.assertEqual([(entry.password, entry.count) for entry in report.top],
+                         [('x', 3), ('a\rb', 2), ('línea\nrota', 1), ('tab\there', 1)])
+
+    def test_run_round_trip(self):
+        pairs = sorted([('a\rb', 1), ('\t', 2), ('\ud800', 3), ('', 4), ('ñ' * 300, 2 ** 40)])
+        with reuse.write_run(pairs) as run:
+            self.assertEqual(list(reuse.read_run(run)), pairs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,17 @@
+import unittest
+
+from similarity import find_near_duplicates
+
+
+class NearDuplicatesTest(unittest.TestCase):
+    def test_control_characters_survive_runs(self):
+        passwords = ['abc\rdef', 'abc\rdeg', 'tab\tpass1', 'tab\tpass2', 'solitaria']
+        # run_size=1 obliga a volcar y mezclar varios bloques de claves en disco
+        report = find_near_duplicates(passwords, distance=1, run_size=1)
+        groups = sorted(sorted(member.password for member in cluster.members)
+                        for cluster in report.clusters)
+        self.assertEqual(groups, [['abc\rdef', 'abc\rdeg'], ['tab\tpass1', 'tab\tpass2']])
+
+
+if __name__ == '__main__':
+    unittest.main()
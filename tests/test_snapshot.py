@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import snapshot
+from analyzer import PasswordAnalyzer
+from dictionary import DictionaryMatcher
+from snapshot import SnapshotError, load_snapshot, save_snapshot
+
+PASSWORDS = ['password', 'Tr0ub4dor&3', 'dr4g0nVerano2024', 'qwerty123', 'ñandú', '']
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.dictionary_path = os.path.join(self.directory, 'palabras.dict')
+        DictionaryMatcher.build({'custom': ['dragon', 'verano', 'monkey']}).save(
+            self.dictionary_path)
+        self.analyzer = PasswordAnalyzer(dictionary=DictionaryMatcher.load(self.dictionary_path))
+        self.path = os.path.join(self.directory, 'estado.snap')
+        save_snapshot(self.analyzer, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _flip(self, position):
+        with open(self.path, 'r+b') as f:
+            f.seek(position)
+            byte = f.read(1)
+            f.seek(position)
+            f.write(bytes([byte[0] ^ 0xFF]))
+
+    def test_round_trip(self):
+        loaded = load_snapshot(self.path, verify=True)
+        for password in PASSWORDS:
+            self.assertEqual(loaded.analyze_password(password).to_dict(),
+                             self.analyzer.analyze_password(password).to_dict())
+
+    def test_corrupt_state_is_always_detected(self):
+        # Primer byte de los metadatos, justo después de la cabecera
+        self._flip(snapshot.HEADER.size)
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.path)
+
+    def test_corrupt_dictionary_needs_verify(self):
+        # El último byte pertenece al texto de las palabras del diccionario
+        self._flip(os.path.getsize(self.path) - 1)
+        load_snapshot(self.path)
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.path, verify=True)
+
+    def test_truncated_and_foreign_files(self):
+        with open(self.path, 'r+b') as f:
+            f.truncate(10)
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.path)
+        with open(self.path, 'wb') as f:
+            f.write(b'\x00' * 200)
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.path)
+        with self.assertRaises(SnapshotError):
+            load_snapshot(os.path.join(self.directory, 'no-existe.snap'))
+
+    def test_changed_source_is_stale(self):
+        stat = os.stat(self.dictionary_path)
+        os.utime(self.dictionary_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.path)
+        os.remove(self.dictionary_path)
+        with self.assertRaises(SnapshotError):
+            load_snapshot(self.path)
+
+    def test_changed_code_is_stale(self):
+        with mock.patch('snapshot.code_fingerprint', return_value='0' * 32):
+            with self.assertRaises(SnapshotError):
+                load_snapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
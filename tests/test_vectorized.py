@@ -0,0 +1,32 @@
+import unittest
+
+from analyzer import PasswordAnalyzer
+from dictionary import DictionaryMatcher
+import vectorized
+
+# Vacía, no ASCII, más larga que max_width, comunes y llenas de patrones
+BATCH = ['', 'ñandú', 'contraseña€2024', '密码password', 'Ünïcødé!9',
+         'x' * 65, 'Aa1!' * 20, 'password', 'Password1', '123456', 'qwerty123',
+         'admin2024', 'abc123', 'qwertyuiop', 'aaaaaaa', 'abcdefgh', '01011990',
+         'asdf1234!!', 'P@ssw0rd', '1q2w3e4r', 'Tr0ub4dor&3', 'Xk9#mQ2$vL7@',
+         'correcthorsebatterystaple', 'zzzz1111####', 'dragon1990']
+
+
+@unittest.skipUnless(vectorized.HAS_NUMPY, "Necesita NumPy")
+class VectorizedParityTest(unittest.TestCase):
+    def test_mixed_batch(self):
+        self.assertEqual(vectorized.check_parity(PasswordAnalyzer(), BATCH), [])
+
+    def test_max_width(self):
+        analyzer = PasswordAnalyzer()
+        self.assertEqual(vectorized.check_parity(analyzer, BATCH, max_width=8), [])
+
+    def test_dictionary(self):
+        dictionary = DictionaryMatcher.build({'custom': ['dragon', 'monkey', 'verano', 'casa']})
+        analyzer = PasswordAnalyzer(dictionary=dictionary)
+        batch = BATCH + ['dr4g0n!!', 'M0nk3y2024', 'veranoCasa', 'v3r4n0']
+        self.assertEqual(vectorized.check_parity(analyzer, batch), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,259 @@
+"""
+Análisis por lotes vectorizado con NumPy (opcional). Reproduce la semántica
+de PasswordAnalyzer.analyze_password en forma de columnas: la clasificación
+de caracteres, la entropía, los patrones literales, la puntuación y los
+niveles se calculan con operaciones sobre arrays, y solo las filas que lo
+necesitan (Unicode, longitudes extremas, patrones personalizados) pasan por
+el analizador escalar
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from scanner import CHARSET_LOG2
+
+HAS_NUMPY = np is not None
+
+# Columnas devueltas por analyze_batch
+COLUMNS = ('password', 'length', 'lowercase', 'uppercase', 'digits', 'symbols',
+           'charset_count', 'entropy', 'pattern_count', 'is_common', 'breach_count',
+           'score', 'strength', 'crack_time')
+
+STRENGTH_THRESHOLDS = (30, 50, 70, 85)
+STRENGTH_LEVELS = ("Muy Débil", "Débil", "Moderada", "Fuerte", "Muy Fuerte")
+CRACK_TIME_THRESHOLDS = (30, 40, 50, 60, 70, 80)
+CRACK_TIME_LEVELS = ("Menos de 1 segundo", "Menos de 1 minuto", "Menos de 1 hora",
+                     "Menos de 1 día", "Menos de 1 año", "Miles de años", "Millones de años")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("El análisis vectorizado necesita NumPy: pip install numpy")
+
+
+def _encode(passwords, width):
+    """
+    Codifica el lote como matriz uint32 de ancho fijo (relleno con ceros) y
+    devuelve también la longitud que ve NumPy (sin los NUL finales)
+    """
+    encoded = np.array(passwords, dtype=f'<U{width}')
+    matrix = encoded.view(np.uint32).reshape(len(passwords), width).copy()
+    return matrix, np.char.str_len(encoded)
+
+
+def _contains(matrix, token):
+    """
+    Filas cuyo texto contiene el literal (comparando ventanas desplazadas)
+    """
+    width = matrix.shape[1]
+    k = len(token)
+    if k > width:
+        return np.zeros(matrix.shape[0], dtype=bool)
+    hit = matrix[:, 0:width - k + 1] == ord(token[0])
+    for offset in range(1, k):
+        hit &= matrix[:, offset:width - k + 1 + offset] == ord(token[offset])
+    return hit.any(axis=1)
+
+
+def _pattern_counts(scanner, lower):
+    """
+    Número de patrones débiles por fila, con la misma cuenta que
+    scanner.detect_patterns (filas ASCII ya pasadas a minúsculas)
+    """
+    n, width = lower.shape
+    label_hits = {}
+
+    for token, labels in scanner.tokens.items():
+        hit = _contains(lower, token)
+        for label in labels:
+            label_hits[label] = hit
+
+    # (19|20)\d\d
+    if width >= 4:
+        is_digit = (lower >= 48) & (lower <= 57)
+        century = (((lower[:, :-3] == 49) & (lower[:, 1:-2] == 57)) |
+                   ((lower[:, :-3] == 50) & (lower[:, 1:-2] == 48)))
+        label_hits['date_pattern'] = (century & is_digit[:, 2:-1] & is_digit[:, 3:]).any(axis=1)
+    else:
+        label_hits['date_pattern'] = np.zeros(n, dtype=bool)
+
+    # (\w)\1{2,} sobre ASCII: [a-z0-9_]
+    if scanner.repeat_labels:
+        if width >= 3:
+            word = (((lower >= 97) & (lower <= 122)) | ((lower >= 48) & (lower <= 57)) |
+                    (lower == 95))
+            repeated = ((lower[:, :-2] == lower[:, 1:-1]) & (lower[:, 1:-1] == lower[:, 2:]) &
+                        word[:, :-2]).any(axis=1)
+        else:
+            repeated = np.zeros(n, dtype=bool)
+        for label in scanner.repeat_labels:
+            label_hits[label] = repeated
+
+    counts = np.zeros(n, dtype=np.int32)
+    for label in scanner.order:
+        counts += label_hits[label]
+    return counts
+
+
+def _entropy(lengths, charset_sizes):
+    """
+    Entropía redondeada exactamente igual que en el analizador escalar:
+    se calcula una vez por cada par (longitud, tamaño del conjunto) distinto
+    """
+    keys = lengths.astype(np.int64) * 128 + charset_sizes
+    unique, inverse = np.unique(keys, return_inverse=True)
+    values = np.array([round(int(key // 128) * CHARSET_LOG2[int(key % 128)], 2)
+                       if key % 128 and key // 128 else 0.0 for key in unique])
+    return values[inverse].reshape(lengths.shape)
+
+
+def _score(lengths, charset_count, entropy, is_common, pattern_count):
+    """
+    Puntuación 0-100 con el mismo orden de operaciones que _calculate_score
+    """
+    score = np.minimum(25, lengths * 2) + np.minimum(25, charset_count * 6)
+    score = score + np.minimum(30, entropy / 3)
+    score = score + np.where(is_common, 0, 20)
+    score = score - np.minimum(30, pattern_count * 5)
+    return np.clip(np.rint(score), 0, 100).astype(np.int32)
+
+
+def analyze_batch(analyzer, passwords, max_width=64):
+    """
+    Analiza un lote de contraseñas y devuelve un dict de columnas NumPy
+    (listo para pandas.DataFrame). Las filas con caracteres no ASCII,
+    longitud mayor que max_width o NUL se calculan con el analizador escalar
+    """
+    _require_numpy()
+    passwords = list(passwords)
+    n = len(passwords)
+    lengths = np.fromiter(map(len, passwords), dtype=np.int32, count=n)
+    scanner = analyzer.scanner
+
+    # Filas que necesitan el camino escalar
+    scalar = lengths > max_width
+    if scanner.fallback:
+        scalar[:] = True
+    width = max(int(lengths[~scalar].max()), 1) if (~scalar).any() else 1
+    rows = [p if not s else '' for p, s in zip(passwords, scalar)]
+    matrix, encoded_lengths = _encode(rows, width)
+    scalar |= (matrix > 127).any(axis=1)
+    scalar |= encoded_lengths != np.where(scalar, 0, lengths)
+    matrix[scalar] = 0
+
+    valid = np.arange(width) < np.where(scalar, 0, lengths)[:, None]
+    is_lower = (matrix >= 97) & (matrix <= 122)
+    is_upper = (matrix >= 65) & (matrix <= 90)
+    is_digit = (matrix >= 48) & (matrix <= 57)
+    lowercase = is_lower.any(axis=1)
+    uppercase = is_upper.any(axis=1)
+    digits = is_digit.any(axis=1)
+    symbols = (valid & ~(is_lower | is_upper | is_digit)).any(axis=1)
+    charset_count = (lowercase.astype(np.int32) + uppercase + digits + symbols)
+    charset_sizes = 26 * lowercase + 26 * uppercase + 10 * digits + 32 * symbols
+    entropy = _entropy(lengths, charset_sizes)
+
+    lower = np.where(is_upper, matrix + 32, matrix)
+    pattern_count = _pattern_counts(scanner, lower)
+
+    # Trabajo de diccionario: conjuntos comunes, corpus y autómata
+    is_common = np.zeros(n, dtype=bool)
+    breach_count = np.full(n, -1, dtype=np.int64)
+    for i, password in enumerate(passwords):
+        if scalar[i] or not password:
+            continue
+        breach = analyzer.corpus.lookup(password) if analyzer.corpus is not None else None
+        if breach is not None:
+            breach_count[i] = breach
+        is_common[i] = bool(breach) or analyzer._is_common_password(password)
+        if analyzer.dictionary is not None and analyzer.dictionary.words_in(password):
+            pattern_count[i] += 1
+
+    score = _score(lengths, charset_count, entropy, is_common, pattern_count)
+    strength = np.array(STRENGTH_LEVELS, dtype=object)[np.searchsorted(STRENGTH_THRESHOLDS,
+                                                                       score, side='right')]
+    crack_time = np.array(CRACK_TIME_LEVELS, dtype=object)[
+        np.searchsorted(CRACK_TIME_THRESHOLDS, entropy, side='right')]
+
+    columns = {
+        'password': np.array(passwords, dtype=object),
+        'length': lengths,
+        'lowercase': lowercase,
+        'uppercase': uppercase,
+        'digits': digits,
+        'symbols': symbols,
+        'charset_count': charset_count,
+        'entropy': entropy,
+        'pattern_count': pattern_count,
+        'is_common': is_common,
+        'breach_count': breach_count,
+        'score': score,
+        'strength': strength,
+        'crack_time': crack_time,
+    }
+
+    # Filas escalares y contraseñas vacías: se copian del analizador normal
+    for i in np.flatnonzero(scalar | (lengths == 0)):
+        analysis = analyzer.analyze_password(passwords[i])
+        _fill_row(columns, i, analysis)
+    return columns
+
+
+def _fill_row(columns, i, analysis):
+    sets = analysis['character_sets']
+    columns['lowercase'][i] = sets['lowercase']
+    columns['uppercase'][i] = sets['uppercase']
+    columns['digits'][i] = sets['digits']
+    columns['symbols'][i] = sets['symbols']
+    columns['charset_count'][i] = sets['count']
+    columns['entropy'][i] = analysis['entropy']
+    columns['pattern_count'][i] = len(analysis['patterns'])
+    columns['is_common'][i] = analysis['is_common']
+    breach = analysis.get('breach_count')
+    columns['breach_count'][i] = -1 if breach is None else breach
+    columns['score'][i] = analysis['score']
+    columns['strength'][i] = analysis['strength']
+    columns['crack_time'][i] = analysis['crack_time']
+
+
+def to_records(columns):
+    """
+    Convierte las columnas en un array estructurado de NumPy
+    """
+    _require_numpy()
+    fields = []
+    for name in COLUMNS:
+        column = columns[name]
+        if column.dtype == object:
+            size = max((len(value) for value in column), default=1) or 1
+            fields.append((name, f'<U{size}'))
+        else:
+            fields.append((name, column.dtype))
+    records = np.empty(len(columns['password']), dtype=fields)
+    for name in COLUMNS:
+        records[name] = columns[name]
+    return records
+
+
+def check_parity(analyzer, passwords, **kwargs):
+    """
+    Compara el camino vectorizado con analyze_password y devuelve los
+    índices de las filas que difieren (lista vacía si hay paridad)
+    """
+    columns = analyze_batch(analyzer, passwords, **kwargs)
+    mismatches = []
+    for i, password in enumerate(passwords):
+        analysis = analyzer.analyze_password(password)
+        sets = analysis['character_sets']
+        breach = analysis.get('breach_count')
+        expected = (analysis['length'], sets['lowercase'], sets['uppercase'], sets['digits'],
+                    sets['symbols'], sets['count'], analysis['entropy'],
+                    len(analysis['patterns']), analysis['is_common'],
+                    -1 if breach is None else breach, analysis['score'],
+                    analysis['strength'], analysis['crack_time'])
+        actual = tuple(columns[name][i] for name in COLUMNS[1:])
+        if expected != actual:
+            mismatches.append(i)
+    return mismatches
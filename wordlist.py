@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Listas de palabras grandes con índice de posiciones para frases de paso
+tipo diceware. El índice (archivo .idx junto a la lista) guarda dónde
+empieza y termina cada palabra, así que elegir la palabra i es una
+consulta O(1) sobre el archivo proyectado con mmap, sin cargar la lista
+"""
+
+import argparse
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+
+MAGIC = b'PWWORDS\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQQ')  # magic, versión, byteorder, palabras, tamaño, mtime_ns
+
+# Prefijo de tiradas de dado de las listas diceware ("11111\tabacus")
+_DICE_PREFIX = re.compile(rb'[1-6]+[ \t]+')
+_COMPRESSED = ('.gz', '.xz', '.bz2')
+
+
+def index_path(path):
+    return path + '.idx'
+
+
+def build_index(path, output=None):
+    """
+    Recorre la lista una vez y escribe el índice de posiciones. Se ignoran
+    las líneas vacías, el prefijo de dados y las palabras repetidas (para
+    que la entropía de la frase sea exacta)
+    """
+    if path.endswith(_COMPRESSED):
+        raise ValueError(f"La lista debe estar sin comprimir para el acceso aleatorio: {path}")
+    output = output or index_path(path)
+    offsets = array('Q')
+    seen = set()
+    position = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            content = line.rstrip(b'\r\n')
+            skip = 3 if position == 0 and content.startswith(b'\xef\xbb\xbf') else 0
+            prefix = _DICE_PREFIX.match(content, skip)
+            if prefix:
+                skip = prefix.end()
+            word = content[skip:]
+            skip += len(word) - len(word.lstrip())
+            word = word.strip()
+            start = position + skip
+            position += len(line)
+            if not word or word in seen:
+                continue
+            try:
+                word.decode('utf-8')
+            except UnicodeDecodeError:
+                raise ValueError(f"La lista no está en UTF-8 (posición {start}): {path}")
+            seen.add(word)
+            offsets.append(start)
+            offsets.append(start + len(word))
+    stat = os.stat(path)
+    tmp_output = output + '.tmp'
+    with open(tmp_output, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, VERSION, sys.byteorder == 'little', len(offsets) // 2,
+                              stat.st_size, stat.st_mtime_ns))
+        out.write(offsets.tobytes())
+    os.replace(tmp_output, output)
+    return len(offsets) // 2
+
+
+class IndexedWordlist:
+    """
+    Lista de palabras con acceso aleatorio O(1). Si el índice no existe o
+    la lista ha cambiado desde que se creó, se vuelve a construir
+    """
+    def __init__(self, path, rebuild=True):
+        self.path = path
+        self._open(rebuild)
+
+    def _open(self, rebuild):
+        idx = index_path(self.path)
+        if rebuild and not self._index_is_current(idx):
+            build_index(self.path, idx)
+        with open(idx, 'rb') as f:
+            self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, little, count, size, mtime_ns = HEADER.unpack_from(self._index, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Formato de índice no reconocido: {idx}")
+        stat = os.stat(self.path)
+        if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            raise ValueError(f"El índice no corresponde a la lista actual: {idx}")
+        self.count = count
+        self._offsets = memoryview(self._index)[HEADER.size:HEADER.size + count * 16].cast('Q')
+        if bool(little) != (sys.byteorder == 'little'):
+            self._offsets = array('Q', self._offsets)
+            self._offsets.byteswap()
+        with open(self.path, 'rb') as f:
+            self._words = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def _index_is_current(self, idx):
+        try:
+            with open(idx, 'rb') as f:
+                header = f.read(HEADER.size)
+            magic, version, _, _, size, mtime_ns = HEADER.unpack(header)
+        except (OSError, struct.error):
+            return False
+        stat = os.stat(self.path)
+        return (magic, version, size, mtime_ns) == (MAGIC, VERSION, stat.st_size,
+                                                    stat.st_mtime_ns)
+
+    def __getstate__(self):
+        # Los mmap no se serializan: cada proceso vuelve a proyectar los archivos
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.path = state['path']
+        self._open(rebuild=False)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        start, end = self._offsets[2 * i], self._offsets[2 * i + 1]
+        return self._words[start:end].decode('utf-8')
+
+    def entropy(self, words=1):
+        """
+        Bits exactos de una frase de 'words' palabras elegidas uniformemente
+        """
+        return words * math.log2(self.count) if self.count else 0.0
+
+    def close(self):
+        self._index.close()
+        if isinstance(self._words, mmap.mmap):
+            self._words.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Índice de listas de palabras para diceware')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    index = subparsers.add_parser('index', help='Construir el índice de una lista')
+    index.add_argument('wordlist', help='Lista de palabras (una por línea, admite formato diceware)')
+
+    info = subparsers.add_parser('info', help='Palabras y entropía por palabra de una lista')
+    info.add_argument('wordlist', help='Lista de palabras')
+
+    args = parser.parse_args()
+    if args.command == 'index':
+        count = build_index(args.wordlist)
+        print(f"Índice generado: {index_path(args.wordlist)} ({count} palabras)")
+    else:
+        wordlist = IndexedWordlist(args.wordlist)
+        print(f"{args.wordlist}: {len(wordlist)} palabras, "
+              f"{wordlist.entropy():.2f} bits por palabra")
+
+
+if __name__ == '__main__':
+    main()